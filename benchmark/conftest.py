@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def print_info(request):
+    """Print a row of the table of results of a benchmark module.
+
+    The module describes the columns of the table in ``COLUMNS``, a dict from
+    each heading to the format spec of its values. The headings are printed
+    before the first row.
+    """
+    columns = request.module.COLUMNS
+    fmt = "## " + "  ".join(
+        f"{{:{len(heading)}{spec}}}" for heading, spec in columns.items()
+    )
+    printed_heading = False
+
+    def print_info(*args):
+        nonlocal printed_heading
+        if not printed_heading:
+            printed_heading = True
+            print("## " + "  ".join(columns))
+        print(fmt.format(*args))
+
+    yield print_info
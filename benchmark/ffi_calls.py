@@ -0,0 +1,42 @@
+import pytest
+
+
+COLUMNS = {
+    "browser": "s",
+    "args": "s",
+    "calls": "d",
+    "seconds": ".4f",
+}
+
+
+ARGS = {
+    "none": "",
+    "numbers": "1, 2.5, 3",
+    "string": "'hello'",
+    "object": "obj",
+}
+
+
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@pytest.mark.parametrize("calls", [100_000])
+@pytest.mark.parametrize("args", list(ARGS))
+def test_ffi_calls(selenium, print_info, args, calls):
+    seconds = selenium.run(
+        f"""
+        from time import perf_counter
+        from pyodide.code import run_js
+
+        f = run_js("(function(){{ return 0; }})")
+        obj = run_js("({{}})")
+        best = float("inf")
+        for _ in range(3):
+            t0 = perf_counter()
+            for _ in range({calls}):
+                f({ARGS[args]})
+            best = min(best, perf_counter() - t0)
+        del f, obj
+        best
+        """
+    )
+    print_info(selenium.browser, args, calls, seconds)
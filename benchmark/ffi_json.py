@@ -0,0 +1,43 @@
+import pytest
+
+
+COLUMNS = {
+    "browser": "s",
+    "direction": "s",
+    "method": "s",
+    "rows": "d",
+    "seconds": ".4f",
+}
+
+
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@pytest.mark.parametrize("rows", [10, 1000, 100_000])
+@pytest.mark.parametrize("method", ["convert", "json", "auto"])
+@pytest.mark.parametrize("direction", ["to_js", "to_py"])
+def test_ffi_json(selenium, print_info, direction, method, rows):
+    seconds = selenium.run(
+        f"""
+        from time import perf_counter
+        from pyodide.ffi import to_js_via_json, to_py_via_json
+
+        value = [
+            {{"id": i, "name": f"row {{i}}", "score": i / 3, "tags": ["a", "b"]}}
+            for i in range({rows})
+        ]
+        js_value = to_js_via_json(value, method="json")
+        repeat = max(1, 10_000 // {rows})
+        best = float("inf")
+        for _ in range(3):
+            t0 = perf_counter()
+            for _ in range(repeat):
+                if "{direction}" == "to_js":
+                    to_js_via_json(value, method="{method}")
+                else:
+                    to_py_via_json(js_value, method="{method}")
+            best = min(best, (perf_counter() - t0) / repeat)
+        del js_value
+        best
+        """
+    )
+    print_info(selenium.browser, direction, method, rows, seconds)
@@ -0,0 +1,45 @@
+import pytest
+
+
+COLUMNS = {
+    "browser": "s",
+    "args": "s",
+    "calls": "d",
+    "seconds": ".4f",
+}
+
+
+ARGS = {
+    "none": "",
+    "numbers": "1, 2.5, 3",
+    "string": "'hello'",
+    "object": "obj",
+}
+
+
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@pytest.mark.parametrize("calls", [100_000])
+@pytest.mark.parametrize("args", list(ARGS))
+def test_pyproxy_calls(selenium, print_info, args, calls):
+    seconds = selenium.run_js(
+        f"""
+        const f = pyodide.runPython(`
+            def f(*args):
+                pass
+            f
+        `);
+        const obj = {{}};
+        let best = Infinity;
+        for (let i = 0; i < 3; i++) {{
+            const t0 = performance.now();
+            for (let j = 0; j < {calls}; j++) {{
+                f({ARGS[args]});
+            }}
+            best = Math.min(best, (performance.now() - t0) / 1000);
+        }}
+        f.destroy();
+        return best;
+        """
+    )
+    print_info(selenium.browser, args, calls, seconds)
@@ -0,0 +1,74 @@
+import pytest
+
+
+COLUMNS = {
+    "browser": "s",
+    "scenario": "s",
+    "seconds": ".3f",
+    "snapshot_MiB": ".1f",
+}
+
+
+# Each scenario is the code that makes the snapshot it needs (if any), and the
+# code that loads Pyodide the way the scenario describes.
+SCENARIOS = {
+    "cold": (
+        "",
+        """
+        const py = await loadPyodide();
+        await py.loadPackage("micropip");
+        """,
+    ),
+    "snapshot": (
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        await py1.loadPackage("micropip");
+        const snapshot = py1.makeMemorySnapshot();
+        snapshotSize = snapshot.length;
+        """,
+        "await loadPyodide({_loadSnapshot: snapshot});",
+    ),
+    "compressed snapshot": (
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        await py1.loadPackage("micropip");
+        const snapshot = await py1.makeMemorySnapshot({compress: true});
+        snapshotSize = snapshot.length;
+        """,
+        "await loadPyodide({_loadSnapshot: snapshot});",
+    ),
+    "delta snapshot": (
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        const base = py1.makeMemorySnapshot();
+        const py2 = await loadPyodide({_loadSnapshot: base, _makeSnapshot: true});
+        await py2.loadPackage("micropip");
+        const delta = py2.makeMemorySnapshot({base});
+        snapshotSize = base.length + delta.length;
+        """,
+        "await loadPyodide({_loadSnapshot: [base, delta]});",
+    ),
+}
+
+
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@pytest.mark.parametrize("scenario", SCENARIOS.keys())
+def test_startup(selenium_standalone_noload, print_info, scenario):
+    selenium = selenium_standalone_noload
+    setup, load = SCENARIOS[scenario]
+    repeat = 3
+    [seconds, snapshot_size] = selenium.run_js(
+        f"""
+        let snapshotSize = 0;
+        {setup}
+        let best = Infinity;
+        for (let i = 0; i < {repeat}; i++) {{
+            const t0 = performance.now();
+            {load}
+            best = Math.min(best, performance.now() - t0);
+        }}
+        return [best / 1000, snapshotSize];
+        """
+    )
+    print_info(selenium.browser, scenario, seconds, snapshot_size / (1 << 20))
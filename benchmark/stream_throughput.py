@@ -0,0 +1,48 @@
+import pytest
+
+
+COLUMNS = {
+    "browser": "s",
+    "handler": "s",
+    "lines": "d",
+    "seconds": ".3f",
+    "lines/sec": ".0f",
+}
+
+
+HANDLERS = {
+    "batched": "{ batched(s) { total += s.length; } }",
+    "chunked": "{ chunked(s) { total += s.length; } }",
+    "write": "{ write(buf) { total += buf.length; return buf.length; } }",
+    "raw": "{ raw(c) { total += 1; } }",
+}
+
+
+@pytest.mark.skip_refcount_check
+@pytest.mark.skip_pyproxy_check
+@pytest.mark.parametrize("handler", HANDLERS.keys())
+def test_stream_throughput(selenium, print_info, handler):
+    nlines = 10_000 if handler == "raw" else 100_000
+    res = selenium.run_js(
+        f"""
+        let total = 0;
+        pyodide.setStdout({HANDLERS[handler]});
+        try {{
+            const t0 = performance.now();
+            pyodide.runPython(`
+                for i in range({nlines}):
+                    print("log line number", i)
+            `);
+            await new Promise((resolve) => setTimeout(resolve));
+            const t1 = performance.now();
+            return [(t1 - t0) / 1000, total];
+        }} finally {{
+            pyodide.setStdout();
+        }}
+        """
+    )
+    [seconds, total] = res
+    assert total > 0
+    print_info(selenium.browser, handler, nlines, seconds, nlines / seconds)
+
+    selenium.clean_logs()
@@ -4,6 +4,10 @@
 
 // clang-format off
 EM_JS_MACROS(void, hiwire_invalid_ref_js, (int type, JsRef ref), {
+  if (Hiwire.probing) {
+    // API.hiwireCheckpoint is checking whether a reference is still alive.
+    throw Hiwire.probing;
+  }
   API.fail_test = true;
   if (type === HIWIRE_FAIL_GET && !ref) {
     // hiwire_get on NULL.
@@ -48,3 +52,17 @@ hiwire_invalid_ref(int type, JsRef ref)
 {
   hiwire_invalid_ref_js(type, ref);
 }
+
+// Set by API.hiwireTraceAllocations.
+EMSCRIPTEN_KEEPALIVE bool hiwire_tracing = false;
+
+EM_JS(void, hiwire_trace_new_js, (JsRef ref), {
+  Hiwire.traceNew(ref);
+});
+
+// Called with each new heap reference while hiwire_tracing is set.
+void
+hiwire_trace_new(JsRef ref)
+{
+  hiwire_trace_new_js(ref);
+}
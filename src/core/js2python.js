@@ -85,6 +85,8 @@ function js2python_convertImmutable(value) {
 // js2python_convertImmutable is used from js2python.c so we need to add it
 // to Module.
 Module.js2python_convertImmutable = js2python_convertImmutable;
+// callPyObjectFast in pyproxy.ts wants to handle errors itself.
+Module.js2python_convertImmutableInner = js2python_convertImmutableInner;
 
 /**
  * Returns a pointer to a Python object, 0, or undefined.
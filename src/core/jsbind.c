@@ -284,6 +284,24 @@ Py2Js_func_default(PyObject* self, PyObject* pyval, JsVal proxies)
   return python2js_track_proxies(pyval, proxies, /* gc_register=*/false);
 }
 
+/**
+ * Whether converting pyval with converter surely doesn't make a proxy, so the
+ * caller doesn't need an array to track proxies in. We only know this for the
+ * default converter and values that python2js converts without a proxy.
+ */
+bool
+Py2JsConverter_converts_without_proxy(PyObject* converter, PyObject* pyval)
+{
+  if (!Py_IS_TYPE(converter, &Py2JsConverterType) ||
+      Py2JsConverter_converter(converter) != Py2Js_func_default ||
+      Py2JsConverter_pre_convert(converter) != NULL) {
+    return false;
+  }
+  return Py_IsNone(pyval) || PyBool_Check(pyval) || pyval == py_jsnull ||
+         PyLong_Check(pyval) || PyFloat_Check(pyval) ||
+         PyUnicode_Check(pyval) || JsProxy_Check(pyval);
+}
+
 // clang-format off
 EM_JS(JsVal, my_dict_converter, (void), {
   return Object.fromEntries;
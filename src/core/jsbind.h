@@ -4,6 +4,9 @@
 JsVal
 Py2JsConverter_convert(PyObject* converter, PyObject* pyval, JsVal proxies);
 
+bool
+Py2JsConverter_converts_without_proxy(PyObject* converter, PyObject* pyval);
+
 PyObject*
 Js2PyConverter_convert(PyObject* converter, JsVal jsval, JsVal proxies);
 
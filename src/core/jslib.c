@@ -92,7 +92,11 @@ JsRef_new(JsVal v)
   if (JsvError_Check(v)) {
     return NULL;
   }
-  return hiwire_new(v);
+  JsRef ref = hiwire_new(v);
+  if (hiwire_tracing) {
+    hiwire_trace_new(ref);
+  }
+  return ref;
 }
 
 // ==================== Primitive Conversions ====================
@@ -214,7 +218,12 @@ EM_JS(int, JsvArray_Push, (JsVal arr, JsVal obj), {
 });
 
 EM_JS(void, JsvArray_Extend, (JsVal arr, JsVal vals), {
-  arr.push(...vals);
+  // Spreading a very long array as arguments overflows the stack, so push in
+  // chunks.
+  const chunk = 0x8000;
+  for (let i = 0; i < vals.length; i += chunk) {
+    arr.push(...vals.slice(i, i + chunk));
+  }
 });
 // clang-format on
 
@@ -243,20 +252,25 @@ JsvArray_slice,
 
 EM_JS_NUM(errcode,
 JsvArray_slice_assign,
-(JsVal obj, int slicelength, int start, int stop, int step, int values_length, PyObject **values),
+(JsVal obj, int slicelength, int start, int stop, int step, JsVal values),
 {
-  let jsvalues = [];
-  for(let i = 0; i < values_length; i++){
-    const ref = _python2js(DEREF_U32(values, i));
-    if (ref === Module.error){
-      return -1;
-    }
-    jsvalues.push(ref);
-  }
+  const jsvalues = values ?? [];
   if (step === 1) {
-    obj.splice(start, slicelength, ...jsvalues);
+    if (jsvalues.length < 0x8000) {
+      obj.splice(start, slicelength, ...jsvalues);
+    } else {
+      // Spreading a very long array as arguments overflows the stack
+      const tail = obj.slice(start + slicelength);
+      obj.length = start;
+      for (const v of jsvalues) {
+        obj.push(v);
+      }
+      for (const v of tail) {
+        obj.push(v);
+      }
+    }
   } else {
-    if(values !== 0) {
+    if(values !== null) {
       for(let i = 0; i < slicelength; i ++){
         obj.splice(start + i * step, 1, jsvalues[i]);
       }
@@ -56,6 +56,13 @@ int JsvNoValue_Check(JsVal);
 JsRef
 JsRef_new(JsVal v);
 
+// Set by API.hiwireTraceAllocations. While it is set, JsRef_new and
+// JsProxy_cinit report each new heap reference with hiwire_trace_new.
+extern bool hiwire_tracing;
+
+void
+hiwire_trace_new(JsRef ref);
+
 JsVal
 JsRef_pop(JsRef ref);
 
@@ -127,8 +134,7 @@ JsvArray_slice_assign(JsVal idobj,
                       int start,
                       int stop,
                       int step,
-                      int values_length,
-                      PyObject** values);
+                      JsVal values);
 
 // ==================== JsvObject API  ====================
 
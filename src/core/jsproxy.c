@@ -70,6 +70,7 @@
 #define IS_ERROR            (1 << 21)
 #define IS_PY_JSON_DICT     (1 << 22)
 #define IS_PY_JSON_SEQUENCE (1 << 23)
+#define IS_WASM_VIEW        (1 << 24)
 // clang-format on
 
 _Py_IDENTIFIER(get_event_loop);
@@ -108,6 +109,7 @@ static PyObject* Sequence;
 static PyObject* MutableMapping;
 static PyObject* Mapping;
 static PyObject* future_helper_mod;
+static PyObject* lazy_convert_mod;
 
 Js_static_string(PYPROXY_DESTROYED_AT_END_OF_FUNCTION_CALL,
                  "This borrowed proxy was automatically destroyed at the "
@@ -125,6 +127,7 @@ struct BufferFields
   Py_ssize_t byteLength;
   char* format;
   Py_ssize_t itemsize;
+  Py_ssize_t length;
   bool check_assignments;
 };
 
@@ -216,6 +219,7 @@ _Static_assert(sizeof(PyBaseExceptionObject) ==
 #define JsBuffer_FORMAT(x) (((JsProxy*)x)->tf.bf.format)
 #define JsBuffer_BYTE_LENGTH(x) (((JsProxy*)x)->tf.bf.byteLength)
 #define JsBuffer_ITEMSIZE(x) (((JsProxy*)x)->tf.bf.itemsize)
+#define JsBuffer_LENGTH(x) (((JsProxy*)x)->tf.bf.length)
 #define JsBuffer_CHECK_ASSIGNMENTS(x) (((JsProxy*)x)->tf.bf.check_assignments)
 
 #define JsObjMap_HEREDITARY(x) (((JsProxy*)x)->tf.omf.hereditary)
@@ -641,7 +645,7 @@ JsProxy_GetAttr_helper(PyObject* self, PyObject* attr, bool is_method)
     }
     clear_method_call_singleton();
     pyresult = Py_NewRef(method_call_singleton);
-    method_call_singleton->func = hiwire_new(jsresult);
+    method_call_singleton->func = JsRef_new(jsresult);
     method_call_singleton->this_ = JsProxy_REF(self);
     hiwire_incref(method_call_singleton->this_);
     method_call_singleton->signature = Py_NewRef(attr_sig);
@@ -1700,6 +1704,128 @@ JsTypedArray_subscript(PyObject* o, PyObject* item)
   return JsArray_subscript(o, item);
 }
 
+// How JsArray_from_numbers should read each entry
+#define NUMERIC_ITEM_NUMBER 0
+#define NUMERIC_ITEM_UNDEFINED 1
+#define NUMERIC_ITEM_TRUE 2
+#define NUMERIC_ITEM_FALSE 3
+
+// clang-format off
+EM_JS_VAL(JsVal,
+JsArray_from_numbers,
+(double* values, unsigned char* kinds, int n),
+{
+  const result = new Array(n);
+  for (let i = 0; i < n; i++) {
+    switch (DEREF_U8(kinds, i)) {
+      case NUMERIC_ITEM_NUMBER:
+        result[i] = DEREF_F64(values, i);
+        break;
+      case NUMERIC_ITEM_UNDEFINED:
+        result[i] = undefined;
+        break;
+      case NUMERIC_ITEM_TRUE:
+        result[i] = true;
+        break;
+      case NUMERIC_ITEM_FALSE:
+        result[i] = false;
+        break;
+    }
+  }
+  return result;
+});
+// clang-format on
+
+EM_JS(void, destroy_jsarray_entries, (JsVal array), {
+  for (let v of array) {
+    // clang-format off
+    try {
+      if(typeof v.destroy === "function"){
+          v.destroy();
+      }
+    } catch(e) {
+      console.warn("Weird error:", e);
+    }
+    // clang-format on
+  }
+})
+
+/**
+ * Convert the items of a list or tuple to a new JavaScript array.
+ *
+ * If every item is None, a bool, a float or an int that converts to a
+ * JavaScript number, the items are written into a buffer and the array is
+ * made with a single call into JavaScript. Otherwise each item is converted
+ * and pushed separately.
+ */
+static JsVal
+python_sequence_to_jsarray(PyObject* seq)
+{
+  JsVal result = JS_ERROR;
+  double* values = NULL;
+  unsigned char* kinds = NULL;
+
+  Py_ssize_t n = PySequence_Fast_GET_SIZE(seq);
+  values = PyMem_Malloc(sizeof(double) * n + 1);
+  kinds = PyMem_Malloc(n + 1);
+  if (values == NULL || kinds == NULL) {
+    PyErr_NoMemory();
+    FAIL();
+  }
+  PyObject** items = PySequence_Fast_ITEMS(seq);
+  Py_ssize_t i = 0;
+  for (; i < n; i++) {
+    PyObject* x = items[i];
+    if (Py_IsNone(x)) {
+      kinds[i] = NUMERIC_ITEM_UNDEFINED;
+    } else if (Py_IsTrue(x)) {
+      kinds[i] = NUMERIC_ITEM_TRUE;
+    } else if (Py_IsFalse(x)) {
+      kinds[i] = NUMERIC_ITEM_FALSE;
+    } else if (PyFloat_Check(x)) {
+      kinds[i] = NUMERIC_ITEM_NUMBER;
+      values[i] = PyFloat_AS_DOUBLE(x);
+    } else if (PyLong_Check(x)) {
+      // Same range as _python2js_long, bigger ints become BigInts
+      int overflow;
+      long v = PyLong_AsLongAndOverflow(x, &overflow);
+      if (overflow || (v == -1 && PyErr_Occurred())) {
+        PyErr_Clear();
+        break;
+      }
+      kinds[i] = NUMERIC_ITEM_NUMBER;
+      values[i] = v;
+    } else {
+      break;
+    }
+  }
+  if (i == n) {
+    result = JsArray_from_numbers(values, kinds, n);
+    goto finally;
+  }
+
+  result = JsvArray_New();
+  // Converting an item can run Python code that changes a list, so recheck
+  // the size and hold a reference to the item while converting it.
+  for (i = 0; i < PySequence_Fast_GET_SIZE(seq); i++) {
+    PyObject* item = Py_NewRef(PySequence_Fast_GET_ITEM(seq, i));
+    JsVal jsval = python2js(item);
+    Py_DECREF(item);
+    if (JsvError_Check(jsval)) {
+      // Destroy the proxies made for the items before this one.
+      destroy_jsarray_entries(result);
+      result = JS_ERROR;
+      goto finally;
+    }
+    JsvArray_Push(result, jsval);
+  }
+
+finally:
+  PyMem_Free(values);
+  PyMem_Free(kinds);
+  return result;
+}
+
 /**
  * __setitem__ and __delitem__ for proxies of Js Arrays, controlled by IS_ARRAY
  */
@@ -1743,7 +1869,7 @@ JsArray_ass_subscript(PyObject* self, PyObject* item, PyObject* pyvalue)
         step = -step;
       }
       FAIL_IF_MINUS_ONE(JsvArray_slice_assign(
-        JsProxy_VAL(self), slicelength, start, stop, step, 0, NULL));
+        JsProxy_VAL(self), slicelength, start, stop, step, Jsv_null));
     } else {
       if (step != 1 && !slicelength) {
         // At this point, assigning to an extended slice of length 0 must be a
@@ -1751,13 +1877,10 @@ JsArray_ass_subscript(PyObject* self, PyObject* item, PyObject* pyvalue)
         success = true;
         goto finally;
       }
-      FAIL_IF_MINUS_ONE(JsvArray_slice_assign(JsProxy_VAL(self),
-                                              slicelength,
-                                              start,
-                                              stop,
-                                              step,
-                                              PySequence_Fast_GET_SIZE(seq),
-                                              PySequence_Fast_ITEMS(seq)));
+      JsVal jsvalues = python_sequence_to_jsarray(seq);
+      FAIL_IF_JS_ERROR(jsvalues);
+      FAIL_IF_MINUS_ONE(JsvArray_slice_assign(
+        JsProxy_VAL(self), slicelength, start, stop, step, jsvalues));
     }
     success = true;
     goto finally;
@@ -1821,27 +1944,14 @@ JsArray_extend_by_python_iterable(JsVal jsarray, PyObject* iterable)
   bool success = false;
 
   if (PyList_CheckExact(iterable) || PyTuple_CheckExact(iterable)) {
-    iterable = PySequence_Fast(iterable, "argument must be iterable");
-    if (!iterable)
-      return -1;
-    Py_ssize_t n = PySequence_Fast_GET_SIZE(iterable);
-    if (n == 0) {
+    if (PySequence_Fast_GET_SIZE(iterable) == 0) {
       /* short circuit when iterable is empty */
       success = true;
       goto finally;
     }
-    /* note that we may still have self == iterable here for the
-     * situation a.extend(a), but the following code works
-     * in that case too.  Just make sure to resize self
-     * before calling PySequence_Fast_ITEMS.
-     */
-    /* populate the end of self with iterable's items */
-    PyObject** src = PySequence_Fast_ITEMS(iterable);
-    for (int i = 0; i < n; i++) {
-      JsVal jsval = python2js(src[i]);
-      FAIL_IF_JS_ERROR(jsval);
-      JsvArray_Push(jsarray, jsval);
-    }
+    JsVal jsvals = python_sequence_to_jsarray(iterable);
+    FAIL_IF_JS_ERROR(jsvals);
+    JsvArray_Extend(jsarray, jsvals);
   } else {
     Py_INCREF(iterable);
     it = PyObject_GetIter(iterable);
@@ -1872,20 +1982,6 @@ finally:
   return success ? 0 : -1;
 }
 
-EM_JS(void, destroy_jsarray_entries, (JsVal array), {
-  for (let v of array) {
-    // clang-format off
-    try {
-      if(typeof v.destroy === "function"){
-          v.destroy();
-      }
-    } catch(e) {
-      console.warn("Weird error:", e);
-    }
-    // clang-format on
-  }
-})
-
 static PyObject*
 JsArray_extend_meth(PyObject* o, PyObject* iterable)
 {
@@ -2870,17 +2966,37 @@ JsProxy_toPy(PyObject* self,
              Py_ssize_t nargs,
              PyObject* kwnames)
 {
-  static const char* const _keywords[] = { "depth", "default_converter", 0 };
+  static const char* const _keywords[] = {
+    "depth", "default_converter", "lazy", 0
+  };
   static struct _PyArg_Parser _parser = {
-    .format = "|$iO:to_py",
+    .format = "|$iOp:to_py",
     .keywords = _keywords,
   };
   int depth = -1;
   PyObject* default_converter = NULL;
+  int lazy = 0;
   if (!_PyArg_ParseStackAndKeywords(
-        args, nargs, kwnames, &_parser, &depth, &default_converter)) {
+        args, nargs, kwnames, &_parser, &depth, &default_converter, &lazy)) {
     return NULL;
   }
+  if (lazy) {
+    _Py_IDENTIFIER(lazy_to_py);
+    PyObject* depth_obj = PyLong_FromLong(depth);
+    if (depth_obj == NULL) {
+      return NULL;
+    }
+    PyObject* result =
+      _PyObject_CallMethodIdObjArgs(lazy_convert_mod,
+                                    &PyId_lazy_to_py,
+                                    self,
+                                    depth_obj,
+                                    default_converter ? default_converter
+                                                      : Py_None,
+                                    NULL);
+    Py_DECREF(depth_obj);
+    return result;
+  }
   JsVal default_converter_js = Jsv_undefined;
   if (default_converter != NULL) {
     default_converter_js = python2js(default_converter);
@@ -3367,6 +3483,9 @@ JsProxy_cinit(PyObject* obj, JsVal val, PyObject* sig)
 {
   JsProxy* self = (JsProxy*)obj;
   self->js = hiwire_new_deduplicate(val);
+  if (hiwire_tracing) {
+    hiwire_trace_new(self->js);
+  }
   self->signature = Py_XNewRef(sig);
 #ifdef DEBUG_F
   extern bool tracerefs;
@@ -3947,12 +4066,59 @@ JsBuffer_cinit(PyObject* self)
     free(typename);
     FAIL();
   }
+  JsBuffer_LENGTH(self) = JsBuffer_BYTE_LENGTH(self) / JsBuffer_ITEMSIZE(self);
 
   success = true;
 finally:
   return success ? 0 : -1;
 }
 
+// clang-format off
+EM_JS_UNCHECKED(int, JsBuffer_wasm_byte_offset, (JsVal jsobj), {
+  // Growing the wasm memory replaces Module.HEAPU8.buffer and detaches views
+  // of the old buffer.
+  if (jsobj.buffer !== Module.HEAPU8.buffer) {
+    return -1;
+  }
+  return jsobj.byteOffset;
+});
+// clang-format on
+
+/**
+ * bf_getbuffer for proxies of ArrayBuffer views into the wasm memory,
+ * controlled by IS_WASM_VIEW. The Python buffer points directly at the data in
+ * the wasm heap so nothing is copied.
+ */
+static int
+JsBuffer_GetBuffer(PyObject* obj, Py_buffer* view, int flags)
+{
+  view->obj = NULL;
+  int offset = JsBuffer_wasm_byte_offset(JsProxy_VAL(obj));
+  if (offset == -1) {
+    PyErr_SetString(PyExc_BufferError,
+                    "The wasm memory has grown since this view was made and "
+                    "the view is detached");
+    return -1;
+  }
+  // This gets decremented automatically by PyBuffer_Release
+  Py_INCREF(obj);
+
+  view->buf = (void*)(uintptr_t)offset;
+  view->obj = obj;
+  view->len = JsBuffer_BYTE_LENGTH(obj);
+  view->readonly = false;
+  view->itemsize = JsBuffer_ITEMSIZE(obj);
+  view->format = JsBuffer_FORMAT(obj);
+  view->ndim = 1;
+  // See the comment in Buffer_GetBuffer about why the shape is needed
+  view->shape = &JsBuffer_LENGTH(obj);
+  view->strides = NULL;
+  view->suboffsets = NULL;
+  view->internal = NULL;
+
+  return 0;
+}
+
 EM_JS_REF(PyObject*, JsDoubleProxy_unwrap_js, (JsVal id), {
   return Module.PyProxy_getPtr(id);
 });
@@ -4276,6 +4442,10 @@ skip_container_slots:
     methods[cur_method++] = JsBuffer_read_from_file_MethodDef;
     methods[cur_method++] = JsBuffer_into_file_MethodDef;
   }
+  if (flags & IS_WASM_VIEW) {
+    slots[cur_slot++] = (PyType_Slot){ .slot = Py_bf_getbuffer,
+                                       .pfunc = (void*)JsBuffer_GetBuffer };
+  }
   if (flags & IS_DOUBLE_PROXY) {
     methods[cur_method++] = JsDoubleProxy_unwrap_MethodDef;
   }
@@ -4511,6 +4681,13 @@ EM_JS_NUM(int, JsProxy_compute_typeflags, (JsVal obj, bool is_py_json), {
     (isBufferView || typeTag === "[object ArrayBuffer]") &&
       !(type_flags & IS_CALLABLE)
   );
+  // Views into the wasm memory can share their data with Python directly.
+  SET_FLAG_IF(
+    IS_WASM_VIEW,
+    isBufferView &&
+      type_flags & IS_BUFFER &&
+      safeBool(() => obj.buffer === Module.HEAPU8.buffer)
+  );
   SET_FLAG_IF(IS_DOUBLE_PROXY, API.isPyProxy(obj));
   SET_FLAG_IF(IS_ARRAY, isArray);
   SET_FLAG_IF(IS_TYPEDARRAY, isBufferView && typeTag !== "[object DataView]");
@@ -4886,6 +5063,8 @@ jsproxy_init(PyObject* core_module)
   FAIL_IF_NULL(typing);
   future_helper_mod = PyImport_ImportModule("_pyodide._future_helper");
   FAIL_IF_NULL(future_helper_mod);
+  lazy_convert_mod = PyImport_ImportModule("_pyodide._lazy_convert");
+  FAIL_IF_NULL(lazy_convert_mod);
 
   FAIL_IF_MINUS_ONE(JsProxy_init_docstrings(_pyodide_core_docs));
 
@@ -4917,6 +5096,7 @@ jsproxy_init(PyObject* core_module)
   AddFlag(IS_ERROR);
   AddFlag(IS_PY_JSON_DICT);
   AddFlag(IS_PY_JSON_SEQUENCE);
+  AddFlag(IS_WASM_VIEW);
 
 #undef AddFlag
   FAIL_IF_MINUS_ONE(PyObject_SetAttrString(core_module, "js_flags", flag_dict));
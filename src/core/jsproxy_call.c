@@ -4,6 +4,7 @@
 #include "js2python.h"
 #include "jsbind.h"
 #include "jslib.h"
+#include "jsmemops.h"
 #include "pyproxy.h"
 #include "python2js.h"
 #include "python_unexposed.h"
@@ -210,24 +211,200 @@ find_keyword(PyObject* kwarg_names, PyObject* key)
   return -1;
 }
 
+// Calls into JavaScript reuse the arrays that hold the arguments instead of
+// making a new one each time. Converting an argument can run Python code that
+// calls into JavaScript again, and with stack switching a call can be
+// suspended while others run, so each call takes an array from the pool and
+// puts it back when it is done. Nested calls take arrays in stack order so the
+// pool holds about one array per level of nesting.
+
+// clang-format off
+EM_JS(void, jsproxy_call_init_js, (void), {
+  Module.callArgsPool = [];
+  Module.simpleCallArgs = [];
+});
+
+EM_JS(JsVal, call_args_acquire, (void), {
+  return Module.callArgsPool.pop() ?? [];
+});
+
+EM_JS_VAL(JsVal,
+call_pooled_args,
+(JsVal func, JsVal receiver, JsVal args, bool construct),
+{
+  try {
+    if (construct) {
+      return Reflect.construct(func, args);
+    }
+    return Reflect.apply(func, receiver, args);
+  } finally {
+    args.length = 0;
+    Module.callArgsPool.push(args);
+  }
+});
+
+// Results that aren't promises, generators or proxies don't need any of the
+// bookkeeping of Js2Py_func_default_call_result.
+EM_JS_BOOL(bool, call_result_is_plain, (JsVal result), {
+  if (result === null ||
+      (typeof result !== "object" && typeof result !== "function")) {
+    return true;
+  }
+  const tag = getTypeTag(result);
+  return !API.isPyProxy(result) && !isPromise(result) &&
+    tag !== "[object Generator]" && tag !== "[object AsyncGenerator]";
+});
+// clang-format on
+
+#define SIMPLE_CALL_MAX_ARGS 8
+// Longer strings go through python2js which copies them faster.
+#define SIMPLE_CALL_MAX_STR_LEN 64
+
+// How call_simple_args should read each argument
+#define SIMPLE_ARG_NUMBER 0
+#define SIMPLE_ARG_UNDEFINED 1
+#define SIMPLE_ARG_NULL 2
+#define SIMPLE_ARG_TRUE 3
+#define SIMPLE_ARG_FALSE 4
+#define SIMPLE_ARG_LATIN1 5
+
+// clang-format off
+EM_JS_VAL(JsVal,
+call_simple_args,
+(JsVal func,
+ JsVal receiver,
+ bool construct,
+ int nargs,
+ double* values,
+ int* lengths,
+ unsigned char* kinds),
+{
+  // Reflect.apply and Reflect.construct copy the arguments before the callee
+  // runs, so a nested call can't see this array change under it.
+  const args = Module.simpleCallArgs;
+  args.length = nargs;
+  for (let i = 0; i < nargs; i++) {
+    switch (DEREF_U8(kinds, i)) {
+      case SIMPLE_ARG_NUMBER:
+        args[i] = DEREF_F64(values, i);
+        break;
+      case SIMPLE_ARG_UNDEFINED:
+        args[i] = undefined;
+        break;
+      case SIMPLE_ARG_NULL:
+        args[i] = null;
+        break;
+      case SIMPLE_ARG_TRUE:
+        args[i] = true;
+        break;
+      case SIMPLE_ARG_FALSE:
+        args[i] = false;
+        break;
+      case SIMPLE_ARG_LATIN1: {
+        const ptr = DEREF_F64(values, i);
+        const len = DEREF_U32(lengths, i);
+        let jsstr = "";
+        for (let j = 0; j < len; ++j) {
+          jsstr += String.fromCharCode(DEREF_U8(ptr, j));
+        }
+        args[i] = jsstr;
+        break;
+      }
+    }
+  }
+  if (construct) {
+    return Reflect.construct(func, args);
+  }
+  return Reflect.apply(func, receiver, args);
+});
+// clang-format on
+
+/**
+ * Fast path for calls with the default signature and only positional None,
+ * jsnull, bool, int, float and short one byte str arguments. These all convert to
+ * JavaScript primitives without making a proxy, so we write them into a buffer
+ * and make the call with a single trip into JavaScript.
+ *
+ * Returns Jsv_novalue if some argument doesn't qualify.
+ */
+static JsVal
+JsMethod_CallSimple(JsVal func,
+                    JsVal receiver,
+                    bool construct,
+                    PyObject* const* pyargs,
+                    Py_ssize_t nargs)
+{
+  double values[SIMPLE_CALL_MAX_ARGS];
+  int lengths[SIMPLE_CALL_MAX_ARGS];
+  unsigned char kinds[SIMPLE_CALL_MAX_ARGS];
+
+  if (nargs > SIMPLE_CALL_MAX_ARGS) {
+    return Jsv_novalue;
+  }
+  for (Py_ssize_t i = 0; i < nargs; i++) {
+    PyObject* x = pyargs[i];
+    if (Py_IsNone(x)) {
+      kinds[i] = SIMPLE_ARG_UNDEFINED;
+    } else if (Py_IsTrue(x)) {
+      kinds[i] = SIMPLE_ARG_TRUE;
+    } else if (Py_IsFalse(x)) {
+      kinds[i] = SIMPLE_ARG_FALSE;
+    } else if (x == py_jsnull) {
+      kinds[i] = SIMPLE_ARG_NULL;
+    } else if (PyLong_CheckExact(x)) {
+      int overflow;
+      long value = PyLong_AsLongAndOverflow(x, &overflow);
+      if (overflow) {
+        return Jsv_novalue;
+      }
+      kinds[i] = SIMPLE_ARG_NUMBER;
+      values[i] = value;
+    } else if (PyFloat_CheckExact(x)) {
+      kinds[i] = SIMPLE_ARG_NUMBER;
+      values[i] = PyFloat_AS_DOUBLE(x);
+    } else if (PyUnicode_CheckExact(x) &&
+               PyUnicode_KIND(x) == PyUnicode_1BYTE_KIND &&
+               PyUnicode_GET_LENGTH(x) <= SIMPLE_CALL_MAX_STR_LEN) {
+      kinds[i] = SIMPLE_ARG_LATIN1;
+      values[i] = (uintptr_t)PyUnicode_DATA(x);
+      lengths[i] = PyUnicode_GET_LENGTH(x);
+    } else {
+      return Jsv_novalue;
+    }
+  }
+  return call_simple_args(
+    func, receiver, construct, nargs, values, lengths, kinds);
+}
+
 /**
  * Prepare arguments from a `METH_FASTCALL | METH_KEYWORDS` Python function to a
  * JavaScript call. We call `python2js` on each argument. Any PyProxy *created*
- * by `python2js` is stored into the `proxies` list to be destroyed later (if
+ * by `python2js` is stored into a `proxies` list to be destroyed later (if
  * the argument is a PyProxy created with `create_proxy` it won't be recorded
- * for destruction).
+ * for destruction). The arguments are pushed onto `jsargs`.
+ *
+ * Returns the proxies list, or Jsv_novalue if no argument could have needed a
+ * proxy so we didn't make one. On error, destroys the proxies and returns
+ * JS_ERROR.
  */
 static JsVal
 JsMethod_ConvertArgs(JsFuncSignature* sig,
                      PyObject* const* pyargs,
                      Py_ssize_t nargsf,
                      PyObject* kwnames,
-                     JsVal proxies)
+                     JsVal jsargs)
 {
   JsVal kwargs;
-  JsVal jsargs = JsvArray_New();
+  JsVal proxies = JS_ERROR;
   bool success = false;
 
+// Make the proxies list the first time an argument might need a proxy.
+#define ENSURE_PROXIES(converter, pyarg)                                       \
+  if (JsvError_Check(proxies) &&                                               \
+      !Py2JsConverter_converts_without_proxy(converter, pyarg)) {              \
+    proxies = JsvArray_New();                                                  \
+  }
+
   int nargs = PyVectorcall_NARGS(nargsf);
   int pos_params_size = PyTuple_GET_SIZE(sig->posparams);
   int pos_args = nargs < pos_params_size ? nargs : pos_params_size;
@@ -237,6 +414,7 @@ JsMethod_ConvertArgs(JsFuncSignature* sig,
   // present positional arguments
   for (Py_ssize_t i = 0; i < pos_args; ++i) {
     PyObject* converter = PyTuple_GET_ITEM(sig->posparams, i); /* borrowed! */
+    ENSURE_PROXIES(converter, pyargs[i]);
     JsVal arg = Py2JsConverter_convert(converter, pyargs[i], proxies);
     FAIL_IF_JS_ERROR(arg);
     JsvArray_Push(jsargs, arg);
@@ -246,6 +424,7 @@ JsMethod_ConvertArgs(JsFuncSignature* sig,
     PyObject* converter = PyTuple_GET_ITEM(sig->posparams, i); /* borrowed! */
     PyObject* pyarg = PyTuple_GET_ITEM(
       sig->posparams_defaults, i - sig->posparams_nmandatory); /* borrowed! */
+    ENSURE_PROXIES(converter, pyarg);
     JsVal arg = Py2JsConverter_convert(converter, pyarg, proxies);
     FAIL_IF_JS_ERROR(arg);
     JsvArray_Push(jsargs, arg);
@@ -258,6 +437,7 @@ JsMethod_ConvertArgs(JsFuncSignature* sig,
     // varargs argument
     PyObject* converter = sig->varpos; /* borrowed! */
     for (Py_ssize_t i = pos_args; i < nargs; ++i) {
+      ENSURE_PROXIES(converter, pyargs[i]);
       JsVal arg = Py2JsConverter_convert(converter, pyargs[i], proxies);
       FAIL_IF_JS_ERROR(arg);
       JsvArray_Push(jsargs, arg);
@@ -293,6 +473,7 @@ JsMethod_ConvertArgs(JsFuncSignature* sig,
     }
     JsVal jsname = python2js(pyname);
     FAIL_IF_JS_ERROR(jsname);
+    ENSURE_PROXIES(converter, pyargs[k]);
     JsVal arg = Py2JsConverter_convert(converter, pyargs[k], proxies);
     FAIL_IF_JS_ERROR(arg);
     FAIL_IF_MINUS_ONE(JsvObject_SetAttr(kwargs, jsname, arg));
@@ -320,6 +501,7 @@ JsMethod_ConvertArgs(JsFuncSignature* sig,
       PyTuple_GET_ITEM(sig->kwparam_converters, i); /* borrowed */
     JsVal jsname = python2js(pyname);
     FAIL_IF_JS_ERROR(jsname);
+    ENSURE_PROXIES(converter, default_);
     JsVal arg = Py2JsConverter_convert(converter, default_, proxies);
     FAIL_IF_JS_ERROR(arg);
     FAIL_IF_MINUS_ONE(JsvObject_SetAttr(kwargs, jsname, arg));
@@ -349,14 +531,22 @@ success:
   success = true;
 finally:
   if (!success) {
-    jsargs = JS_ERROR;
+    if (!JsvError_Check(proxies)) {
+      destroy_proxies(proxies, &PYPROXY_DESTROYED_AT_END_OF_FUNCTION_CALL);
+    }
     if (!PyErr_Occurred()) {
       PyErr_SetString(PyExc_SystemError, "Oops");
     }
+    return JS_ERROR;
+  }
+  if (JsvError_Check(proxies)) {
+    return Jsv_novalue;
   }
-  return jsargs;
+  return proxies;
 }
 
+#undef ENSURE_PROXIES
+
 /**
  * __call__ overload for methods. Controlled by IS_CALLABLE.
  */
@@ -372,7 +562,7 @@ JsMethod_Vectorcall_impl(JsVal func,
   JsVal jsresult = JS_ERROR;
   JsFuncSignature* call_sig = NULL;
   PyObject* pyresult = NULL;
-  JsVal proxies = JsvArray_New();
+  JsVal proxies = JS_ERROR;
 
   // Recursion error?
   FAIL_IF_NONZERO(Py_EnterRecursiveCall(" while calling a JavaScript object"));
@@ -388,15 +578,37 @@ JsMethod_Vectorcall_impl(JsVal func,
   if (!call_sig) {
     call_sig = (JsFuncSignature*)Py_NewRef(default_signature);
   }
-  JsVal jsargs =
-    JsMethod_ConvertArgs(call_sig, pyargs, nargsf, kwnames, proxies);
-  FAIL_IF_JS_ERROR(jsargs);
-  if (call_sig->should_construct) {
-    jsresult = JsvFunction_Construct(func, jsargs);
+  if ((PyObject*)call_sig == default_signature &&
+      (kwnames == NULL || PyTuple_GET_SIZE(kwnames) == 0)) {
+    jsresult = JsMethod_CallSimple(
+      func, receiver, false, pyargs, PyVectorcall_NARGS(nargsf));
+    FAIL_IF_JS_ERROR(jsresult);
   } else {
-    jsresult = JsvFunction_CallBound(func, receiver, jsargs);
+    jsresult = Jsv_novalue;
+  }
+  if (JsvNoValue_Check(jsresult)) {
+    JsVal jsargs = call_args_acquire();
+    proxies = JsMethod_ConvertArgs(call_sig, pyargs, nargsf, kwnames, jsargs);
+    FAIL_IF_JS_ERROR(proxies);
+    if (JsvNoValue_Check(proxies)) {
+      proxies = JS_ERROR;
+    }
+    jsresult =
+      call_pooled_args(func, receiver, jsargs, call_sig->should_construct);
   }
   FAIL_IF_JS_ERROR(jsresult);
+  if (JsvError_Check(proxies) && (PyObject*)call_sig == default_signature &&
+      call_result_is_plain(jsresult)) {
+    // No argument needed a proxy and the result doesn't need one either.
+    pyresult = js2python(jsresult);
+    FAIL_IF_NULL(pyresult);
+    success = true;
+    goto finally;
+  }
+  if (JsvError_Check(proxies)) {
+    // The result converter records the result in proxies.
+    proxies = JsvArray_New();
+  }
   PyObject* result_converter = ((JsFuncSignature*)call_sig)->result;
   pyresult = Js2PyConverter_convert(result_converter, jsresult, proxies);
   FAIL_IF_NULL(pyresult);
@@ -405,12 +617,13 @@ JsMethod_Vectorcall_impl(JsVal func,
 finally:
   Py_LeaveRecursiveCall(/* " in JsMethod_Vectorcall" */);
   if (!success) {
-
-    if (!JsvError_Check(jsresult) && pyproxy_Check(jsresult)) {
-      // TODO: don't destroy proxies with roundtrip = true?
-      JsvArray_Push(proxies, jsresult);
+    if (!JsvError_Check(proxies)) {
+      if (!JsvError_Check(jsresult) && pyproxy_Check(jsresult)) {
+        // TODO: don't destroy proxies with roundtrip = true?
+        JsvArray_Push(proxies, jsresult);
+      }
+      destroy_proxies(proxies, &PYPROXY_DESTROYED_AT_END_OF_FUNCTION_CALL);
     }
-    destroy_proxies(proxies, &PYPROXY_DESTROYED_AT_END_OF_FUNCTION_CALL);
     Py_CLEAR(pyresult);
   }
   Py_CLEAR(call_sig);
@@ -426,15 +639,26 @@ JsMethod_Construct_impl(JsVal func,
 {
   bool success = false;
   PyObject* pyresult = NULL;
-  JsVal proxies = JsvArray_New();
+  JsVal proxies = JS_ERROR;
 
   // Recursion error?
   FAIL_IF_NONZERO(Py_EnterRecursiveCall(" in JsMethod_Construct"));
 
-  JsVal jsargs = JsMethod_ConvertArgs(
-    (JsFuncSignature*)default_signature, pyargs, nargs, kwnames, proxies);
-  FAIL_IF_JS_ERROR(jsargs);
-  JsVal jsresult = JsvFunction_Construct(func, jsargs);
+  JsVal jsresult = Jsv_novalue;
+  if (kwnames == NULL || PyTuple_GET_SIZE(kwnames) == 0) {
+    jsresult = JsMethod_CallSimple(
+      func, Jsv_undefined, true, pyargs, PyVectorcall_NARGS(nargs));
+  }
+  if (JsvNoValue_Check(jsresult)) {
+    JsVal jsargs = call_args_acquire();
+    proxies = JsMethod_ConvertArgs(
+      (JsFuncSignature*)default_signature, pyargs, nargs, kwnames, jsargs);
+    FAIL_IF_JS_ERROR(proxies);
+    if (JsvNoValue_Check(proxies)) {
+      proxies = JS_ERROR;
+    }
+    jsresult = call_pooled_args(func, Jsv_undefined, jsargs, true);
+  }
   FAIL_IF_JS_ERROR(jsresult);
   pyresult = js2python(jsresult);
   FAIL_IF_NULL(pyresult);
@@ -445,7 +669,9 @@ finally:
   Js_static_string(msg,
                    "This borrowed proxy was automatically destroyed. Try using "
                    "create_proxy or create_once_callable.");
-  destroy_proxies(proxies, &msg);
+  if (!JsvError_Check(proxies)) {
+    destroy_proxies(proxies, &msg);
+  }
   if (!success) {
     Py_CLEAR(pyresult);
   }
@@ -455,6 +681,7 @@ finally:
 int
 jsproxy_call_init(PyObject* core_mod)
 {
+  jsproxy_call_init_js();
   FAIL_IF_MINUS_ONE(PyType_Ready(&JsFuncSignatureType));
   FAIL_IF_MINUS_ONE(PyObject_SetAttrString(
     core_mod, "JsFuncSignature", (PyObject*)&JsFuncSignatureType));
@@ -43,6 +43,7 @@ _Py_IDENTIFIER(pop);
 _Py_IDENTIFIER(ensure_future);
 _Py_IDENTIFIER(add_done_callback);
 _Py_IDENTIFIER(asend);
+_Py_IDENTIFIER(__sizeof__);
 _Py_IDENTIFIER(throw);
 _Py_IDENTIFIER(athrow);
 
@@ -68,6 +69,15 @@ EM_JS(void, destroy_proxies, (JsVal proxies, Js_Identifier* msg_ptr), {
   }
 });
 
+// Like destroy_proxies but array may also contain values that aren't proxies.
+EM_JS(void, destroy_proxies_in_array, (JsVal array), {
+  for (let v of array) {
+    if (API.isPyProxy(v)) {
+      Module.pyproxy_destroy(v, undefined, false);
+    }
+  }
+});
+
 EM_JS(void, gc_register_proxies, (JsVal proxies), {
   for (let px of proxies) {
     Module.gc_register_proxy(Module.PyProxy_getAttrs(px).shared);
@@ -389,6 +399,27 @@ _pyproxy_type(PyObject* ptrobj)
   return JsvUTF8ToString(Py_TYPE(ptrobj)->tp_name);
 }
 
+/**
+ * The size of the object itself in bytes from `obj.__sizeof__()`, not counting
+ * the objects it refers to. Returns -1 if `__sizeof__` fails. Used by
+ * API.pyproxyLifetimeReport.
+ */
+EMSCRIPTEN_KEEPALIVE Py_ssize_t
+_pyproxy_sizeof(PyObject* ptrobj)
+{
+  Py_ssize_t result = -1;
+  PyObject* pysize =
+    _PyObject_CallMethodIdObjArgs(ptrobj, &PyId___sizeof__, NULL);
+  if (pysize) {
+    result = PyLong_AsSsize_t(pysize);
+    Py_DECREF(pysize);
+  }
+  if (result == -1) {
+    PyErr_Clear();
+  }
+  return result;
+}
+
 EMSCRIPTEN_KEEPALIVE int
 _pyproxy_hasattr(PyObject* pyobj, JsVal jskey)
 {
@@ -592,6 +623,46 @@ finally:
   return result;
 };
 
+/**
+ * Shallow copy a sequence into a new JS array with one call. For lists and
+ * tuples this reads the items straight out of the object, other sequences are
+ * iterated once.
+ */
+EMSCRIPTEN_KEEPALIVE JsVal
+_pyproxy_sequence_to_array(PyObject* pyobj,
+                           JsVal proxyCache,
+                           bool is_json_adaptor)
+{
+  bool success = false;
+  PyObject* fast = NULL;
+  JsVal result = JS_ERROR;
+
+  fast = PySequence_Fast(pyobj, "expected a sequence");
+  FAIL_IF_NULL(fast);
+  result = JsvArray_New();
+  // Creating a PyProxy can run __getattr__ which could change a list, so
+  // recheck the size and hold a reference to the item while converting it.
+  for (Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(fast); i++) {
+    PyObject* item = Py_NewRef(PySequence_Fast_GET_ITEM(fast, i));
+    JsVal value = python2js_json_adaptor(item, proxyCache, is_json_adaptor);
+    Py_DECREF(item);
+    FAIL_IF_JS_ERROR(value);
+    JsvArray_Push(result, value);
+  }
+
+  success = true;
+finally:
+  Py_CLEAR(fast);
+  if (!success) {
+    // Json adaptors are cached in proxyCache and destroyed with the root.
+    if (!JsvError_Check(result) && !is_json_adaptor) {
+      destroy_proxies_in_array(result);
+    }
+    return JS_ERROR;
+  }
+  return result;
+}
+
 EMSCRIPTEN_KEEPALIVE int
 _pyproxy_setitem(PyObject* pyobj, JsVal jskey, JsVal jsval)
 {
@@ -812,6 +883,34 @@ finally:
   return result;
 }
 
+/**
+ * A faster version of _pyproxy_apply for callPyObjectFast which has already
+ * converted the positional arguments. pyargs has a free slot in front of it
+ * for PY_VECTORCALL_ARGUMENTS_OFFSET. We steal the references to the arguments.
+ * A NULL argument means its conversion failed and the error is set.
+ */
+EMSCRIPTEN_KEEPALIVE JsVal
+_pyproxy_vectorcall(PyObject* callable, PyObject** pyargs, size_t nargs)
+{
+  PyObject* pyresult = NULL;
+  JsVal result = JS_ERROR;
+
+  for (size_t i = 0; i < nargs; i++) {
+    FAIL_IF_NULL(pyargs[i]);
+  }
+  pyresult = _PyObject_Vectorcall(
+    callable, pyargs, nargs | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+  FAIL_IF_NULL(pyresult);
+  result = python2js(pyresult);
+
+finally:
+  for (size_t i = 0; i < nargs; i++) {
+    Py_XDECREF(pyargs[i]);
+  }
+  Py_CLEAR(pyresult);
+  return result;
+}
+
 void
 set_suspender(JsVal suspender);
 
@@ -874,16 +973,116 @@ _iscoroutinefunction(PyObject* f)
   return ret;
 }
 
-EMSCRIPTEN_KEEPALIVE JsVal
-_pyproxy_iter_next(PyObject* iterator, JsVal proxyCache, bool is_json_adaptor)
+/**
+ * Convert up to max items from iterator and push them onto the JS array
+ * buffer, so that iterating from JavaScript only has to cross into Python once
+ * per chunk.
+ *
+ * Returns the number of items pushed. If this is less than max, either the
+ * iterator is exhausted or an error is set.
+ */
+EMSCRIPTEN_KEEPALIVE int
+_pyproxy_iter_fill(PyObject* iterator,
+                   JsVal proxyCache,
+                   bool is_json_adaptor,
+                   int max,
+                   JsVal buffer)
 {
-  PyObject* item = PyIter_Next(iterator);
-  if (item == NULL) {
-    return JS_ERROR;
+  int count = 0;
+  while (count < max) {
+    PyObject* item = PyIter_Next(iterator);
+    if (item == NULL) {
+      break;
+    }
+    JsVal value = python2js_json_adaptor(item, proxyCache, is_json_adaptor);
+    Py_CLEAR(item);
+    if (JsvError_Check(value)) {
+      break;
+    }
+    JsvArray_Push(buffer, value);
+    count++;
   }
-  JsVal result = python2js_json_adaptor(item, proxyCache, is_json_adaptor);
-  Py_CLEAR(item);
-  return result;
+  return count;
+}
+
+/**
+ * Start reading ahead in a list. Returns NULL without an error set if obj
+ * isn't exactly a list.
+ *
+ * The state is a list [list, chunk] where chunk holds the items of the last
+ * chunk passed to JavaScript. It keeps them alive, so that
+ * _pyproxy_list_item_is can compare them with the list by identity.
+ */
+EMSCRIPTEN_KEEPALIVE PyObject*
+_pyproxy_list_iter_state(PyObject* obj)
+{
+  if (!PyList_CheckExact(obj)) {
+    return NULL;
+  }
+  return Py_BuildValue("[OO]", obj, Py_None);
+}
+
+/**
+ * Convert up to max items of the list starting at index start and push them
+ * onto the JS array buffer, like _pyproxy_iter_fill.
+ *
+ * Returns the number of items pushed or -1 on error.
+ */
+EMSCRIPTEN_KEEPALIVE int
+_pyproxy_list_fill(PyObject* state,
+                   Py_ssize_t start,
+                   JsVal proxyCache,
+                   bool is_json_adaptor,
+                   int max,
+                   JsVal buffer)
+{
+  PyObject* list = PyList_GET_ITEM(state, 0);
+  PyObject* chunk = PyList_GetSlice(list, start, start + max);
+  if (chunk == NULL) {
+    return -1;
+  }
+  PyObject* prev = PyList_GET_ITEM(state, 1);
+  PyList_SET_ITEM(state, 1, chunk);
+  Py_DECREF(prev);
+  Py_ssize_t count = PyList_GET_SIZE(chunk);
+  for (Py_ssize_t i = 0; i < count; i++) {
+    JsVal value = python2js_json_adaptor(
+      PyList_GET_ITEM(chunk, i), proxyCache, is_json_adaptor);
+    if (JsvError_Check(value)) {
+      return -1;
+    }
+    JsvArray_Push(buffer, value);
+  }
+  return count;
+}
+
+/**
+ * Is item pos of the last chunk still at index in the list? If not, the list
+ * was changed since the chunk was read.
+ */
+EMSCRIPTEN_KEEPALIVE bool
+_pyproxy_list_item_is(PyObject* state, Py_ssize_t index, Py_ssize_t pos)
+{
+  PyObject* list = PyList_GET_ITEM(state, 0);
+  PyObject* chunk = PyList_GET_ITEM(state, 1);
+  return index < PyList_GET_SIZE(list) &&
+         PyList_GET_ITEM(list, index) == PyList_GET_ITEM(chunk, pos);
+}
+
+/**
+ * Is it safe to read ahead when iterating obj? True for the builtin immutable
+ * containers, whose iterators have no side effects and always produce the same
+ * items. Lists are handled by _pyproxy_list_fill. A dict or set might be
+ * changed by the loop body and other
+ * iterables might do work in __iter__ / __next__ that has to happen when
+ * JavaScript asks for the next item.
+ */
+EMSCRIPTEN_KEEPALIVE bool
+_pyproxy_iter_can_read_ahead(PyObject* obj)
+{
+  return PyTuple_CheckExact(obj) || PyFrozenSet_CheckExact(obj) ||
+         PyUnicode_CheckExact(obj) || PyBytes_CheckExact(obj) ||
+         PyRange_Check(obj);
 }
 
 EM_JS(JsVal, _pyproxyGen_make_result, (bool done, JsVal value), {
@@ -1219,8 +1418,8 @@ FutureDoneCallback_cnew(JsVal resolve_handle, JsVal reject_handle)
   FutureDoneCallback* self =
     (FutureDoneCallback*)FutureDoneCallbackType.tp_alloc(
       &FutureDoneCallbackType, 0);
-  self->resolve_handle = hiwire_new(resolve_handle);
-  self->reject_handle = hiwire_new(reject_handle);
+  self->resolve_handle = JsRef_new(resolve_handle);
+  self->reject_handle = JsRef_new(reject_handle);
   return (PyObject*)self;
 }
 
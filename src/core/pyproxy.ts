@@ -72,7 +72,10 @@ declare var globalThis: any;
 
 if (globalThis.FinalizationRegistry) {
   Module.finalizationRegistry = new FinalizationRegistry(
-    ({ ptr, cache }: PyProxyShared) => {
+    ({ ptr, cache, profileId }: PyProxyShared) => {
+      if (profileId) {
+        lifetimeRecords.delete(profileId);
+      }
       if (cache) {
         // If we leak a proxy, we must transitively leak everything in its cache
         // too =(
@@ -126,6 +129,136 @@ Module.disable_pyproxy_allocation_tracing = function () {
 };
 Module.disable_pyproxy_allocation_tracing();
 
+// Opt-in lifetime profiling for finding leaked PyProxies in a running program,
+// see API.pyproxyTraceLifetimes. Unlike the allocation tracing above, this
+// doesn't keep the proxies alive.
+type PyProxyLifetimeRecord = {
+  ptr: number;
+  type: string;
+  // The stack where the proxy was made, if it was sampled.
+  site: string | undefined;
+  created: number;
+};
+let lifetimeSampleRate = 0;
+let lifetimeUntilNextSample = 0;
+let lifetimeNextId = 1;
+const lifetimeRecords: Map<number, PyProxyLifetimeRecord> = new Map();
+
+function trace_pyproxy_lifetime(shared: PyProxyShared) {
+  let site;
+  if (--lifetimeUntilNextSample <= 0) {
+    lifetimeUntilNextSample = lifetimeSampleRate;
+    // Drop the "Error" line, the rest is the stack.
+    const stack = new Error().stack ?? "";
+    site = stack.slice(stack.indexOf("\n") + 1);
+  }
+  shared.profileId = lifetimeNextId++;
+  lifetimeRecords.set(shared.profileId, {
+    ptr: shared.ptr,
+    type: __pyproxy_type(shared.ptr),
+    site,
+    created: performance.now(),
+  });
+}
+
+/**
+ * Start or stop recording the Python type, creation time and (sampled)
+ * creation stack of every PyProxy. Proxies made while recording is on are
+ * reported by :js:func:`pyproxyLifetimeReport` until they are destroyed or
+ * garbage collected.
+ *
+ * @param sampleRate Record the creation stack of one in every ``sampleRate``
+ *    proxies. ``0`` stops recording and forgets the recorded proxies.
+ * @private
+ */
+API.pyproxyTraceLifetimes = function (sampleRate: number) {
+  if (!Number.isInteger(sampleRate) || sampleRate < 0) {
+    throw new TypeError("sampleRate should be a nonnegative integer");
+  }
+  lifetimeSampleRate = sampleRate;
+  lifetimeUntilNextSample = 0;
+  if (!sampleRate) {
+    lifetimeRecords.clear();
+  }
+};
+
+type PyProxyLifetimeGroup = {
+  key: string;
+  count: number;
+  /** The total size in bytes from ``__sizeof__`` */
+  size: number;
+  /** The age in milliseconds of the oldest proxy */
+  oldest: number;
+};
+
+/**
+ * Report on the live PyProxies recorded since :js:func:`pyproxyTraceLifetimes`
+ * was turned on.
+ *
+ * Sizes come from ``__sizeof__`` so they count the proxied objects but not the
+ * objects they refer to.
+ *
+ * @param options.top How many types and sites to report
+ * @param options.sortBy Whether to put the types and sites with the most
+ *    proxies or the largest total size first
+ * @returns The number and total size of live proxies, the top Python types and
+ *    creation stacks, and every live proxy oldest first.
+ * @private
+ */
+API.pyproxyLifetimeReport = function ({
+  top = 10,
+  sortBy = "count",
+}: { top?: number; sortBy?: "count" | "size" } = {}) {
+  const now = performance.now();
+  const proxies = [];
+  const byType: Map<string, PyProxyLifetimeGroup> = new Map();
+  const bySite: Map<string, PyProxyLifetimeGroup> = new Map();
+  let totalSize = 0;
+  function add(
+    groups: Map<string, PyProxyLifetimeGroup>,
+    key: string,
+    size: number,
+    age: number,
+  ) {
+    let group = groups.get(key);
+    if (!group) {
+      group = { key, count: 0, size: 0, oldest: 0 };
+      groups.set(key, group);
+    }
+    group.count++;
+    group.size += size;
+    group.oldest = Math.max(group.oldest, age);
+  }
+  for (const { ptr, type, site, created } of lifetimeRecords.values()) {
+    let size = 0;
+    try {
+      Py_ENTER();
+      size = Math.max(__pyproxy_sizeof(ptr), 0);
+      Py_EXIT();
+    } catch (e) {
+      API.fatal_error(e);
+    }
+    const age = now - created;
+    totalSize += size;
+    proxies.push({ type, site, age, size });
+    add(byType, type, size, age);
+    if (site !== undefined) {
+      add(bySite, site, size, age);
+    }
+  }
+  const topGroups = (groups: Map<string, PyProxyLifetimeGroup>) =>
+    Array.from(groups.values())
+      .sort((a, b) => b[sortBy] - a[sortBy])
+      .slice(0, top);
+  return {
+    count: proxies.length,
+    size: totalSize,
+    byType: topGroups(byType),
+    bySite: topGroups(bySite),
+    proxies: proxies.sort((a, b) => b.age - a.age),
+  };
+};
+
 type PyProxyCache = {
   map: Map<string, any>;
   json_adaptor_map: Map<string, any>;
@@ -139,6 +272,8 @@ type PyProxyShared = {
   promise: Promise<any> | undefined;
   destroyed_msg: string | undefined;
   gcRegistered: boolean;
+  // Set if pyproxyTraceLifetimes is recording this proxy.
+  profileId?: number;
 };
 type PyProxyProps = {
   /**
@@ -284,10 +419,17 @@ function pyproxy_new(
     handlers = PyProxySequenceHandlers;
   } else if (is_dict) {
     handlers = PyProxyDictHandlers;
+  } else if (flags & IS_CALLABLE && !props.captureThis && !props.isBound) {
+    // Calls never need to adjust the arguments so they can skip apply().
+    handlers = PyProxyFastCallHandlers;
   } else {
     handlers = PyProxyHandlers;
   }
   let proxy = new Proxy(target, handlers);
+  if (!isAlias && lifetimeSampleRate) {
+    // Before gc_register_proxy so that the finalizer knows the profileId.
+    trace_pyproxy_lifetime(shared);
+  }
   if (!isAlias && gcRegister) {
     // we need to register only once for a set of aliases. we can't register the
     // proxy directly since that isn't shared between aliases. The aliases all
@@ -310,8 +452,8 @@ function gc_register_proxy(shared: PyProxyShared) {
   // Originally this said shared_copy = Object.assign({}, shared) but this
   // version is 100 times faster. Bizarrely, that call to Object.assign
   // accounted for over 20% of PyProxy creation time.
-  const { ptr, cache } = shared;
-  const shared_copy = { ptr, cache };
+  const { ptr, cache, profileId } = shared;
+  const shared_copy = { ptr, cache, profileId };
   shared.gcRegistered = true;
   Module.finalizationRegistry.register(shared, shared_copy, shared);
 }
@@ -499,6 +641,9 @@ Module.pyproxy_destroy = function (
   if (shared.gcRegistered) {
     Module.finalizationRegistry.unregister(shared);
   }
+  if (shared.profileId) {
+    lifetimeRecords.delete(shared.profileId);
+  }
   pyproxy_decref_cache(shared.cache);
 
   try {
@@ -514,6 +659,20 @@ Module.pyproxy_destroy = function (
 // Now a lot of boilerplate to wrap the abstract Object protocol wrappers
 // defined in pyproxy.c in JavaScript functions.
 
+/**
+ * Automatically schedule coroutines returned by async functions.
+ */
+function ensureFutureIfCoroutine(ptrobj: number, result: any) {
+  if (result && result.type === "coroutine" && result._ensure_future) {
+    Py_ENTER();
+    const is_coroutine = __iscoroutinefunction(ptrobj);
+    Py_EXIT();
+    if (is_coroutine) {
+      result._ensure_future();
+    }
+  }
+}
+
 function callPyObjectKwargs(ptrobj: number, jsargs: any[], kwargs: any) {
   // We don't do any checking for kwargs, checks are in PyProxy.callKwargs
   // which only is used when the keyword arguments come from the user.
@@ -541,15 +700,55 @@ function callPyObjectKwargs(ptrobj: number, jsargs: any[], kwargs: any) {
   if (result === Module.error) {
     _pythonexc2js();
   }
-  // Automatically schedule coroutines
-  if (result && result.type === "coroutine" && result._ensure_future) {
+  ensureFutureIfCoroutine(ptrobj, result);
+  return result;
+}
+
+const FAST_CALL_MAX_ARGS = 8;
+
+function isFastCallArg(arg: any): boolean {
+  const type = typeof arg;
+  return (
+    type === "number" || type === "string" || type === "boolean" || arg == null
+  );
+}
+
+/**
+ * A faster callPyObject for calls with only a few positional numbers, strings,
+ * booleans, undefined or null. These are converted straight into an array of
+ * Python objects on the wasm stack and passed to vectorcall, instead of going
+ * through __pyproxy_apply which reads each one back out of a JavaScript array.
+ * Anything else goes to callPyObjectKwargs.
+ */
+function callPyObjectFast(ptrobj: number, jsargs: any[]) {
+  const nargs = jsargs.length;
+  if (nargs > FAST_CALL_MAX_ARGS || !jsargs.every(isFastCallArg)) {
+    return callPyObjectKwargs(ptrobj, jsargs, {});
+  }
+  const stackTop = stackSave();
+  let result;
+  try {
     Py_ENTER();
-    const is_coroutine = __iscoroutinefunction(ptrobj);
-    Py_EXIT();
-    if (is_coroutine) {
-      result._ensure_future();
+    // Leave a free slot in front for PY_VECTORCALL_ARGUMENTS_OFFSET.
+    const pyargs = stackAlloc(4 * (nargs + 1)) + 4;
+    for (let i = 0; i < nargs; i++) {
+      // A failed conversion gives 0 and __pyproxy_vectorcall raises the error.
+      HEAPU32[(pyargs >> 2) + i] = Module.js2python_convertImmutableInner(
+        jsargs[i],
+      );
     }
+    result = __pyproxy_vectorcall(ptrobj, pyargs, nargs);
+    Py_EXIT();
+  } catch (e) {
+    API.maybe_fatal_error(e);
+    return;
+  } finally {
+    stackRestore(stackTop);
+  }
+  if (result === Module.error) {
+    _pythonexc2js();
   }
+  ensureFutureIfCoroutine(ptrobj, result);
   return result;
 }
 
@@ -619,15 +818,7 @@ async function callPyObjectKwargsPromising(
       stackRestore(stackTop);
     }
   }
-  // Automatically schedule coroutines
-  if (result && result.type === "coroutine" && result._ensure_future) {
-    Py_ENTER();
-    const is_coroutine = __iscoroutinefunction(ptrobj);
-    Py_EXIT();
-    if (is_coroutine) {
-      result._ensure_future();
-    }
-  }
+  ensureFutureIfCoroutine(ptrobj, result);
   return result;
 }
 
@@ -1078,6 +1269,15 @@ export class PyContainsMethods {
   }
 }
 
+// Iterating from JavaScript pulls items out of Python in chunks. The chunks
+// start small so that loops which stop early don't convert much more than
+// they use, and grow while the loop keeps going. Items that are converted to
+// PyProxies are more expensive and stay alive until the iteration ends, so
+// they get smaller chunks.
+const MIN_ITER_CHUNK_SIZE = 16;
+const MAX_ITER_CHUNK_SIZE = 1024;
+const MAX_PROXY_ITER_CHUNK_SIZE = 64;
+
 /**
  * A helper for [Symbol.iterator].
  *
@@ -1098,22 +1298,50 @@ function* iter_helper(
   token: {},
   proxyCache: Map<string, any>,
   is_json_adaptor: boolean,
+  readAhead: boolean,
 ): Generator<any> {
   const to_destroy = [];
+  const buffer: any[] = [];
+  let pos = 0;
+  let chunkSize = readAhead ? MIN_ITER_CHUNK_SIZE : 1;
   try {
     while (true) {
+      buffer.length = 0;
+      pos = 0;
       Py_ENTER();
-      const item = __pyproxy_iter_next(iterptr, proxyCache, is_json_adaptor);
+      const count = __pyproxy_iter_fill(
+        iterptr,
+        proxyCache,
+        is_json_adaptor,
+        chunkSize,
+        buffer,
+      );
       Py_EXIT();
-      if (item === Module.error) {
+      if (count < chunkSize && _PyErr_Occurred()) {
+        // Raise the error without handing out the items before it. The
+        // buffered items are destroyed in the finally block.
         break;
       }
-      yield item;
-      // If it's a json adaptor, we cached the result so we don't need to
-      // destroy it (they'll get destroyed when we destroy the root).
-      // This is necessary to get JSON.stringify to work correctly.
-      if (!is_json_adaptor && API.isPyProxy(item)) {
-        to_destroy.push(item);
+      let sawProxy = false;
+      while (pos < count) {
+        const item = buffer[pos++];
+        yield item;
+        // If it's a json adaptor, we cached the result so we don't need to
+        // destroy it (they'll get destroyed when we destroy the root).
+        // This is necessary to get JSON.stringify to work correctly.
+        if (!is_json_adaptor && API.isPyProxy(item)) {
+          to_destroy.push(item);
+          sawProxy = true;
+        }
+      }
+      if (count < chunkSize) {
+        break;
+      }
+      if (readAhead) {
+        chunkSize = Math.min(
+          2 * chunkSize,
+          sawProxy ? MAX_PROXY_ITER_CHUNK_SIZE : MAX_ITER_CHUNK_SIZE,
+        );
       }
     }
   } catch (e) {
@@ -1121,6 +1349,110 @@ function* iter_helper(
   } finally {
     Module.finalizationRegistry.unregister(token);
     _Py_DecRef(iterptr);
+    // If the loop stopped early, destroy the proxies we read ahead but never
+    // handed out.
+    destroy_unused(buffer, pos, is_json_adaptor);
+  }
+  try {
+    to_destroy.forEach((e) =>
+      Module.pyproxy_destroy(
+        e,
+        "This borrowed proxy was automatically destroyed when an iterator was exhausted.",
+      ),
+    );
+  } catch (e) {}
+  if (_PyErr_Occurred()) {
+    _pythonexc2js();
+  }
+}
+
+/**
+ * Destroy the proxies in buffer from pos on, which were read ahead but not
+ * handed out. Json adaptors are cached and destroyed with the root.
+ */
+function destroy_unused(buffer: any[], pos: number, is_json_adaptor: boolean) {
+  if (is_json_adaptor) {
+    return;
+  }
+  for (const item of buffer.slice(pos)) {
+    if (API.isPyProxy(item)) {
+      item.destroy();
+    }
+  }
+}
+
+/**
+ * Like iter_helper, for a list.
+ *
+ * The loop body can change the list, and then the items we read ahead are out
+ * of date. So before handing out an item we check that it is still at the same
+ * index in the list. If not we read again from there, like the list iterator
+ * which yields whatever is at the next index.
+ */
+function* list_iter_helper(
+  state: number,
+  token: {},
+  proxyCache: Map<string, any>,
+  is_json_adaptor: boolean,
+): Generator<any> {
+  const to_destroy = [];
+  const buffer: any[] = [];
+  let pos = 0;
+  let index = 0;
+  let chunkSize = MIN_ITER_CHUNK_SIZE;
+  try {
+    while (true) {
+      destroy_unused(buffer, pos, is_json_adaptor);
+      buffer.length = 0;
+      pos = 0;
+      Py_ENTER();
+      const count = __pyproxy_list_fill(
+        state,
+        index,
+        proxyCache,
+        is_json_adaptor,
+        chunkSize,
+        buffer,
+      );
+      Py_EXIT();
+      if (count === -1) {
+        break;
+      }
+      let sawProxy = false;
+      let changed = false;
+      while (pos < count) {
+        // The first item was just read at index, so it is the one the list
+        // iterator would produce even if converting the chunk changed the
+        // list.
+        if (pos > 0 && !__pyproxy_list_item_is(state, index, pos)) {
+          changed = true;
+          break;
+        }
+        const item = buffer[pos++];
+        index++;
+        yield item;
+        if (!is_json_adaptor && API.isPyProxy(item)) {
+          to_destroy.push(item);
+          sawProxy = true;
+        }
+      }
+      // Even if the chunk was short, the loop body may have added items.
+      if (count === 0) {
+        break;
+      }
+      if (!changed && count === chunkSize) {
+        chunkSize = Math.min(
+          2 * chunkSize,
+          sawProxy ? MAX_PROXY_ITER_CHUNK_SIZE : MAX_ITER_CHUNK_SIZE,
+        );
+      }
+    }
+  } catch (e) {
+    API.fatal_error(e);
+  } finally {
+    Module.finalizationRegistry.unregister(token);
+    _Py_DecRef(state);
+    destroy_unused(buffer, pos, is_json_adaptor);
   }
   try {
     to_destroy.forEach((e) =>
@@ -1165,6 +1497,28 @@ export class PyIterableMethods {
   [Symbol.iterator](): Iterator<any, any, any> {
     const { shared } = _getAttrs(this);
     let token = {};
+    let state;
+    try {
+      Py_ENTER();
+      state = __pyproxy_list_iter_state(shared.ptr);
+      Py_EXIT();
+    } catch (e) {
+      API.fatal_error(e);
+    }
+    if (state) {
+      // Cache is only used if isJsonAdaptor is true.
+      const result = list_iter_helper(
+        state,
+        token,
+        shared.cache.json_adaptor_map,
+        isJsonAdaptor(this),
+      );
+      Module.finalizationRegistry.register(result, [state, undefined], token);
+      return result;
+    }
+    if (_PyErr_Occurred()) {
+      _pythonexc2js();
+    }
     let iterptr;
     try {
       Py_ENTER();
@@ -1183,6 +1537,7 @@ export class PyIterableMethods {
       token,
       shared.cache.json_adaptor_map,
       isJsonAdaptor(this),
+      !!__pyproxy_iter_can_read_ahead(shared.ptr),
     );
     Module.finalizationRegistry.register(result, [iterptr, undefined], token);
     return result;
@@ -1610,6 +1965,47 @@ function defaultCompareFunc(a: any, b: any): number {
 
 // Missing:
 // flatMap, flat,
+/**
+ * Copy the items of a sequence into a JavaScript array with one call into
+ * Python. The array methods below loop over this copy instead of indexing the
+ * proxy, which would call __getitem__ for each index.
+ */
+function sequenceToArray(proxy: any): any[] {
+  const { shared } = _getAttrs(proxy);
+  let result;
+  try {
+    Py_ENTER();
+    result = __pyproxy_sequence_to_array(
+      shared.ptr,
+      shared.cache.json_adaptor_map,
+      isJsonAdaptor(proxy),
+    );
+    Py_EXIT();
+  } catch (e) {
+    API.fatal_error(e);
+  }
+  if (result === Module.error) {
+    _pythonexc2js();
+  }
+  return result;
+}
+
+/**
+ * Destroy the proxies in items from index start on. Used when a method stops
+ * early so the callback never saw them.
+ */
+function destroyUnvisited(proxy: any, items: any[], start: number) {
+  if (isJsonAdaptor(proxy)) {
+    // These are cached and get destroyed with the root
+    return;
+  }
+  for (let i = start; i < items.length; i++) {
+    if (API.isPyProxy(items[i])) {
+      items[i].destroy();
+    }
+  }
+}
+
 export class PySequenceMethods {
   /** @hidden */
   get [Symbol.isConcatSpreadable]() {
@@ -1674,8 +2070,14 @@ export class PySequenceMethods {
    * return value is discarded.
    * @param thisArg A value to use as ``this`` when executing ``callbackFn``.
    */
-  forEach(callbackfn: (elt: any) => void, thisArg?: any) {
-    Array.prototype.forEach.call(this, callbackfn, thisArg);
+  forEach(
+    callbackfn: (elt: any, index: number, array: any) => void,
+    thisArg?: any,
+  ) {
+    const items = sequenceToArray(this);
+    for (let i = 0; i < items.length; i++) {
+      callbackfn.call(thisArg, items[i], i, this);
+    }
   }
   /**
    * See :js:meth:`Array.map`. Creates a new array populated with the results of
@@ -1688,8 +2090,9 @@ export class PySequenceMethods {
     callbackfn: (elt: any, index: number, array: any) => U,
     thisArg?: any,
   ): U[] {
-    // @ts-ignore
-    return Array.prototype.map.call(this, callbackfn, thisArg);
+    return sequenceToArray(this).map((elt, i) =>
+      callbackfn.call(thisArg, elt, i, this),
+    );
   }
   /**
    * See :js:meth:`Array.filter`. Creates a shallow copy of a portion of a given
@@ -1704,7 +2107,9 @@ export class PySequenceMethods {
     predicate: (elt: any, index: number, array: any) => boolean,
     thisArg?: any,
   ) {
-    return Array.prototype.filter.call(this, predicate, thisArg);
+    return sequenceToArray(this).filter((elt, i) =>
+      predicate.call(thisArg, elt, i, this),
+    );
   }
   /**
    * See :js:meth:`Array.some`. Tests whether at least one element in the
@@ -1718,7 +2123,18 @@ export class PySequenceMethods {
     predicate: (value: any, index: number, array: any[]) => unknown,
     thisArg?: any,
   ): boolean {
-    return Array.prototype.some.call(this, predicate, thisArg);
+    const items = sequenceToArray(this);
+    let i = 0;
+    try {
+      for (; i < items.length; i++) {
+        if (predicate.call(thisArg, items[i], i, this)) {
+          return true;
+        }
+      }
+      return false;
+    } finally {
+      destroyUnvisited(this, items, i + 1);
+    }
   }
   /**
    * See :js:meth:`Array.every`. Tests whether every element in the ``Sequence``
@@ -1732,7 +2148,18 @@ export class PySequenceMethods {
     predicate: (value: any, index: number, array: any[]) => unknown,
     thisArg?: any,
   ): boolean {
-    return Array.prototype.every.call(this, predicate, thisArg);
+    const items = sequenceToArray(this);
+    let i = 0;
+    try {
+      for (; i < items.length; i++) {
+        if (!predicate.call(thisArg, items[i], i, this)) {
+          return false;
+        }
+      }
+      return true;
+    } finally {
+      destroyUnvisited(this, items, i + 1);
+    }
   }
   /**
    * See :js:meth:`Array.reduce`. Executes a user-supplied "reducer" callback
@@ -1752,8 +2179,10 @@ export class PySequenceMethods {
     initialValue?: any,
   ): any;
   reduce(...args: any[]) {
+    const callbackfn = args[0];
+    args[0] = (acc: any, elt: any, i: number) => callbackfn(acc, elt, i, this);
     // @ts-ignore
-    return Array.prototype.reduce.apply(this, args);
+    return Array.prototype.reduce.apply(sequenceToArray(this), args);
   }
   /**
    * See :js:meth:`Array.reduceRight`. Applies a function against an accumulator
@@ -1772,8 +2201,10 @@ export class PySequenceMethods {
     initialValue: any,
   ): any;
   reduceRight(...args: any[]) {
+    const callbackfn = args[0];
+    args[0] = (acc: any, elt: any, i: number) => callbackfn(acc, elt, i, this);
     // @ts-ignore
-    return Array.prototype.reduceRight.apply(this, args);
+    return Array.prototype.reduceRight.apply(sequenceToArray(this), args);
   }
   /**
    * See :js:meth:`Array.at`. Takes an integer value and returns the item at
@@ -1864,6 +2295,23 @@ export class PySequenceMethods {
     return Array.prototype.findIndex.call(this, predicate, thisArg);
   }
 
+  /**
+   * Copy the elements of the ``Sequence`` into a new array. This is a shallow
+   * copy: each element is converted the same way as when indexing the
+   * ``Sequence``. It needs a single call into Python, which is much faster than
+   * ``Array.from`` for long sequences.
+   *
+   * :js:meth:`~PySequence.forEach`, :js:meth:`~PySequence.map`,
+   * :js:meth:`~PySequence.filter`, :js:meth:`~PySequence.some`,
+   * :js:meth:`~PySequence.every`, :js:meth:`~PySequence.reduce` and
+   * :js:meth:`~PySequence.reduceRight` loop over such a copy, so they don't see
+   * changes the callback makes to the ``Sequence``.
+   * @returns A new array containing the elements of the ``Sequence``.
+   */
+  toArray(): any[] {
+    return sequenceToArray(this);
+  }
+
   toJSON(this: any) {
     return Array.from(this);
   }
@@ -2296,6 +2744,18 @@ const PyProxyHandlers = {
   },
 };
 
+/**
+ * Handlers for callables without captureThis or bound arguments. The engine
+ * already gives us a fresh array of the arguments and `this` is ignored, so we
+ * can pass them straight to callPyObjectFast.
+ */
+const PyProxyFastCallHandlers = {
+  ...PyProxyHandlers,
+  apply(jsobj: PyProxy & Function, jsthis: any, jsargs: any): any {
+    return callPyObjectFast(_getPtr(jsobj), jsargs);
+  },
+};
+
 function isPythonError(e: any): e is PythonError {
   return (
     e &&
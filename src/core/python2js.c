@@ -782,14 +782,14 @@ python2js_custom(PyObject* x,
                  JsVal eager_converter)
 {
   JsVal cache = JsvMap_New();
-  ConversionContext context = { .cache = hiwire_new(cache),
+  ConversionContext context = { .cache = JsRef_new(cache),
                                 .depth = depth,
                                 .proxies = JsRef_new(proxies),
                                 .jscontext = NULL,
                                 .default_converter = false,
                                 .eager_converter = false,
                                 .jspostprocess_list =
-                                  hiwire_new(JsvArray_New()) };
+                                  JsRef_new(JsvArray_New()) };
   if (JsvError_Check(dict_converter)) {
     // No custom converter provided, use default
     if (compat_dict_to_literalmap) {
@@ -813,7 +813,7 @@ python2js_custom(PyObject* x,
   }
   if (!JsvError_Check(dict_converter) || context.default_converter ||
       context.eager_converter) {
-    context.jscontext = hiwire_new(python2js_custom__create_jscontext(
+    context.jscontext = JsRef_new(python2js_custom__create_jscontext(
       &context, cache, dict_converter, default_converter, eager_converter));
   }
   JsVal result = _python2js(&context, x);
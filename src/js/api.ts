@@ -12,14 +12,27 @@ import { RUNTIME_ENV } from "./environments";
 // @ts-ignore
 import LiteralMap from "./common/literal-map";
 import abortSignalAny from "./common/abortSignalAny";
+import { strictJSONStringify } from "./common/strictJSON";
+import {
+  hiwireCheckpoint,
+  hiwireDiff,
+  hiwireRefStats,
+  hiwireTraceAllocations,
+} from "./hiwire-stats";
 import {
   makeGlobalsProxy,
   SnapshotConfig,
   syncUpSnapshotLoad1,
   syncUpSnapshotLoad2,
 } from "./snapshot";
+import { compressSnapshot } from "./snapshot-format";
 import { unpackArchiveMetadata } from "./constants";
-import { syncLocalToRemote, syncRemoteToLocal } from "./nativefs";
+import {
+  syncLocalToRemote,
+  syncRemoteToLocal,
+  populateLazily,
+  type SyncProgress,
+} from "./nativefs";
 
 // Exported for micropip
 API.loadBinaryFile = loadBinaryFile;
@@ -60,7 +73,9 @@ API.setCompatNullToNone = function (compat: boolean): void {
 
 /** @hidden */
 export type NativeFS = {
-  syncfs: () => Promise<void>;
+  syncfs: (options?: {
+    onProgress?: (progress: SyncProgress) => void;
+  }) => Promise<void>;
 };
 
 /** @private */
@@ -85,6 +100,21 @@ if (typeof AbortSignal !== "undefined" && AbortSignal.any) {
 
 API.LiteralMap = LiteralMap;
 
+// Used in pyodide.ffi.to_py_via_json
+/** @private */
+API.strictJSONStringify = (value: any) =>
+  strictJSONStringify(value, !!Module.HEAP8[Module._compat_null_to_none]);
+
+// Tools for finding leaked JsRefs, see hiwire-stats.ts
+/** @private */
+API.hiwireRefStats = hiwireRefStats;
+/** @private */
+API.hiwireTraceAllocations = hiwireTraceAllocations;
+/** @private */
+API.hiwireCheckpoint = hiwireCheckpoint;
+/** @private */
+API.hiwireDiff = hiwireDiff;
+
 function ensureMountPathExists(path: string): void {
   Module.FS.mkdirTree(path);
   const { node } = Module.FS.lookupPath(path, {
@@ -542,10 +572,22 @@ export class PyodideAPI_ {
    * @param fileSystemHandle A handle returned by
    * :js:func:`navigator.storage.getDirectory() <getDirectory>` or
    * :js:func:`window.showDirectoryPicker() <showDirectoryPicker>`.
+   * @param options
+   * @param options.lazy If ``true``, only the directory listing is read when
+   * mounting and the contents of each file are read when it is first opened.
+   * Unmodified file contents are dropped again when they take up more than
+   * ``memoryBudget`` bytes, least recently used first.
+   * @param options.memoryBudget How many bytes of unmodified file contents to
+   * keep in memory in lazy mode. Defaults to 256 MiB.
+   * @returns An object with a ``syncfs`` method that writes the changes back to
+   * the native directory. ``syncfs`` takes an optional ``onProgress`` callback
+   * which is called with the number of entries done, the total number of
+   * entries and the number of bytes copied so far.
    */
   static async mountNativeFS(
     path: string,
     fileSystemHandle: FileSystemDirectoryHandle,
+    options: { lazy?: boolean; memoryBudget?: number } = {},
     // TODO: support sync file system
     // sync: boolean = false
   ): Promise<NativeFS> {
@@ -556,18 +598,29 @@ export class PyodideAPI_ {
     }
     ensureMountPathExists(path);
 
-    Module.FS.mount(
+    const { mount } = Module.FS.mount(
       Module.FS.filesystems.NATIVEFS_ASYNC,
-      { fileSystemHandle },
+      { fileSystemHandle, memoryBudget: options.memoryBudget },
       path,
     );
 
-    // sync native ==> browser
-    await syncRemoteToLocal(Module);
+    if (options.lazy) {
+      await populateLazily(Module, path);
+    } else {
+      // sync native ==> browser
+      await syncRemoteToLocal(Module);
+    }
 
     return {
       // sync browser ==> native
-      syncfs: async () => await syncLocalToRemote(Module),
+      syncfs: async ({ onProgress } = {}) => {
+        mount.onProgress = onProgress;
+        try {
+          await syncLocalToRemote(Module);
+        } finally {
+          mount.onProgress = undefined;
+        }
+      },
     };
   }
 
@@ -672,19 +725,41 @@ export class PyodideAPI_ {
   }
 
   /**
+   * Make a memory snapshot of the current state. With ``base``, only store
+   * what changed since the base snapshot (followed by any deltas on top of
+   * it). The base snapshots have to be uncompressed, use
+   * ``_decompressSnapshot`` on compressed ones first.
    * @private
    */
+  static makeMemorySnapshot(options?: {
+    serializer?: (obj: any) => any;
+    compress?: false;
+    base?: Uint8Array | Uint8Array[];
+  }): Uint8Array;
+  static makeMemorySnapshot(options: {
+    serializer?: (obj: any) => any;
+    compress: true;
+    base?: Uint8Array | Uint8Array[];
+  }): Promise<Uint8Array>;
   static makeMemorySnapshot({
     serializer,
+    compress,
+    base,
   }: {
     serializer?: (obj: any) => any;
-  } = {}): Uint8Array {
+    compress?: boolean;
+    base?: Uint8Array | Uint8Array[];
+  } = {}): Uint8Array | Promise<Uint8Array> {
     if (!API.config._makeSnapshot) {
       throw new Error(
         "Can only use pyodide.makeMemorySnapshot if the _makeSnapshot option is passed to loadPyodide",
       );
     }
-    return API.makeSnapshot(serializer);
+    const snapshot = API.makeSnapshot(serializer, base);
+    if (compress) {
+      return compressSnapshot(snapshot);
+    }
+    return snapshot;
   }
 
   /**
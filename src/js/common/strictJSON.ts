@@ -0,0 +1,64 @@
+/**
+ * Serialize a value with `JSON.stringify`, but only if parsing the result with
+ * Python's `json.loads` gives the same thing as converting the value with
+ * `toPy`. This is the case for values made of booleans, strings, finite
+ * numbers, arrays and plain objects, and of `null` if `toPy` converts it to
+ * `None`.
+ *
+ * Used by `pyodide.ffi.to_py_via_json` to decide whether it can take the JSON
+ * fast path.
+ *
+ * @param value The value to serialize
+ * @param nullToNone Whether `toPy` converts `null` to `None` rather than
+ *    `jsnull`.
+ * @returns The JSON text, or `undefined` if the value contains anything else,
+ *    for instance `undefined`, a `Map`, a `Date`, a `NaN` or a cycle.
+ * @private
+ */
+export function strictJSONStringify(
+  value: any,
+  nullToNone: boolean = false,
+): string | undefined {
+  try {
+    return JSON.stringify(value, function (this: any, key: string, v: any) {
+      // `v` is the result of `toJSON`, check the original value instead.
+      const orig = this[key];
+      switch (typeof orig) {
+        case "string":
+        case "boolean":
+          return v;
+        case "number":
+          // JSON turns NaN and Infinity into null. Python parses integers
+          // without a fraction as int, toPy only makes safe integers an int.
+          if (
+            !Number.isFinite(orig) ||
+            (Number.isInteger(orig) && !Number.isSafeInteger(orig))
+          ) {
+            throw NOT_JSON;
+          }
+          return v;
+        case "object":
+          if (orig === null) {
+            if (nullToNone) {
+              return v;
+            }
+            break;
+          }
+          if (Array.isArray(orig)) {
+            return v;
+          }
+          const proto = Object.getPrototypeOf(orig);
+          if (proto === Object.prototype || proto === null) {
+            return v;
+          }
+      }
+      throw NOT_JSON;
+    });
+  } catch (e) {
+    // NOT_JSON, or a TypeError from a cycle. Either way the caller falls back
+    // to the recursive conversion.
+    return undefined;
+  }
+}
+
+const NOT_JSON = Symbol("NOT_JSON");
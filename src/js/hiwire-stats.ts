@@ -0,0 +1,156 @@
+/**
+ * Statistics about the hiwire reference table, for finding leaked JsRefs in a
+ * running program.
+ *
+ * C code holds on to JavaScript values through JsRefs, which are indices into
+ * the hiwire table. There are two kinds: immortal references made by
+ * `hiwire_intern` which live as long as the program, and heap references made
+ * by `JsRef_new` which are reference counted. (JsVals on the wasm stack are
+ * externrefs and don't go through hiwire at all.) A growing number of heap
+ * references is usually a leak.
+ *
+ * When allocation tracing is on, `JsRef_new` reports each new heap reference
+ * to `traceNew` which records the JavaScript stack of one in every
+ * `sampleRate` of them. Checkpoints count the sampled references that are
+ * still alive by stack.
+ */
+
+declare var Module: any;
+
+/** @private */
+export type HiwireRefStats = {
+  /** The number of immortal references. These are never freed. */
+  immortal: number;
+  /** The number of live heap references. */
+  heap: number;
+};
+
+/** @private */
+export type HiwireCheckpoint = HiwireRefStats & {
+  /**
+   * The number of sampled heap references that are still alive, by the stack
+   * where they were allocated. Empty if allocation tracing is off.
+   */
+  sites: Map<string, number>;
+};
+
+/** @private */
+export type HiwireDiff = HiwireRefStats & {
+  /** Growth in sampled references by allocation stack, largest first. */
+  sites: [site: string, count: number][];
+};
+
+let sampleRate = 0;
+let untilNextSample = 0;
+// Sampled references and the stack where they were allocated.
+const samples: Map<number, string> = new Map();
+
+/**
+ * Called by `hiwire_trace_new` for every new heap reference while allocation
+ * tracing is on.
+ */
+function traceNew(ref: number) {
+  // If ref was sampled before then it has been freed since and reused.
+  samples.delete(ref);
+  if (--untilNextSample > 0) {
+    return;
+  }
+  untilNextSample = sampleRate;
+  // Drop the "Error" line, the rest is the stack.
+  const stack = new Error().stack ?? "";
+  samples.set(ref, stack.slice(stack.indexOf("\n") + 1));
+}
+
+// Thrown by hiwire_invalid_ref_js instead of reporting an error while we are
+// checking whether a reference is still alive.
+const PROBE_FAILED = { probeFailed: true };
+
+/**
+ * Returns false if f throws or looks up an invalid reference.
+ */
+function probe(f: () => void): boolean {
+  Module.hiwire.probing = PROBE_FAILED;
+  try {
+    f();
+    return true;
+  } catch (e) {
+    return false;
+  } finally {
+    Module.hiwire.probing = undefined;
+  }
+}
+
+/**
+ * Turn allocation site tracing on or off.
+ *
+ * @param rate Record the stack of one in every ``rate`` new heap references.
+ *    ``1`` records all of them and ``0`` turns tracing off and forgets the
+ *    samples.
+ * @private
+ */
+export function hiwireTraceAllocations(rate: number) {
+  if (!Number.isInteger(rate) || rate < 0) {
+    throw new TypeError("rate should be a nonnegative integer");
+  }
+  sampleRate = rate;
+  untilNextSample = 0;
+  if (!rate) {
+    samples.clear();
+  }
+  Module.hiwire.traceNew = traceNew;
+  Module.HEAP8[Module._hiwire_tracing] = +!!rate;
+}
+
+/**
+ * Count the live hiwire references by kind.
+ * @private
+ */
+export function hiwireRefStats(): HiwireRefStats {
+  let immortal = 0;
+  while (probe(() => Module.__hiwire_immortal_get(immortal))) {
+    immortal++;
+  }
+  return { immortal, heap: Module._hiwire_num_refs() };
+}
+
+/**
+ * Count the live hiwire references by kind and the live sampled references by
+ * allocation stack. Pass two checkpoints to :js:func:`hiwireDiff` to see what
+ * was allocated and not freed in between.
+ * @private
+ */
+export function hiwireCheckpoint(): HiwireCheckpoint {
+  const sites: Map<string, number> = new Map();
+  for (const [ref, site] of samples) {
+    if (!probe(() => Module._hiwire_get(ref))) {
+      samples.delete(ref);
+      continue;
+    }
+    sites.set(site, (sites.get(site) ?? 0) + 1);
+  }
+  return { ...hiwireRefStats(), sites };
+}
+
+/**
+ * The change in the number of references between two checkpoints.
+ *
+ * @param before The earlier checkpoint
+ * @param after The later checkpoint, by default a new one
+ * @private
+ */
+export function hiwireDiff(
+  before: HiwireCheckpoint,
+  after: HiwireCheckpoint = hiwireCheckpoint(),
+): HiwireDiff {
+  const sites: Map<string, number> = new Map(after.sites);
+  for (const [site, count] of before.sites) {
+    sites.set(site, (sites.get(site) ?? 0) - count);
+  }
+  return {
+    immortal: after.immortal - before.immortal,
+    heap: after.heap - before.heap,
+    sites: Array.from(sites)
+      .filter(([site, count]) => count !== 0)
+      .sort((a, b) => b[1] - a[1]),
+  };
+}
@@ -1,5 +1,38 @@
 import { PyodideModule } from "./types";
 
+/**
+ * How far a sync has got: ``done`` out of ``total`` files and directories have
+ * been copied or removed and ``bytes`` bytes of file contents were copied.
+ * @hidden
+ */
+export type SyncProgress = { done: number; total: number; bytes: number };
+
+// How many files to copy at once.
+const SYNC_CONCURRENCY = 8;
+// Files are written to the native file system in chunks of this size.
+const WRITE_CHUNK_SIZE = 1 << 20;
+
+/**
+ * Call fn on each item with at most limit calls running at the same time.
+ */
+async function forEachConcurrently<T>(
+  items: T[],
+  limit: number,
+  fn: (item: T) => Promise<void>,
+): Promise<void> {
+  let next = 0;
+  async function worker() {
+    while (next < items.length) {
+      await fn(items[next++]);
+    }
+  }
+  const workers = [];
+  for (let i = 0; i < Math.min(limit, items.length); i++) {
+    workers.push(worker());
+  }
+  await Promise.all(workers);
+}
+
 /**
  * @private
  */
@@ -29,6 +62,46 @@ export async function syncRemoteToLocal(m: PyodideModule): Promise<void> {
   return await syncfs(m, true);
 }
 
+/**
+ * Create the nodes for the native directory without copying any file
+ * contents. The contents of a file are read when it is first opened.
+ * @private
+ */
+export async function populateLazily(
+  m: PyodideModule,
+  path: string,
+): Promise<void> {
+  const { mount } = m.FS.lookupPath(path, {}).node;
+  await m.FS.filesystems.NATIVEFS_ASYNC.populateLazily(mount);
+}
+
+/**
+ * Read the contents of a File synchronously. FileReaderSync only exists in
+ * workers, on the main thread we have to use a synchronous XMLHttpRequest.
+ */
+function readFileSync(file: File): Uint8Array {
+  const FileReaderSync = (globalThis as any).FileReaderSync;
+  if (FileReaderSync) {
+    return new Uint8Array(new FileReaderSync().readAsArrayBuffer(file));
+  }
+  const url = URL.createObjectURL(file);
+  try {
+    const xhr = new XMLHttpRequest();
+    xhr.open("GET", url, false);
+    // Get the bytes back unchanged as the low bytes of the characters.
+    xhr.overrideMimeType("text/plain; charset=x-user-defined");
+    xhr.send();
+    const text = xhr.responseText;
+    const result = new Uint8Array(text.length);
+    for (let i = 0; i < text.length; i++) {
+      result[i] = text.charCodeAt(i) & 0xff;
+    }
+    return result;
+  } finally {
+    URL.revokeObjectURL(url);
+  }
+}
+
 /**
  * @private
  */
@@ -38,6 +111,9 @@ export function initializeNativeFS(module: PyodideModule) {
   const PATH = module.PATH;
 
   const nativeFSAsync = {
+    // The contents of lazily loaded files are dropped again when more than
+    // this many bytes of them are in memory.
+    DEFAULT_MEMORY_BUDGET: 256 * 1024 * 1024,
     // DIR_MODE: {{{ cDefine('S_IFDIR') }}} | 511 /* 0777 */,
     // FILE_MODE: {{{ cDefine('S_IFREG') }}} | 511 /* 0777 */,
     DIR_MODE: 16384 | 511,
@@ -53,15 +129,188 @@ export function initializeNativeFS(module: PyodideModule) {
     syncfs: async (mount: any, populate: Boolean, callback: Function) => {
       try {
         const local = nativeFSAsync.getLocalSet(mount);
-        const remote = await nativeFSAsync.getRemoteSet(mount);
+        // When writing back, compare against what we know the remote looked
+        // like after the last sync instead of walking the whole directory
+        // again. Only the files that changed locally since then are written.
+        const remote =
+          !populate && mount.remoteSet
+            ? mount.remoteSet
+            : await nativeFSAsync.getRemoteSet(mount);
         const src = populate ? remote : local;
         const dst = populate ? local : remote;
         await nativeFSAsync.reconcile(mount, src, dst);
+        // Now the remote matches the local file system. Remember it with the
+        // local timestamps, so that a local file counts as changed exactly
+        // when it is modified after this sync.
+        mount.remoteSet = {
+          type: "remote",
+          entries: (populate ? nativeFSAsync.getLocalSet(mount) : local)
+            .entries,
+          handles: remote.handles,
+        };
         callback(null);
       } catch (e) {
+        // We don't know how far we got, look at the remote again next time.
+        mount.remoteSet = undefined;
         callback(e);
       }
     },
+    // Creates the nodes of a lazily loaded mount. Files start out with
+    // node.lazyFile set to the File to read their contents from.
+    populateLazily: async (mount: any) => {
+      mount.lazyCache = {
+        budget: mount.opts.memoryBudget ?? nativeFSAsync.DEFAULT_MEMORY_BUDGET,
+        used: 0,
+        // Materialized files that can be dropped again, least recently used
+        // first.
+        nodes: new Map(),
+      };
+      const remote = await nativeFSAsync.getRemoteSet(mount);
+      // Parents sort before their children
+      for (const path of Object.keys(remote.entries).sort()) {
+        const entry = remote.entries[path];
+        if (FS.isDir(entry.mode)) {
+          FS.mkdir(path, entry.mode);
+        } else {
+          const node = FS.create(path, entry.mode);
+          node.node_ops = nativeFSAsync.lazyOps().node;
+          node.stream_ops = nativeFSAsync.lazyOps().stream;
+          node.lazyFile = entry.file;
+          node.lazyCache = mount.lazyCache;
+          node.openCount = 0;
+        }
+        FS.utime(path, entry.timestamp, entry.timestamp);
+      }
+      mount.remoteSet = {
+        type: "remote",
+        entries: nativeFSAsync.getLocalSet(mount).entries,
+        handles: remote.handles,
+      };
+    },
+    // Read the contents of a lazily loaded file if they aren't in memory.
+    materialize: (node: any) => {
+      const cache = node.lazyCache;
+      if (!cache) {
+        return;
+      }
+      if (cache.nodes.has(node)) {
+        // Mark as most recently used
+        cache.nodes.delete(node);
+        cache.nodes.set(node, node.usedBytes);
+        return;
+      }
+      if (!node.lazyFile) {
+        return;
+      }
+      let contents;
+      try {
+        contents = readFileSync(node.lazyFile);
+      } catch (e) {
+        throw new FS.ErrnoError(cDefs.EIO);
+      }
+      node.contents = contents;
+      node.usedBytes = contents.length;
+      node.lazySource = node.lazyFile;
+      node.lazyFile = undefined;
+      cache.nodes.set(node, contents.length);
+      cache.used += contents.length;
+      nativeFSAsync.evict(cache);
+    },
+    // Drop the contents of files until we are within the memory budget. Files
+    // that are open are kept.
+    evict: (cache: any) => {
+      for (const [node, size] of cache.nodes) {
+        if (cache.used <= cache.budget) {
+          break;
+        }
+        if (node.openCount) {
+          continue;
+        }
+        node.contents = null;
+        node.usedBytes = 0;
+        node.lazyFile = node.lazySource;
+        node.lazySource = undefined;
+        cache.nodes.delete(node);
+        cache.used -= size;
+      }
+    },
+    // Once a file is modified, its contents are the only copy so it must stay
+    // in memory.
+    pin: (node: any) => {
+      nativeFSAsync.materialize(node);
+      const cache = node.lazyCache;
+      if (cache?.nodes.has(node)) {
+        cache.used -= cache.nodes.get(node);
+        cache.nodes.delete(node);
+      }
+      node.lazyCache = undefined;
+      node.lazySource = undefined;
+    },
+    lazyOps: () => {
+      if (nativeFSAsync._lazyOps) {
+        return nativeFSAsync._lazyOps;
+      }
+      const fileOps = MEMFS.ops_table.file;
+      nativeFSAsync._lazyOps = {
+        node: {
+          ...fileOps.node,
+          getattr(node: any) {
+            const attr = fileOps.node.getattr(node);
+            if (node.lazyFile) {
+              attr.size = node.lazyFile.size;
+            }
+            return attr;
+          },
+          setattr(node: any, attr: any) {
+            if (attr.size === 0) {
+              // No need to read contents that are about to be dropped
+              node.lazyFile = undefined;
+            }
+            if (attr.size !== undefined) {
+              nativeFSAsync.pin(node);
+            }
+            fileOps.node.setattr(node, attr);
+          },
+        },
+        stream: {
+          ...fileOps.stream,
+          open(stream: any) {
+            stream.node.openCount++;
+            nativeFSAsync.materialize(stream.node);
+          },
+          close(stream: any) {
+            stream.node.openCount--;
+            if (stream.node.lazyCache) {
+              nativeFSAsync.evict(stream.node.lazyCache);
+            }
+          },
+          write(stream: any, ...args: any[]) {
+            nativeFSAsync.pin(stream.node);
+            return fileOps.stream.write(stream, ...args);
+          },
+          allocate(stream: any, ...args: any[]) {
+            nativeFSAsync.pin(stream.node);
+            return fileOps.stream.allocate(stream, ...args);
+          },
+          mmap(
+            stream: any,
+            length: number,
+            position: number,
+            prot: number,
+            flags: number,
+          ) {
+            // msync writes a shared writable mapping back with
+            // MEMFS.stream_ops.write, which doesn't go through our write.
+            if (prot & cDefs.PROT_WRITE && !(flags & cDefs.MAP_PRIVATE)) {
+              nativeFSAsync.pin(stream.node);
+            }
+            return fileOps.stream.mmap(stream, length, position, prot, flags);
+          },
+        },
+      };
+      return nativeFSAsync._lazyOps;
+    },
+    _lazyOps: undefined as any,
     // Returns file set of emscripten's filesystem at the mountpoint.
     getLocalSet: (mount: any) => {
       let entries = Object.create(null);
@@ -100,23 +349,41 @@ export function initializeNativeFS(module: PyodideModule) {
     getRemoteSet: async (mount: any) => {
       // TODO: this should be a map.
       const entries = Object.create(null);
+      const handles = new Map();
+      const root = mount.opts.fileSystemHandle;
+      handles.set(".", root);
 
-      const handles = await getFsHandles(mount.opts.fileSystemHandle);
-      for (const [path, handle] of handles) {
-        if (path === ".") continue;
-
-        entries[PATH.join2(mount.mountpoint, path)] = {
-          timestamp:
-            handle.kind === "file"
-              ? new Date((await handle.getFile()).lastModified)
-              : new Date(),
-          mode:
-            handle.kind === "file"
-              ? nativeFSAsync.FILE_MODE
-              : nativeFSAsync.DIR_MODE,
-        };
+      // Build up the paths while walking instead of resolving each handle
+      // against the root, and look up the timestamps of the files in a
+      // directory concurrently.
+      async function walk(dirHandle: any, dirPath: string) {
+        const pending = [];
+        for await (const handle of dirHandle.values()) {
+          const path = dirPath ? `${dirPath}/${handle.name}` : handle.name;
+          const absPath = PATH.join2(mount.mountpoint, path);
+          handles.set(path, handle);
+          if (handle.kind === "directory") {
+            entries[absPath] = {
+              timestamp: new Date(),
+              mode: nativeFSAsync.DIR_MODE,
+            };
+            pending.push(walk(handle, path));
+          } else {
+            pending.push(
+              handle.getFile().then((file: File) => {
+                entries[absPath] = {
+                  timestamp: new Date(file.lastModified),
+                  mode: nativeFSAsync.FILE_MODE,
+                  file,
+                };
+              }),
+            );
+          }
+        }
+        await Promise.all(pending);
       }
 
+      await walk(root, "");
       return { type: "remote", entries, handles };
     },
     loadLocalEntry: (path: string) => {
@@ -127,11 +394,26 @@ export function initializeNativeFS(module: PyodideModule) {
       if (FS.isDir(stat.mode)) {
         return { timestamp: stat.mtime, mode: stat.mode };
       } else if (FS.isFile(stat.mode)) {
-        node.contents = MEMFS.getFileDataAsTypedArray(node);
+        // Count the file as open while we read it, otherwise materializing
+        // it can evict it again right away if it is larger than the budget.
+        const cache = node.lazyCache;
+        let contents;
+        if (cache) {
+          node.openCount++;
+        }
+        try {
+          nativeFSAsync.materialize(node);
+          contents = node.contents = MEMFS.getFileDataAsTypedArray(node);
+        } finally {
+          if (cache) {
+            node.openCount--;
+            nativeFSAsync.evict(cache);
+          }
+        }
         return {
           timestamp: stat.mtime,
           mode: stat.mode,
-          contents: node.contents,
+          contents,
         };
       } else {
         throw new Error("node type not supported");
@@ -175,7 +457,12 @@ export function initializeNativeFS(module: PyodideModule) {
         throw new Error("unknown kind: " + handle.kind);
       }
     },
-    storeRemoteEntry: async (handles: any, path: string, entry: any) => {
+    storeRemoteEntry: async (
+      handles: any,
+      path: string,
+      entry: any,
+      onWrite?: (nbytes: number) => void,
+    ) => {
       const parentDirHandle = handles.get(PATH.dirname(path));
       const handle = FS.isFile(entry.mode)
         ? await parentDirHandle.getFileHandle(PATH.basename(path), {
@@ -186,14 +473,28 @@ export function initializeNativeFS(module: PyodideModule) {
           });
       if (handle.kind === "file") {
         const writable = await handle.createWritable();
-        await writable.write(entry.contents);
+        const contents: Uint8Array = entry.contents;
+        // Write large files in chunks so that we can report progress.
+        for (let pos = 0; pos < contents.length; pos += WRITE_CHUNK_SIZE) {
+          const chunk = contents.subarray(pos, pos + WRITE_CHUNK_SIZE);
+          await writable.write(chunk);
+          onWrite?.(chunk.length);
+        }
         await writable.close();
       }
       handles.set(path, handle);
     },
     removeRemoteEntry: async (handles: any, path: string) => {
       const parentDirHandle = handles.get(PATH.dirname(path));
-      await parentDirHandle.removeEntry(PATH.basename(path));
+      try {
+        await parentDirHandle.removeEntry(PATH.basename(path));
+      } catch (e: any) {
+        // It may already have been removed by someone else since the last
+        // sync.
+        if (e?.name !== "NotFoundError") {
+          throw e;
+        }
+      }
       handles.delete(path);
     },
     reconcile: async (mount: any, src: any, dst: any) => {
@@ -232,56 +533,77 @@ export function initializeNativeFS(module: PyodideModule) {
       }
 
       const handles = src.type === "remote" ? src.handles : dst.handles;
+      const onProgress: ((p: SyncProgress) => void) | undefined =
+        mount.onProgress;
+      const progress = { done: 0, total, bytes: 0 };
+      const report = () => onProgress?.({ ...progress });
+      const toRelPath = (path: string) =>
+        PATH.normalize(path.replace(mount.mountpoint, "/")).substring(1);
 
-      for (const path of create) {
-        const relPath = PATH.normalize(
-          path.replace(mount.mountpoint, "/"),
-        ).substring(1);
+      async function createEntry(path: string) {
+        const relPath = toRelPath(path);
         if (dst.type === "local") {
           const handle = handles.get(relPath);
           const entry = await nativeFSAsync.loadRemoteEntry(handle);
           nativeFSAsync.storeLocalEntry(path, entry);
+          progress.bytes += entry.contents?.length ?? 0;
         } else {
           const entry = nativeFSAsync.loadLocalEntry(path);
-          await nativeFSAsync.storeRemoteEntry(handles, relPath, entry);
+          await nativeFSAsync.storeRemoteEntry(
+            handles,
+            relPath,
+            entry,
+            (nbytes) => {
+              progress.bytes += nbytes;
+              report();
+            },
+          );
         }
+        progress.done++;
+        report();
       }
 
-      for (const path of remove) {
+      async function removeEntry(path: string) {
         if (dst.type === "local") {
           nativeFSAsync.removeLocalEntry(path);
         } else {
-          const relPath = PATH.normalize(
-            path.replace(mount.mountpoint, "/"),
-          ).substring(1);
-          await nativeFSAsync.removeRemoteEntry(handles, relPath);
+          await nativeFSAsync.removeRemoteEntry(handles, toRelPath(path));
         }
+        progress.done++;
+        report();
+      }
+
+      // Directories are created one level at a time so that each one exists
+      // before anything inside of it. After that, all of the files can be
+      // copied at once.
+      const isDir = (path: string) => FS.isDir(src.entries[path].mode);
+      const createDirs = create.filter(isDir);
+      const createFiles = create.filter((path) => !isDir(path));
+      const depth = (path: string) => path.split("/").length;
+      let level: string[] = [];
+      for (const path of createDirs.sort((a, b) => depth(a) - depth(b))) {
+        if (level.length && depth(level[0]) !== depth(path)) {
+          await forEachConcurrently(level, SYNC_CONCURRENCY, createEntry);
+          level = [];
+        }
+        level.push(path);
+      }
+      await forEachConcurrently(level, SYNC_CONCURRENCY, createEntry);
+      await forEachConcurrently(createFiles, SYNC_CONCURRENCY, createEntry);
+
+      // Remove files first, then directories from the innermost out.
+      const removeFiles = remove.filter(
+        (path) => !FS.isDir(dst.entries[path].mode),
+      );
+      const removeDirs = remove.filter((path) =>
+        FS.isDir(dst.entries[path].mode),
+      );
+      await forEachConcurrently(removeFiles, SYNC_CONCURRENCY, removeEntry);
+      for (const path of removeDirs) {
+        await removeEntry(path);
       }
     },
   };
 
   module.FS.filesystems.NATIVEFS_ASYNC = nativeFSAsync;
 }
-
-const getFsHandles = async (dirHandle: any) => {
-  const handles: any = [];
-
-  async function collect(curDirHandle: any) {
-    for await (const entry of curDirHandle.values()) {
-      handles.push(entry);
-      if (entry.kind === "directory") {
-        await collect(entry);
-      }
-    }
-  }
-
-  await collect(dirHandle);
-
-  const result = new Map();
-  result.set(".", dirHandle);
-  for (const handle of handles) {
-    const relativePath = (await dirHandle.resolve(handle)).join("/");
-    result.set(relativePath, handle);
-  }
-  return result;
-};
@@ -23,11 +23,17 @@ import type {
 } from "./types";
 import type { EmscriptenSettings } from "./emscripten-settings";
 import type { SnapshotConfig } from "./snapshot";
+import { checkBuildId, openSnapshot } from "./snapshot-format";
 import { withTrailingSlash } from "./common/path";
 export type { PyodideAPI, TypedArray, PyodideAPI as PyodideInterface };
 export type { LockfileInfo, LockfilePackage, Lockfile } from "./types";
 
 export { type PackageData };
+export {
+  describeSnapshot as _describeSnapshot,
+  decompressSnapshot as _decompressSnapshot,
+  type SnapshotManifest,
+} from "./snapshot-format";
 
 /**
  * The Pyodide version.
@@ -217,11 +223,12 @@ export interface PyodideConfig {
   /** @ignore */
   _makeSnapshot?: boolean;
 
-  /** @ignore */
-  _loadSnapshot?:
-    | Uint8Array
-    | ArrayBuffer
-    | PromiseLike<Uint8Array | ArrayBuffer>;
+  /**
+   * A snapshot, or a base snapshot followed by delta snapshots made on top of
+   * it.
+   * @ignore
+   */
+  _loadSnapshot?: SnapshotSource | SnapshotSource[];
 
   /** @ignore */
   _snapshotDeserializer?: (obj: any) => any;
@@ -337,26 +344,61 @@ async function loadWasmScript(
   }
 }
 
+type SnapshotData =
+  | Uint8Array
+  | ArrayBuffer
+  | ReadableStream<Uint8Array>
+  | Response;
+type SnapshotSource = SnapshotData | PromiseLike<SnapshotData>;
+
+async function openSnapshotSource(source: SnapshotSource) {
+  const snp = await source;
+  if (ArrayBuffer.isView(snp)) {
+    return await openSnapshot(snp as Uint8Array);
+  }
+  if (snp instanceof ArrayBuffer) {
+    return await openSnapshot(new Uint8Array(snp));
+  }
+  if ("getReader" in snp) {
+    return await openSnapshot(snp);
+  }
+  if (!snp.ok) {
+    throw new Error(
+      `Failed to load snapshot: request failed with status ${snp.status}`,
+    );
+  }
+  return await openSnapshot(snp.body!);
+}
+
 /**
  * @private
  */
 async function prepareSnapshot(
   config: PyodideConfigWithDefaults,
   emscriptenSettings: EmscriptenSettings,
-): Promise<Uint8Array | undefined> {
+): Promise<{ snapshots: Promise<Uint8Array[]> } | undefined> {
   if (!config._loadSnapshot) {
     return undefined;
   }
 
-  const snp = await config._loadSnapshot;
-  const snapshot = ArrayBuffer.isView(snp)
-    ? (snp as Uint8Array)
-    : new Uint8Array(snp);
+  const sources = Array.isArray(config._loadSnapshot)
+    ? config._loadSnapshot
+    : [config._loadSnapshot];
+  // This only waits for the headers. The heap data keeps downloading while the
+  // Emscripten module is being compiled and instantiated.
+  const pending = await Promise.all(sources.map(openSnapshotSource));
+  for (const { header } of pending) {
+    checkBuildId(header, config.BUILD_ID);
+  }
   emscriptenSettings.noInitialRun = true;
+  // Sparse snapshots are smaller than the heap they restore, so take the size
+  // from the headers.
   // @ts-ignore
-  emscriptenSettings.INITIAL_MEMORY = snapshot.length;
+  emscriptenSettings.INITIAL_MEMORY = Math.max(
+    ...pending.map(({ header }) => header.heapLength),
+  );
 
-  return snapshot;
+  return { snapshots: Promise.all(pending.map(({ snapshot }) => snapshot)) };
 }
 
 /**
@@ -417,7 +459,7 @@ If you updated the Pyodide version, make sure you also updated the 'indexURL' pa
  */
 function bootstrapPyodide(
   pyodideModule: PyodideModule,
-  snapshot: Uint8Array | undefined,
+  snapshot: Uint8Array[] | undefined,
   config: PyodideConfigWithDefaults,
 ): PyodideAPI {
   const API = pyodideModule.API;
@@ -484,10 +526,14 @@ export async function loadPyodide(
   await loadWasmScript(config);
 
   // Stage 4: Prepare snapshot
-  const snapshot = await prepareSnapshot(config, emscriptenSettings);
-
-  // Stage 5: Create and initialize the Emscripten module
-  const pyodideModule = await createPyodideModule(emscriptenSettings);
+  const pendingSnapshot = await prepareSnapshot(config, emscriptenSettings);
+
+  // Stage 5: Create and initialize the Emscripten module while the rest of the
+  // snapshot is downloaded
+  const [pyodideModule, snapshot] = await Promise.all([
+    createPyodideModule(emscriptenSettings),
+    pendingSnapshot?.snapshots,
+  ]);
 
   // Stage 6: Configure API and validate versions
   configureAPI(pyodideModule, config);
@@ -0,0 +1,648 @@
+/**
+ * Reading and writing the binary layout of memory snapshots.
+ *
+ * This module is shared between the loader in pyodide.ts, which has to size the
+ * heap and decompress the snapshot before the Emscripten module exists, and
+ * snapshot.ts, which creates snapshots and restores them into the heap. So it
+ * must not touch `API` or `Module`.
+ *
+ * A snapshot looks like:
+ *
+ *   header (HEADER_SIZE_IN_BYTES)
+ *   JSON encoded SnapshotConfig
+ *   page table (sparse snapshots only, aligned to 16 bytes)
+ *   heap data (at snapshotOffset, aligned to 16 bytes)
+ *
+ * Old snapshots have no flags set and store the whole heap. Sparse snapshots
+ * leave out the pages of the heap that are all zero: the page table lists the
+ * runs of pages that are stored and the heap data is just those pages one after
+ * another. The heap data of a sparse snapshot may additionally be deflate
+ * compressed.
+ *
+ * Every sparse snapshot has a random id. A delta snapshot also records the id
+ * of the snapshot it was made against and only stores the pages that differ
+ * from it. It is restored by restoring the chain of snapshots it sits on top of
+ * first.
+ *
+ * @private
+ */
+
+export const SNAPSHOT_MAGIC = 0x706e7300; // "\x00snp"
+export const HEADER_SIZE_IN_BYTES =
+  4 /* magic */ +
+  4 /* offset to binary */ +
+  4 /* json length */ +
+  4 /* flags */ +
+  32; /* build id */
+
+/** The heap data only contains the pages listed in the page table. */
+export const SNAPSHOT_FLAG_SPARSE = 1;
+/** The heap data is deflate compressed. */
+export const SNAPSHOT_FLAG_DEFLATE = 2;
+/** The stored pages are the ones that differ from the base snapshot. */
+export const SNAPSHOT_FLAG_DELTA = 4;
+
+export const SNAPSHOT_PAGE_SIZE = 4096;
+
+const PAGE_TABLE_HEADER_SIZE_IN_BYTES =
+  4 /* heap length */ +
+  4 /* page size */ +
+  4 /* number of runs */ +
+  4 /* uncompressed length of heap data */ +
+  8 /* id */ +
+  8; /* id of the base snapshot */
+
+export type SnapshotHeader = {
+  flags: number;
+  snapshotOffset: number;
+  jsonLength: number;
+  buildId: string;
+  /** The size the heap has to be to restore the snapshot into it. */
+  heapLength: number;
+  pageSize: number;
+  /** Pairs of (first page, number of pages) of the pages that are stored. */
+  runs: Uint32Array;
+  /** The length of the heap data after decompression. */
+  dataLength: number;
+  id: string;
+  baseId: string;
+};
+
+function align16(n: number): number {
+  return Math.ceil(n / 16) * 16;
+}
+
+function uint32View(buf: Uint8Array, offset: number, length: number) {
+  return new Uint32Array(buf.buffer, buf.byteOffset + offset, length);
+}
+
+export function encodeBuildId(buildId: string, buffer: Uint32Array): void {
+  if (buffer.length !== 8) {
+    throw new Error("Expected 256 bit buffer");
+  }
+  for (let i = 0; i < 32; i++) {
+    buffer[i] = parseInt(buildId.slice(i * 8, (i + 1) * 8), 16);
+  }
+}
+
+export function decodeBuildId(buffer: Uint32Array): string {
+  if (buffer.length !== 8) {
+    throw new Error("Expected 256 bit buffer");
+  }
+  return Array.from(buffer, (n) => n.toString(16).padStart(8, "0")).join("");
+}
+
+function hexWords(words: Uint32Array): string {
+  return Array.from(words, (n) => n.toString(16).padStart(8, "0")).join("");
+}
+
+function newSnapshotId(): number[] {
+  // Only has to tell snapshots apart, it doesn't need to be unguessable.
+  return [
+    Math.floor(Math.random() * 2 ** 32),
+    Math.floor(Math.random() * 2 ** 32),
+  ];
+}
+
+function readHeaderWords(snapshot: Uint8Array): Uint32Array {
+  if (snapshot.length < HEADER_SIZE_IN_BYTES) {
+    throw new Error("Snapshot has invalid magic number");
+  }
+  const header = uint32View(snapshot, 0, HEADER_SIZE_IN_BYTES / 4);
+  if (header[0] !== SNAPSHOT_MAGIC) {
+    throw new Error("Snapshot has invalid magic number");
+  }
+  return header;
+}
+
+export function readSnapshotHeader(snapshot: Uint8Array): SnapshotHeader {
+  const header = readHeaderWords(snapshot);
+  const snapshotOffset = header[1];
+  const jsonLength = header[2];
+  const flags = header[3];
+  const buildId = decodeBuildId(header.subarray(4, 4 + 8));
+  if (!(flags & SNAPSHOT_FLAG_SPARSE)) {
+    if (flags) {
+      throw new Error(`Snapshot has unknown flags ${flags}`);
+    }
+    const heapLength = snapshot.length - snapshotOffset;
+    return {
+      flags,
+      snapshotOffset,
+      jsonLength,
+      buildId,
+      heapLength,
+      pageSize: heapLength,
+      runs: new Uint32Array([0, 1]),
+      dataLength: heapLength,
+      id: "",
+      baseId: "",
+    };
+  }
+  const tableOffset = align16(HEADER_SIZE_IN_BYTES + jsonLength);
+  const table = uint32View(
+    snapshot,
+    tableOffset,
+    PAGE_TABLE_HEADER_SIZE_IN_BYTES / 4,
+  );
+  const [heapLength, pageSize, numRuns, dataLength] = table;
+  const id = hexWords(table.subarray(4, 6));
+  const baseId =
+    flags & SNAPSHOT_FLAG_DELTA ? hexWords(table.subarray(6, 8)) : "";
+  const runs = uint32View(
+    snapshot,
+    tableOffset + PAGE_TABLE_HEADER_SIZE_IN_BYTES,
+    2 * numRuns,
+  );
+  return {
+    flags,
+    snapshotOffset,
+    jsonLength,
+    buildId,
+    heapLength,
+    pageSize,
+    runs,
+    dataLength,
+    id,
+    baseId,
+  };
+}
+
+/**
+ * Find the runs of pages of heap that differ from base. Without a base, find
+ * the runs of pages that contain a nonzero byte. Past the end of base, pages
+ * are compared against zero.
+ */
+export function findChangedRuns(
+  heap: Uint8Array,
+  pageSize: number,
+  base?: Uint8Array,
+): number[] {
+  // Compare four bytes at a time. Heaps are a whole number of wasm pages, so
+  // their lengths are divisible by four.
+  const words = uint32View(heap, 0, heap.length >>> 2);
+  const baseWords = base
+    ? uint32View(base, 0, Math.min(base.length, heap.length) >>> 2)
+    : new Uint32Array(0);
+  const wordsPerPage = pageSize >>> 2;
+  const numPages = Math.ceil(heap.length / pageSize);
+  const runs: number[] = [];
+  let runStart = -1;
+  for (let page = 0; page < numPages; page++) {
+    const start = page * wordsPerPage;
+    const end = Math.min(start + wordsPerPage, words.length);
+    const baseEnd = Math.min(end, baseWords.length);
+    let changed = false;
+    let i = start;
+    for (; i < baseEnd; i++) {
+      if (words[i] !== baseWords[i]) {
+        changed = true;
+        break;
+      }
+    }
+    if (!changed) {
+      for (; i < end; i++) {
+        if (words[i] !== 0) {
+          changed = true;
+          break;
+        }
+      }
+    }
+    if (changed && runStart === -1) {
+      runStart = page;
+    } else if (!changed && runStart !== -1) {
+      runs.push(runStart, page - runStart);
+      runStart = -1;
+    }
+  }
+  if (runStart !== -1) {
+    runs.push(runStart, numPages - runStart);
+  }
+  return runs;
+}
+
+/**
+ * Write a sparse snapshot of heap. The JSON config is already encoded. If base
+ * is given, write a delta snapshot that only stores the pages that differ from
+ * the base heap.
+ */
+export function writeSparseSnapshot(
+  heap: Uint8Array,
+  json: Uint8Array,
+  buildId: string,
+  base?: { heap: Uint8Array; id: string },
+): Uint8Array {
+  const pageSize = SNAPSHOT_PAGE_SIZE;
+  const runs = findChangedRuns(heap, pageSize, base?.heap);
+  let dataLength = 0;
+  for (let i = 0; i < runs.length; i += 2) {
+    const start = runs[i] * pageSize;
+    dataLength += Math.min(heap.length, start + runs[i + 1] * pageSize) - start;
+  }
+  const tableOffset = align16(HEADER_SIZE_IN_BYTES + json.length);
+  const snapshotOffset = align16(
+    tableOffset + PAGE_TABLE_HEADER_SIZE_IN_BYTES + 4 * runs.length,
+  );
+  const snapshot = new Uint8Array(snapshotOffset + dataLength);
+  const header = uint32View(snapshot, 0, HEADER_SIZE_IN_BYTES / 4);
+  header[0] = SNAPSHOT_MAGIC;
+  header[1] = snapshotOffset;
+  header[2] = json.length;
+  header[3] = SNAPSHOT_FLAG_SPARSE | (base ? SNAPSHOT_FLAG_DELTA : 0);
+  encodeBuildId(buildId, header.subarray(4, 4 + 8));
+  snapshot.set(json, HEADER_SIZE_IN_BYTES);
+  const table = uint32View(
+    snapshot,
+    tableOffset,
+    PAGE_TABLE_HEADER_SIZE_IN_BYTES / 4 + runs.length,
+  );
+  table.set([heap.length, pageSize, runs.length / 2, dataLength]);
+  table.set(newSnapshotId(), 4);
+  if (base) {
+    const baseId = [base.id.slice(0, 8), base.id.slice(8)];
+    table.set(
+      baseId.map((x) => parseInt(x, 16)),
+      6,
+    );
+  }
+  table.set(runs, PAGE_TABLE_HEADER_SIZE_IN_BYTES / 4);
+  let pos = snapshotOffset;
+  for (let i = 0; i < runs.length; i += 2) {
+    const start = runs[i] * pageSize;
+    const end = Math.min(heap.length, start + runs[i + 1] * pageSize);
+    snapshot.set(heap.subarray(start, end), pos);
+    pos += end - start;
+  }
+  return snapshot;
+}
+
+/**
+ * Copy the heap data of an uncompressed snapshot into heap. The pages that
+ * were left out of a sparse snapshot are zeroed, the pages left out of a delta
+ * snapshot are kept as the base snapshot left them.
+ */
+export function restoreHeap(
+  heap: Uint8Array,
+  snapshot: Uint8Array,
+  header: SnapshotHeader,
+): void {
+  if (header.flags & SNAPSHOT_FLAG_DEFLATE) {
+    throw new Error("Compressed snapshot must be decompressed first");
+  }
+  const data = snapshot.subarray(header.snapshotOffset);
+  if (!(header.flags & SNAPSHOT_FLAG_SPARSE)) {
+    heap.set(data);
+    heap.fill(0, data.length);
+    return;
+  }
+  const { runs, pageSize, heapLength } = header;
+  const delta = !!(header.flags & SNAPSHOT_FLAG_DELTA);
+  if (heap.length < heapLength) {
+    throw new Error(
+      `Snapshot needs a heap of ${heapLength} bytes but the heap only has ${heap.length} bytes`,
+    );
+  }
+  let pos = 0;
+  let zeroStart = 0;
+  for (let i = 0; i < runs.length; i += 2) {
+    const start = runs[i] * pageSize;
+    const end = Math.min(heapLength, start + runs[i + 1] * pageSize);
+    // The heap is not empty here: static data was already written into it
+    // when the module was instantiated.
+    if (!delta) {
+      heap.fill(0, zeroStart, start);
+    }
+    heap.set(data.subarray(pos, pos + end - start), start);
+    pos += end - start;
+    zeroStart = end;
+  }
+  if (!delta) {
+    heap.fill(0, zeroStart);
+  }
+}
+
+/**
+ * Check that each snapshot in a chain is a delta against the one before it.
+ * The first snapshot has to be a full snapshot.
+ */
+export function checkSnapshotChain(headers: SnapshotHeader[]): void {
+  if (headers[0].flags & SNAPSHOT_FLAG_DELTA) {
+    throw new Error(
+      "Delta snapshot must be loaded together with its base snapshot",
+    );
+  }
+  for (let i = 1; i < headers.length; i++) {
+    if (!(headers[i].flags & SNAPSHOT_FLAG_DELTA)) {
+      throw new Error(
+        "Only the first snapshot in a snapshot chain can be a full snapshot",
+      );
+    }
+    if (headers[i].baseId !== headers[i - 1].id) {
+      throw new Error(
+        `Delta snapshot at index ${i} was not made against the snapshot before it`,
+      );
+    }
+  }
+}
+
+/**
+ * Restore a chain of uncompressed snapshots into a new buffer.
+ */
+export function materializeHeap(
+  snapshots: Uint8Array[],
+  headers: SnapshotHeader[],
+): Uint8Array {
+  checkSnapshotChain(headers);
+  const compressed = headers.findIndex((h) => h.flags & SNAPSHOT_FLAG_DEFLATE);
+  if (compressed !== -1) {
+    throw new Error(
+      `Base snapshot at index ${compressed} is compressed, decompress it first`,
+    );
+  }
+  const heap = new Uint8Array(Math.max(...headers.map((h) => h.heapLength)));
+  for (let i = 0; i < snapshots.length; i++) {
+    restoreHeap(heap, snapshots[i], headers[i]);
+  }
+  return heap;
+}
+
+/**
+ * Deflate the heap data of a sparse snapshot.
+ */
+export async function compressSnapshot(
+  snapshot: Uint8Array,
+): Promise<Uint8Array> {
+  const header = readSnapshotHeader(snapshot);
+  if (!(header.flags & SNAPSHOT_FLAG_SPARSE)) {
+    throw new Error("Only sparse snapshots can be compressed");
+  }
+  if (header.flags & SNAPSHOT_FLAG_DEFLATE) {
+    return snapshot;
+  }
+  const offset = header.snapshotOffset;
+  const stream = new Blob([snapshot.subarray(offset)])
+    .stream()
+    .pipeThrough(new CompressionStream("deflate"));
+  const data = new Uint8Array(await new Response(stream).arrayBuffer());
+  const result = new Uint8Array(offset + data.length);
+  result.set(snapshot.subarray(0, offset));
+  result.set(data, offset);
+  uint32View(result, 0, 4)[3] |= SNAPSHOT_FLAG_DEFLATE;
+  return result;
+}
+
+export function checkBuildId(header: SnapshotHeader, buildId: string): void {
+  if (header.buildId !== buildId) {
+    throw new Error(
+      "Snapshot build id mismatch\n" +
+        `expected: ${buildId}\n` +
+        `got     : ${header.buildId}\n`,
+    );
+  }
+}
+
+/**
+ * Copy the chunks of stream into result starting at pos. The stream has to
+ * fill result up exactly.
+ */
+async function readInto(
+  stream: ReadableStream<Uint8Array>,
+  result: Uint8Array,
+  pos: number,
+): Promise<void> {
+  const reader = stream.getReader();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    if (pos + value.length > result.length) {
+      throw new Error("Snapshot heap data is longer than expected");
+    }
+    result.set(value, pos);
+    pos += value.length;
+  }
+  if (pos !== result.length) {
+    throw new Error("Snapshot heap data is truncated");
+  }
+}
+
+function concatChunks(chunks: Uint8Array[], length: number): Uint8Array {
+  // Reuse a single chunk unless we can't make a Uint32Array view of it.
+  if (chunks.length === 1 && chunks[0].byteOffset % 4 === 0) {
+    return chunks[0];
+  }
+  const result = new Uint8Array(length);
+  let pos = 0;
+  for (const chunk of chunks) {
+    result.set(chunk, pos);
+    pos += chunk.length;
+  }
+  return result;
+}
+
+/**
+ * A snapshot whose header has been read but whose heap data may still be
+ * arriving.
+ */
+export type PendingSnapshot = {
+  header: SnapshotHeader;
+  /** Resolves to the uncompressed snapshot. */
+  snapshot: Promise<Uint8Array>;
+};
+
+/**
+ * Start reading a snapshot from a stream. This resolves as soon as the header
+ * and page table have arrived so that the heap can be set up while the heap
+ * data is still downloading. Compressed heap data is inflated as it arrives.
+ */
+export async function readSnapshotStream(
+  stream: ReadableStream<Uint8Array>,
+): Promise<PendingSnapshot> {
+  const reader = stream.getReader();
+  const chunks: Uint8Array[] = [];
+  let received = 0;
+  async function readUntil(length: number): Promise<Uint8Array> {
+    while (received < length) {
+      const { done, value } = await reader.read();
+      if (done) {
+        break;
+      }
+      chunks.push(value);
+      received += value.length;
+    }
+    const data = concatChunks(chunks, received);
+    chunks.splice(0, chunks.length, data);
+    return data;
+  }
+
+  let data = await readUntil(HEADER_SIZE_IN_BYTES);
+  // Check the magic number before waiting for anything else.
+  const flags = readHeaderWords(data)[3];
+  if (!(flags & SNAPSHOT_FLAG_SPARSE)) {
+    // Old snapshots don't say how big the heap is, so we need all of it.
+    const snapshot = await readUntil(Infinity);
+    return {
+      header: readSnapshotHeader(snapshot),
+      snapshot: Promise.resolve(snapshot),
+    };
+  }
+  const snapshotOffset = readHeaderWords(data)[1];
+  data = await readUntil(snapshotOffset);
+  if (data.length < snapshotOffset) {
+    throw new Error("Snapshot is truncated");
+  }
+  const dataLength = readSnapshotHeader(data).dataLength;
+  const result = new Uint8Array(snapshotOffset + dataLength);
+  result.set(data.subarray(0, snapshotOffset));
+  uint32View(result, 0, 4)[3] &= ~SNAPSHOT_FLAG_DEFLATE;
+
+  const rest = data.subarray(snapshotOffset);
+  let body = new ReadableStream<Uint8Array>({
+    start(controller) {
+      if (rest.length) {
+        controller.enqueue(rest);
+      }
+    },
+    async pull(controller) {
+      const { done, value } = await reader.read();
+      if (done) {
+        controller.close();
+      } else {
+        controller.enqueue(value);
+      }
+    },
+    cancel(reason) {
+      return reader.cancel(reason);
+    },
+  });
+  if (flags & SNAPSHOT_FLAG_DEFLATE) {
+    body = body.pipeThrough(new DecompressionStream("deflate"));
+  }
+  return {
+    header: readSnapshotHeader(result),
+    snapshot: readInto(body, result, snapshotOffset).then(() => result),
+  };
+}
+
+/**
+ * Start reading a snapshot that is either in memory or still arriving on a
+ * stream.
+ */
+export async function openSnapshot(
+  snapshot: Uint8Array | ReadableStream<Uint8Array>,
+): Promise<PendingSnapshot> {
+  if (!ArrayBuffer.isView(snapshot)) {
+    return await readSnapshotStream(snapshot);
+  }
+  const header = readSnapshotHeader(snapshot);
+  if (!(header.flags & SNAPSHOT_FLAG_DEFLATE)) {
+    return { header, snapshot: Promise.resolve(snapshot) };
+  }
+  return await readSnapshotStream(new Blob([snapshot]).stream());
+}
+
+/**
+ * Inflate the heap data of a compressed snapshot. Returns the snapshot
+ * unchanged if it isn't compressed.
+ */
+export async function decompressSnapshot(
+  snapshot: Uint8Array,
+): Promise<Uint8Array> {
+  return await (await openSnapshot(snapshot)).snapshot;
+}
+
+/**
+ * A summary of what is inside a snapshot, as reported by makesnap.mjs.
+ */
+export type SnapshotManifest = {
+  buildId: string;
+  id: string;
+  baseId: string;
+  sparse: boolean;
+  compressed: boolean;
+  delta: boolean;
+  /** The size of the snapshot itself. */
+  size: number;
+  heapSize: number;
+  pageSize: number;
+  totalPages: number;
+  /** The pages that are stored, i.e. nonzero or changed from the base. */
+  storedPages: number;
+  /** The size of the stored heap data before compression. */
+  heapDataSize: number;
+  configSize: number;
+  hiwireKeys: {
+    total: number;
+    /** Keys that are stored in the base snapshot of a delta. */
+    base: number;
+    null: number;
+    path: number;
+    serialized: number;
+    API: number;
+    abortSignalAny: number;
+  };
+  immortalKeys: number;
+  /** The JSON size of each object the serializer produced, by hiwire index. */
+  serializedSizes: { index: number; size: number }[];
+};
+
+export function describeSnapshot(snapshot: Uint8Array): SnapshotManifest {
+  const header = readSnapshotHeader(snapshot);
+  const json = snapshot.subarray(
+    HEADER_SIZE_IN_BYTES,
+    HEADER_SIZE_IN_BYTES + header.jsonLength,
+  );
+  const config = JSON.parse(new TextDecoder().decode(json));
+  const base = config.baseHiwireKeys ?? 0;
+  const hiwireKeys = {
+    total: base + config.hiwireKeys.length,
+    base,
+    null: 0,
+    path: 0,
+    serialized: 0,
+    API: 0,
+    abortSignalAny: 0,
+  };
+  const serializedSizes: SnapshotManifest["serializedSizes"] = [];
+  for (let i = 0; i < config.hiwireKeys.length; i++) {
+    const key = config.hiwireKeys[i];
+    if (key === null) {
+      hiwireKeys.null++;
+    } else if ("path" in key) {
+      hiwireKeys.path++;
+    } else if ("serialized" in key) {
+      hiwireKeys.serialized++;
+      serializedSizes.push({
+        index: base + i,
+        size: JSON.stringify(key.serialized).length,
+      });
+    } else if ("API" in key) {
+      hiwireKeys.API++;
+    } else if ("abortSignalAny" in key) {
+      hiwireKeys.abortSignalAny++;
+    }
+  }
+  let storedPages = 0;
+  for (let i = 1; i < header.runs.length; i += 2) {
+    storedPages += header.runs[i];
+  }
+  return {
+    buildId: header.buildId,
+    id: header.id,
+    baseId: header.baseId,
+    sparse: !!(header.flags & SNAPSHOT_FLAG_SPARSE),
+    compressed: !!(header.flags & SNAPSHOT_FLAG_DEFLATE),
+    delta: !!(header.flags & SNAPSHOT_FLAG_DELTA),
+    size: snapshot.length,
+    heapSize: header.heapLength,
+    pageSize: header.pageSize,
+    totalPages: Math.ceil(header.heapLength / header.pageSize),
+    storedPages,
+    heapDataSize: header.dataLength,
+    configSize: header.jsonLength,
+    hiwireKeys,
+    immortalKeys: (config.baseImmortalKeys ?? 0) + config.immortalKeys.length,
+    serializedSizes,
+  };
+}
@@ -1,4 +1,15 @@
 import { scheduleCallback } from "./scheduler";
+import {
+  HEADER_SIZE_IN_BYTES,
+  SnapshotHeader,
+  checkBuildId,
+  checkSnapshotChain,
+  decompressSnapshot,
+  materializeHeap,
+  readSnapshotHeader,
+  restoreHeap,
+  writeSparseSnapshot,
+} from "./snapshot-format";
 
 declare var Module: any;
 
@@ -80,32 +91,12 @@ type SerializedHiwireValue =
 export type SnapshotConfig = {
   hiwireKeys: SerializedHiwireValue[];
   immortalKeys: string[];
+  // In a delta snapshot, the number of leading keys that are the same as in
+  // the base snapshot. Only the keys after those are stored.
+  baseHiwireKeys?: number;
+  baseImmortalKeys?: number;
 };
 
-const SNAPSHOT_MAGIC = 0x706e7300; // "\x00snp"
-const HEADER_SIZE_IN_BYTES =
-  4 /* magic */ +
-  4 /* offset to binary */ +
-  4 /* json length */ +
-  4 /* padding */ +
-  32; /* build id */
-
-function encodeBuildId(buildId: string, buffer: Uint32Array): void {
-  if (buffer.length !== 8) {
-    throw new Error("Expected 256 bit buffer");
-  }
-  for (let i = 0; i < 32; i++) {
-    buffer[i] = parseInt(buildId.slice(i * 8, (i + 1) * 8), 16);
-  }
-}
-
-function decodeBuildId(buffer: Uint32Array): string {
-  if (buffer.length !== 8) {
-    throw new Error("Expected 256 bit buffer");
-  }
-  return Array.from(buffer, (n) => n.toString(16).padStart(8, "0")).join("");
-}
-
 function checkEntry(index: number, value: any, expected: any): void {
   if (value === expected) {
     return;
@@ -227,61 +218,121 @@ API.serializeHiwireState = function (
   };
 };
 
-API.makeSnapshot = function (serializer?: (obj: any) => any): Uint8Array {
+function commonPrefixLength(a: any[], b: any[]): number {
+  let i = 0;
+  while (
+    i < a.length &&
+    i < b.length &&
+    JSON.stringify(a[i]) === JSON.stringify(b[i])
+  ) {
+    i++;
+  }
+  return i;
+}
+
+function diffSnapshotConfig(
+  base: SnapshotConfig,
+  config: SnapshotConfig,
+): SnapshotConfig {
+  const baseHiwireKeys = commonPrefixLength(base.hiwireKeys, config.hiwireKeys);
+  const baseImmortalKeys = commonPrefixLength(
+    base.immortalKeys,
+    config.immortalKeys,
+  );
+  return {
+    hiwireKeys: config.hiwireKeys.slice(baseHiwireKeys),
+    immortalKeys: config.immortalKeys.slice(baseImmortalKeys),
+    baseHiwireKeys,
+    baseImmortalKeys,
+  };
+}
+
+function applySnapshotConfigDelta(
+  base: SnapshotConfig,
+  delta: SnapshotConfig,
+): SnapshotConfig {
+  return {
+    hiwireKeys: base.hiwireKeys
+      .slice(0, delta.baseHiwireKeys)
+      .concat(delta.hiwireKeys),
+    immortalKeys: base.immortalKeys
+      .slice(0, delta.baseImmortalKeys)
+      .concat(delta.immortalKeys),
+  };
+}
+
+/**
+ * Read the headers of a base snapshot followed by the delta snapshots on top of
+ * it and work out the combined SnapshotConfig.
+ */
+function readSnapshotChain(snapshots: Uint8Array[]): {
+  headers: SnapshotHeader[];
+  snapshotConfig: SnapshotConfig;
+} {
+  const headers = snapshots.map((snapshot) => readSnapshotHeader(snapshot));
+  for (const header of headers) {
+    checkBuildId(header, API.config.BUILD_ID);
+  }
+  checkSnapshotChain(headers);
+  let snapshotConfig: SnapshotConfig | undefined;
+  for (let i = 0; i < snapshots.length; i++) {
+    const jsonBuf = snapshots[i].subarray(
+      HEADER_SIZE_IN_BYTES,
+      HEADER_SIZE_IN_BYTES + headers[i].jsonLength,
+    );
+    const config: SnapshotConfig = JSON.parse(
+      new TextDecoder().decode(jsonBuf),
+    );
+    snapshotConfig = snapshotConfig
+      ? applySnapshotConfigDelta(snapshotConfig, config)
+      : config;
+  }
+  return { headers, snapshotConfig: snapshotConfig! };
+}
+
+API.decompressSnapshot = decompressSnapshot;
+
+API.makeSnapshot = function (
+  serializer?: (obj: any) => any,
+  base?: Uint8Array | Uint8Array[],
+): Uint8Array {
   if (!API.config._makeSnapshot) {
     throw new Error(
       "makeSnapshot only works if you passed the makeSnapshot option to loadPyodide",
     );
   }
+  if (!base) {
+    const snapshotConfig = API.serializeHiwireState(serializer);
+    const json = new TextEncoder().encode(JSON.stringify(snapshotConfig));
+    return writeSparseSnapshot(Module.HEAPU8, json, API.config.BUILD_ID);
+  }
+  const chain = Array.isArray(base) ? base : [base];
+  const { headers, snapshotConfig: baseConfig } = readSnapshotChain(chain);
+  const baseId = headers[headers.length - 1].id;
+  if (!baseId) {
+    throw new Error("Cannot make a delta against a snapshot in the old format");
+  }
+  // Throws if a base snapshot is compressed: inflating is async.
+  const baseHeap = materializeHeap(chain, headers);
   const snapshotConfig = API.serializeHiwireState(serializer);
-  const snapshotConfigString = JSON.stringify(snapshotConfig);
-  let snapshotOffset = HEADER_SIZE_IN_BYTES + 2 * snapshotConfigString.length;
-  // align to 16 bytes
-  snapshotOffset = Math.ceil(snapshotOffset / 16) * 16;
-  const snapshot = new Uint8Array(snapshotOffset + Module.HEAP8.length);
-  const encoder = new TextEncoder();
-  const { written: jsonLength } = encoder.encodeInto(
-    snapshotConfigString,
-    snapshot.subarray(HEADER_SIZE_IN_BYTES),
-  );
-  const uint32View = new Uint32Array(snapshot.buffer);
-  uint32View[0] = SNAPSHOT_MAGIC;
-  uint32View[1] = snapshotOffset;
-  uint32View[2] = jsonLength!;
-  uint32View[3] = 0; // padding
-  encodeBuildId(API.config.BUILD_ID, uint32View.subarray(4, 4 + 8));
-  snapshot.subarray(snapshotOffset).set(Module.HEAP8);
-  return snapshot;
+  const delta = diffSnapshotConfig(baseConfig, snapshotConfig);
+  const json = new TextEncoder().encode(JSON.stringify(delta));
+  return writeSparseSnapshot(Module.HEAPU8, json, API.config.BUILD_ID, {
+    heap: baseHeap,
+    id: baseId,
+  });
 };
 
-API.restoreSnapshot = function (snapshot: Uint8Array): SnapshotConfig {
-  const uint32View = new Uint32Array(
-    snapshot.buffer,
-    snapshot.byteOffset,
-    snapshot.byteLength / 4,
-  );
-  if (uint32View[0] !== SNAPSHOT_MAGIC) {
-    throw new Error("Snapshot has invalid magic number");
+API.restoreSnapshot = function (
+  snapshots: Uint8Array | Uint8Array[],
+): SnapshotConfig {
+  if (!Array.isArray(snapshots)) {
+    snapshots = [snapshots];
   }
-  const snapshotOffset = uint32View[1];
-  const jsonLength = uint32View[2];
-  const buildId = decodeBuildId(uint32View.subarray(4, 4 + 8));
-  if (buildId !== API.config.BUILD_ID) {
-    throw new Error(
-      "Snapshot build id mismatch\n" +
-        `expected: ${API.config.BUILD_ID}\n` +
-        `got     : ${buildId}\n`,
-    );
+  const { headers, snapshotConfig } = readSnapshotChain(snapshots);
+  for (let i = 0; i < snapshots.length; i++) {
+    restoreHeap(Module.HEAPU8, snapshots[i], headers[i]);
   }
-  const jsonBuf = snapshot.subarray(
-    HEADER_SIZE_IN_BYTES,
-    HEADER_SIZE_IN_BYTES + jsonLength,
-  );
-  snapshot = snapshot.subarray(snapshotOffset);
-  const jsonStr = new TextDecoder().decode(jsonBuf);
-  const snapshotConfig: SnapshotConfig = JSON.parse(jsonStr);
-  // @ts-ignore
-  Module.HEAP8.set(snapshot);
   return snapshotConfig;
 };
 
@@ -391,6 +391,8 @@ export function setStdin(
 
 type StdwriteOpts = {
   batched?: (a: string) => void;
+  chunked?: (a: string) => void | boolean;
+  chunkSize?: number;
   raw?: (a: number) => void;
   isatty?: boolean;
 };
@@ -400,16 +402,16 @@ function _setStdwrite(
   setOps: (ops: Writer) => void,
   getDefaults: () => StdwriteOpts & Partial<Writer>,
 ) {
-  let { raw, isatty, batched, write } = options as StdwriteOpts &
-    Partial<Writer>;
-  let nset = +!!raw + +!!batched + +!!write;
+  let { raw, isatty, batched, chunked, chunkSize, write } =
+    options as StdwriteOpts & Partial<Writer>;
+  let nset = +!!raw + +!!batched + +!!chunked + +!!write;
   if (nset === 0) {
     options = getDefaults();
-    ({ raw, isatty, batched, write } = options);
+    ({ raw, isatty, batched, chunked, chunkSize, write } = options);
   }
   if (nset > 1) {
     throw new TypeError(
-      "At most one of 'raw', 'batched', and 'write' must be passed",
+      "At most one of 'raw', 'batched', 'chunked', and 'write' must be passed",
     );
   }
   if (!raw && !write && isatty) {
@@ -417,12 +419,23 @@ function _setStdwrite(
       "Cannot set 'isatty' to true unless 'raw' or 'write' is provided",
     );
   }
+  if (!chunked && chunkSize !== undefined) {
+    throw new TypeError(
+      "The 'chunkSize' option can only be used with the 'chunked' option",
+    );
+  }
+  if (chunkSize !== undefined && !(chunkSize >= 1)) {
+    throw new TypeError("The 'chunkSize' option must be a positive number");
+  }
   if (raw) {
     setOps(new CharacterCodeWriter(raw.bind(options), !!isatty));
   }
   if (batched) {
     setOps(new StringWriter(batched.bind(options)));
   }
+  if (chunked) {
+    setOps(new ChunkedWriter(chunked.bind(options), chunkSize));
+  }
   if (write) {
     setOps(options as Writer);
   }
@@ -468,6 +481,15 @@ function _getStderrDefaults(): StdwriteOpts & Partial<Writer> {
  * newline character is written or stdout is flushed. In the former
  * case, the received line will end with a newline, in the latter case it will
  * not.
+ * @param options.chunked A chunked handler is called with a string containing
+ * all of the output (including newlines) that was written since the last call.
+ * Output is collected in a buffer and delivered when the buffer is full, when
+ * stdout is flushed, or in a microtask after the current task. If the handler
+ * returns ``false`` the output is kept and delivered again after a delay that
+ * grows up to a second; once the buffer fills up writes fail with ``EAGAIN``
+ * until the handler accepts it.
+ * @param options.chunkSize The size in bytes of the buffer used with a chunked
+ * handler (default 65536).
  * @param options.raw A raw handler is called with the handler is called with a
  * `number` for each byte of the output to stdout.
  * @param options.write A write handler is called with a buffer that contains
@@ -494,6 +516,8 @@ function _getStderrDefaults(): StdwriteOpts & Partial<Writer> {
 export function setStdout(
   options: {
     batched?: (output: string) => void;
+    chunked?: (output: string) => void | boolean;
+    chunkSize?: number;
     raw?: (charCode: number) => void;
     write?: (buffer: Uint8Array) => number;
     isatty?: boolean;
@@ -509,6 +533,8 @@ export function setStdout(
 export function setStderr(
   options: {
     batched?: (output: string) => void;
+    chunked?: (output: string) => void | boolean;
+    chunkSize?: number;
     raw?: (charCode: number) => void;
     write?: (buffer: Uint8Array) => number;
     isatty?: boolean;
@@ -519,6 +545,7 @@ export function setStderr(
 
 const _TextEncoder = globalThis.TextEncoder ?? function () {};
 const textencoder = new _TextEncoder();
+const _TextDecoder = globalThis.TextDecoder ?? function () {};
 
 // Reader implementations
 
@@ -686,16 +713,34 @@ class StringWriter {
     this.output = [];
   }
 
-  write(buffer: Uint8Array) {
-    for (let val of buffer) {
-      if (val === 10 /* charCode('\n') */) {
-        this.out(UTF8ArrayToString(new Uint8Array(this.output)));
-        this.output = [];
-      } else if (val !== 0) {
+  _push(bytes: Uint8Array) {
+    for (let val of bytes) {
+      if (val !== 0) {
         // val == 0 would cut text output off in the middle.
         this.output.push(val);
       }
     }
+  }
+
+  _takeLine(bytes: Uint8Array): string {
+    if (this.output.length === 0 && bytes.indexOf(0) === -1) {
+      // Common case: the whole line is in this buffer, decode it directly.
+      return UTF8ArrayToString(bytes);
+    }
+    this._push(bytes);
+    const line = UTF8ArrayToString(new Uint8Array(this.output));
+    this.output = [];
+    return line;
+  }
+
+  write(buffer: Uint8Array) {
+    let start = 0;
+    let end;
+    while ((end = buffer.indexOf(10 /* charCode('\n') */, start)) !== -1) {
+      this.out(this._takeLine(buffer.subarray(start, end)));
+      start = end + 1;
+    }
+    this._push(buffer.subarray(start));
     return buffer.length;
   }
 
@@ -707,6 +752,115 @@ class StringWriter {
   }
 }
 
+/**
+ * Collects output in a fixed size buffer and passes it to the handler in large
+ * chunks so that printing many short lines doesn't call into the handler and
+ * decode once per line.
+ */
+class ChunkedWriter {
+  out: (a: string) => void | boolean;
+  isatty: boolean = false;
+  buffer: Uint8Array;
+  length: number;
+  decoder: TextDecoder;
+  // Output that the handler refused and that we need to deliver again.
+  pending: string | undefined;
+  flushScheduled: boolean;
+  // How long to wait before delivering pending output again, in ms.
+  retryDelay: number;
+
+  constructor(out: (a: string) => void | boolean, chunkSize: number = 65536) {
+    this.out = out;
+    this.buffer = new Uint8Array(chunkSize);
+    this.length = 0;
+    this.decoder = new _TextDecoder();
+    this.pending = undefined;
+    this.flushScheduled = false;
+    this.retryDelay = 0;
+  }
+
+  /**
+   * Pass the buffered output to the handler. Returns false if the handler
+   * signalled backpressure and the buffer could not be emptied.
+   */
+  _deliver(): boolean {
+    if (this.pending !== undefined) {
+      if (this.out(this.pending) === false) {
+        return false;
+      }
+      this.pending = undefined;
+    }
+    if (this.length === 0) {
+      return true;
+    }
+    // stream: true keeps a multibyte character that was split at the end of
+    // the buffer until the rest of it is written.
+    const text = this.decoder.decode(this.buffer.subarray(0, this.length), {
+      stream: true,
+    });
+    this.length = 0;
+    if (text && this.out(text) === false) {
+      this.pending = text;
+    }
+    return true;
+  }
+
+  _scheduleFlush() {
+    if (
+      this.flushScheduled ||
+      (this.length === 0 && this.pending === undefined)
+    ) {
+      return;
+    }
+    this.flushScheduled = true;
+    const flush = () => {
+      this.flushScheduled = false;
+      this._deliver();
+      if (this.pending === undefined) {
+        this.retryDelay = 0;
+        return;
+      }
+      // The handler refused the output. Nothing else may write to trigger
+      // another attempt, so try again later, backing off up to a second.
+      this.retryDelay = Math.min(Math.max(2 * this.retryDelay, 1), 1000);
+      this._scheduleFlush();
+    };
+    if (this.retryDelay) {
+      setTimeout(flush, this.retryDelay);
+    } else {
+      queueMicrotask(flush);
+    }
+  }
+
+  write(buffer: Uint8Array): number {
+    let written = 0;
+    while (written < buffer.length) {
+      if (this.length === this.buffer.length && !this._deliver()) {
+        break;
+      }
+      const n = Math.min(
+        buffer.length - written,
+        this.buffer.length - this.length,
+      );
+      this.buffer.set(buffer.subarray(written, written + n), this.length);
+      this.length += n;
+      written += n;
+    }
+    if (written === 0 && buffer.length > 0) {
+      // The handler isn't accepting output. handleEAGAIN retries the write
+      // after a delay if it can.
+      throw { code: "EAGAIN" };
+    }
+    this._scheduleFlush();
+    return written;
+  }
+
+  fsync() {
+    this._deliver();
+    this._scheduleFlush();
+  }
+}
+
 class NodeWriter {
   fd: number;
   isatty: boolean;
@@ -0,0 +1,42 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+import { strictJSONStringify } from "../../../common/strictJSON";
+
+describe("strictJSONStringify", () => {
+  it("should serialize JSON-shaped values", () => {
+    const value = {
+      a: [1, 2.5, "x", true, 2 ** 53 - 1, 1.5e-300],
+      b: Object.assign(Object.create(null), { c: {} }),
+    };
+    assert.equal(strictJSONStringify(value), JSON.stringify(value));
+    assert.equal(strictJSONStringify("x"), '"x"');
+  });
+
+  it("should only accept null if it converts to None", () => {
+    assert.equal(strictJSONStringify({ a: null }), undefined);
+    assert.equal(strictJSONStringify({ a: null }, true), '{"a":null}');
+  });
+
+  it("should reject values that JSON does not round trip", () => {
+    const cyclic: any = {};
+    cyclic.self = cyclic;
+    for (const value of [
+      undefined,
+      { a: undefined },
+      [1, , 3],
+      [NaN],
+      { a: Infinity },
+      [1e21],
+      [2 ** 53],
+      { a: -(2 ** 60) },
+      new Map(),
+      { d: new Date(0) },
+      [new Uint8Array(2)],
+      { f() {} },
+      [1n],
+      cyclic,
+    ]) {
+      assert.equal(strictJSONStringify(value), undefined);
+    }
+  });
+});
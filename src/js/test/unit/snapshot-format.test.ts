@@ -0,0 +1,258 @@
+import assert from "node:assert/strict";
+import { describe, it } from "node:test";
+import {
+  SNAPSHOT_FLAG_DEFLATE,
+  SNAPSHOT_FLAG_DELTA,
+  SNAPSHOT_FLAG_SPARSE,
+  SNAPSHOT_PAGE_SIZE,
+  compressSnapshot,
+  decompressSnapshot,
+  describeSnapshot,
+  checkSnapshotChain,
+  findChangedRuns,
+  materializeHeap,
+  readSnapshotHeader,
+  readSnapshotStream,
+  restoreHeap,
+  writeSparseSnapshot,
+} from "../../snapshot-format";
+
+const BUILD_ID = "0123456789abcdef".repeat(4);
+const JSON_CONFIG = new TextEncoder().encode('{"hiwireKeys":[]}');
+
+function makeHeap(): Uint8Array {
+  const heap = new Uint8Array(16 * SNAPSHOT_PAGE_SIZE);
+  heap[0] = 1;
+  heap[SNAPSHOT_PAGE_SIZE + 5] = 2;
+  heap[5 * SNAPSHOT_PAGE_SIZE - 1] = 3;
+  heap[heap.length - 1] = 4;
+  return heap;
+}
+
+describe("findChangedRuns", () => {
+  it("should find the runs of nonzero pages", () => {
+    assert.deepEqual(findChangedRuns(makeHeap(), SNAPSHOT_PAGE_SIZE), [
+      0, 2, 4, 1, 15, 1,
+    ]);
+  });
+  it("should return no runs for an empty heap", () => {
+    const heap = new Uint8Array(4 * SNAPSHOT_PAGE_SIZE);
+    assert.deepEqual(findChangedRuns(heap, SNAPSHOT_PAGE_SIZE), []);
+  });
+  it("should find the runs of pages that differ from the base", () => {
+    const base = makeHeap();
+    const heap = new Uint8Array(20 * SNAPSHOT_PAGE_SIZE);
+    heap.set(base);
+    heap[3 * SNAPSHOT_PAGE_SIZE] = 9;
+    heap[17 * SNAPSHOT_PAGE_SIZE] = 9;
+    assert.deepEqual(findChangedRuns(heap, SNAPSHOT_PAGE_SIZE, base), [
+      3, 1, 17, 1,
+    ]);
+  });
+});
+
+describe("writeSparseSnapshot", () => {
+  it("should leave out zero pages", () => {
+    const heap = makeHeap();
+    const snapshot = writeSparseSnapshot(heap, JSON_CONFIG, BUILD_ID);
+    const header = readSnapshotHeader(snapshot);
+    assert.equal(header.flags, SNAPSHOT_FLAG_SPARSE);
+    assert.equal(header.buildId, BUILD_ID);
+    assert.equal(header.heapLength, heap.length);
+    assert.equal(header.dataLength, 4 * SNAPSHOT_PAGE_SIZE);
+    assert.equal(snapshot.length, header.snapshotOffset + header.dataLength);
+  });
+
+  it("should round trip through restoreHeap", () => {
+    const heap = makeHeap();
+    const snapshot = writeSparseSnapshot(heap, JSON_CONFIG, BUILD_ID);
+    const restored = new Uint8Array(heap.length).fill(0xff);
+    restoreHeap(restored, snapshot, readSnapshotHeader(snapshot));
+    assert.deepEqual(restored, heap);
+  });
+
+  it("should reject a heap that is too small", () => {
+    const heap = makeHeap();
+    const snapshot = writeSparseSnapshot(heap, JSON_CONFIG, BUILD_ID);
+    assert.throws(
+      () =>
+        restoreHeap(
+          new Uint8Array(SNAPSHOT_PAGE_SIZE),
+          snapshot,
+          readSnapshotHeader(snapshot),
+        ),
+      /Snapshot needs a heap/,
+    );
+  });
+});
+
+describe("delta snapshots", () => {
+  function makeChain() {
+    const baseHeap = makeHeap();
+    const base = writeSparseSnapshot(baseHeap, JSON_CONFIG, BUILD_ID);
+    const heap = new Uint8Array(20 * SNAPSHOT_PAGE_SIZE);
+    heap.set(baseHeap);
+    heap[0] = 0;
+    heap[3 * SNAPSHOT_PAGE_SIZE] = 9;
+    heap[19 * SNAPSHOT_PAGE_SIZE] = 9;
+    const delta = writeSparseSnapshot(heap, JSON_CONFIG, BUILD_ID, {
+      heap: baseHeap,
+      id: readSnapshotHeader(base).id,
+    });
+    return { heap, base, delta };
+  }
+
+  it("should only store the changed pages", () => {
+    const { delta } = makeChain();
+    const header = readSnapshotHeader(delta);
+    assert.equal(header.flags, SNAPSHOT_FLAG_SPARSE | SNAPSHOT_FLAG_DELTA);
+    assert.equal(header.heapLength, 20 * SNAPSHOT_PAGE_SIZE);
+    assert.equal(header.dataLength, 3 * SNAPSHOT_PAGE_SIZE);
+  });
+
+  it("should restore base then delta", () => {
+    const { heap, base, delta } = makeChain();
+    const snapshots = [base, delta];
+    const headers = snapshots.map((s) => readSnapshotHeader(s));
+    assert.deepEqual(materializeHeap(snapshots, headers), heap);
+  });
+
+  it("should check the chain", () => {
+    const { base, delta } = makeChain();
+    const other = writeSparseSnapshot(makeHeap(), JSON_CONFIG, BUILD_ID);
+    const check = (...snapshots: Uint8Array[]) =>
+      checkSnapshotChain(snapshots.map((s) => readSnapshotHeader(s)));
+    check(base, delta);
+    assert.throws(() => check(delta), /must be loaded together with its base/);
+    assert.throws(() => check(base, other), /can be a full snapshot/);
+    assert.throws(() => check(other, delta), /was not made against/);
+  });
+
+  it("should not materialize a compressed chain", async () => {
+    const { heap, base, delta } = makeChain();
+    const snapshots = [await compressSnapshot(base), delta];
+    const headers = snapshots.map((s) => readSnapshotHeader(s));
+    assert.throws(
+      () => materializeHeap(snapshots, headers),
+      /Base snapshot at index 0 is compressed, decompress it first/,
+    );
+    snapshots[0] = await decompressSnapshot(snapshots[0]);
+    headers[0] = readSnapshotHeader(snapshots[0]);
+    assert.deepEqual(materializeHeap(snapshots, headers), heap);
+  });
+});
+
+describe("compressSnapshot", () => {
+  it("should round trip through decompressSnapshot", async () => {
+    const heap = makeHeap();
+    const snapshot = writeSparseSnapshot(heap, JSON_CONFIG, BUILD_ID);
+    const compressed = await compressSnapshot(snapshot);
+    assert.equal(
+      readSnapshotHeader(compressed).flags,
+      SNAPSHOT_FLAG_SPARSE | SNAPSHOT_FLAG_DEFLATE,
+    );
+    assert.ok(compressed.length < snapshot.length);
+    assert.throws(
+      () => restoreHeap(heap, compressed, readSnapshotHeader(compressed)),
+      /must be decompressed first/,
+    );
+    assert.deepEqual(await decompressSnapshot(compressed), snapshot);
+  });
+
+  it("should leave uncompressed snapshots alone", async () => {
+    const snapshot = writeSparseSnapshot(makeHeap(), JSON_CONFIG, BUILD_ID);
+    assert.equal(await decompressSnapshot(snapshot), snapshot);
+  });
+});
+
+describe("readSnapshotStream", () => {
+  // A stream that hands out the snapshot in small chunks and only sends the
+  // rest once release is called.
+  function makeStream(snapshot: Uint8Array, headerLength: number) {
+    let release!: () => void;
+    const released = new Promise<void>((resolve) => (release = resolve));
+    let pos = 0;
+    const stream = new ReadableStream<Uint8Array>({
+      async pull(controller) {
+        if (pos >= headerLength) {
+          await released;
+        }
+        if (pos >= snapshot.length) {
+          controller.close();
+          return;
+        }
+        controller.enqueue(snapshot.slice(pos, pos + 100));
+        pos += 100;
+      },
+    });
+    return { stream, release };
+  }
+
+  for (const compress of [false, true]) {
+    it(`should resolve once the header arrived (compress: ${compress})`, async () => {
+      let snapshot = writeSparseSnapshot(makeHeap(), JSON_CONFIG, BUILD_ID);
+      const expected = snapshot;
+      if (compress) {
+        snapshot = await compressSnapshot(snapshot);
+      }
+      const headerLength = readSnapshotHeader(snapshot).snapshotOffset;
+      const { stream, release } = makeStream(snapshot, headerLength);
+      const pending = await readSnapshotStream(stream);
+      assert.equal(pending.header.heapLength, 16 * SNAPSHOT_PAGE_SIZE);
+      assert.equal(pending.header.flags, SNAPSHOT_FLAG_SPARSE);
+      release();
+      assert.deepEqual(await pending.snapshot, expected);
+    });
+  }
+
+  it("should reject a truncated stream", async () => {
+    const snapshot = writeSparseSnapshot(makeHeap(), JSON_CONFIG, BUILD_ID);
+    const { stream, release } = makeStream(
+      snapshot.subarray(0, snapshot.length - 10),
+      0,
+    );
+    release();
+    const pending = await readSnapshotStream(stream);
+    await assert.rejects(pending.snapshot, /Snapshot heap data is truncated/);
+  });
+});
+
+describe("readSnapshotHeader", () => {
+  it("should reject a bad magic number", () => {
+    assert.throws(
+      () => readSnapshotHeader(new Uint8Array(64)),
+      /Snapshot has invalid magic number/,
+    );
+  });
+});
+
+describe("describeSnapshot", () => {
+  it("should count pages and hiwire keys", () => {
+    const config = {
+      hiwireKeys: [null, { path: ["a"] }, { serialized: "xyz" }, { API: true }],
+      immortalKeys: ["a", "b"],
+    };
+    const json = new TextEncoder().encode(JSON.stringify(config));
+    const snapshot = writeSparseSnapshot(makeHeap(), json, BUILD_ID);
+    const manifest = describeSnapshot(snapshot);
+    assert.equal(manifest.sparse, true);
+    assert.equal(manifest.compressed, false);
+    assert.equal(manifest.delta, false);
+    assert.equal(manifest.size, snapshot.length);
+    assert.equal(manifest.heapSize, 16 * SNAPSHOT_PAGE_SIZE);
+    assert.equal(manifest.totalPages, 16);
+    assert.equal(manifest.storedPages, 4);
+    assert.equal(manifest.configSize, json.length);
+    assert.deepEqual(manifest.hiwireKeys, {
+      total: 4,
+      base: 0,
+      null: 1,
+      path: 1,
+      serialized: 1,
+      API: 1,
+      abortSignalAny: 0,
+    });
+    assert.equal(manifest.immortalKeys, 2);
+    assert.deepEqual(manifest.serializedSizes, [{ index: 2, size: 5 }]);
+  });
+});
@@ -113,6 +113,7 @@ declare global {
     is_json_adaptor: boolean,
   ) => number;
   export const __pyproxy_type: (ptr: number) => string;
+  export const __pyproxy_sizeof: (ptr: number) => number;
   export const __pyproxy_repr: (ptr: number) => string;
   export const __pyproxy_getitem: (
     obj: number,
@@ -120,17 +121,39 @@ declare global {
     cache: Map<string, any>,
     is_json_adaptor: boolean,
   ) => any;
+  export const __pyproxy_sequence_to_array: (
+    ptr: number,
+    cache: Map<string, any>,
+    is_json_adaptor: boolean,
+  ) => any[];
   export const __pyproxy_setitem: (ptr: number, key: any, value: any) => number;
   export const __pyproxy_delitem: (ptr: number, key: any) => number;
   export const __pyproxy_contains: (ptr: number, key: any) => number;
   export const __pyproxy_GetIter: (ptr: number) => number;
   export const __pyproxy_GetAIter: (ptr: number) => number;
   export const __pyproxy_aiter_next: (ptr: number) => any;
-  export const __pyproxy_iter_next: (
+  export const __pyproxy_iter_fill: (
     ptr: number,
     cache: Map<string, any>,
     is_json_adaptor: boolean,
-  ) => any;
+    max: number,
+    buffer: any[],
+  ) => number;
+  export const __pyproxy_iter_can_read_ahead: (ptr: number) => boolean;
+  export const __pyproxy_list_iter_state: (ptr: number) => number;
+  export const __pyproxy_list_fill: (
+    state: number,
+    start: number,
+    cache: Map<string, any>,
+    is_json_adaptor: boolean,
+    max: number,
+    buffer: any[],
+  ) => number;
+  export const __pyproxy_list_item_is: (
+    state: number,
+    index: number,
+    pos: number,
+  ) => boolean;
   export const __pyproxyGen_Send: (
     ptr: number,
     arg: any,
@@ -179,6 +202,11 @@ declare global {
     kwargs_names: string[],
     num_kwargs: number,
   ) => any;
+  export const __pyproxy_vectorcall: (
+    ptr: number,
+    pyargs: number,
+    nargs: number,
+  ) => any;
   export const __iscoroutinefunction: (a: number) => number;
 }
 
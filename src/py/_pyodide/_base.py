@@ -7,15 +7,19 @@ A library of helper utilities for connecting Python to the browser environment.
 
 import ast
 import builtins
+import hashlib
 import linecache
+import marshal
 import tokenize
+from collections import OrderedDict
 from collections.abc import Generator
 from copy import deepcopy
 from importlib import import_module
+from importlib.util import MAGIC_NUMBER
 from io import StringIO
 from textwrap import dedent
 from types import CodeType
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
 
 
 def should_quiet(source: str, /) -> bool:
@@ -284,6 +288,18 @@ class CodeRunner:
         )
         self.ast = next(self._gen)
 
+    @classmethod
+    def _from_code(cls, source: str, code: CodeType) -> "CodeRunner":
+        """Make an already compiled ``CodeRunner`` from a cached code object.
+
+        The result has no ``ast`` attribute since the source was never parsed.
+        """
+        self = cls.__new__(cls)
+        self._compiled = True
+        self._source = source
+        self.code = code
+        return self
+
     def compile(self) -> "CodeRunner":
         """Compile the current value of ``self.ast`` and store the result in ``self.code``.
 
@@ -415,6 +431,196 @@ class CodeRunner:
             return e.value
 
 
+class CodeCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+_CodeCacheKey = tuple[bytes, str, bool, str, int, bool, int]
+
+
+class CodeCache:
+    """A least recently used cache of the code objects compiled by
+    :py:func:`eval_code` and :py:func:`eval_code_async`.
+
+    Entries are keyed on a hash of the source together with every argument that
+    affects compilation, so a hit returns exactly the code object that a fresh
+    compile would have produced. Code run through a :py:class:`CodeRunner` is
+    never cached because its ast may be transformed before compilation.
+
+    Parameters
+    ----------
+    maxsize :
+
+        The maximum number of code objects to keep. When the cache is full the
+        least recently used entry is evicted. A ``maxsize`` of ``0`` disables
+        the cache.
+
+    Examples
+    --------
+    >>> cache = CodeCache(maxsize=2)
+    >>> key = cache.make_key("1 + 1")
+    >>> cache.get(key) is None
+    True
+    >>> cache.put(key, compile("1 + 1", "<exec>", "eval"))
+    >>> cache.get(key) # doctest: +ELLIPSIS
+    <code object <module> at 0x...>
+    >>> cache.info()
+    CodeCacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[_CodeCacheKey, CodeType] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """The maximum number of entries. Shrinking it evicts the oldest entries."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("maxsize must be non-negative")
+        self._maxsize = value
+        self._evict()
+
+    @staticmethod
+    def make_key(
+        source: str,
+        *,
+        return_mode: str = "last_expr",
+        quiet_trailing_semicolon: bool = True,
+        filename: str = "<exec>",
+        flags: int = 0x0,
+        dont_inherit: bool = False,
+        optimize: int = -1,
+    ) -> _CodeCacheKey:
+        """Compute the cache key for compiling ``source`` with the given
+        arguments. The arguments have the same meaning as for
+        :py:func:`eval_code`.
+        """
+        digest = hashlib.sha256(source.encode(errors="surrogatepass")).digest()
+        return (
+            digest,
+            return_mode,
+            quiet_trailing_semicolon,
+            filename,
+            flags,
+            dont_inherit,
+            optimize,
+        )
+
+    def get(self, key: _CodeCacheKey) -> CodeType | None:
+        """Look up ``key``, returning ``None`` on a miss."""
+        code = self._entries.get(key)
+        if code is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return code
+
+    def put(self, key: _CodeCacheKey, code: CodeType) -> None:
+        """Store ``code`` under ``key``, evicting old entries if needed."""
+        if self._maxsize == 0:
+            return
+        self._entries[key] = code
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CodeCacheInfo:
+        """Report the hit and miss counts and the current size of the cache."""
+        return CodeCacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def save(self, path: str) -> None:
+        """Marshal the cached code objects into the file at ``path``.
+
+        The file can be restored with :py:meth:`CodeCache.load` in a later
+        session, for instance from a directory mounted with IDBFS.
+        """
+        data = marshal.dumps((MAGIC_NUMBER, list(self._entries.items())))
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def load(self, path: str) -> int:
+        """Add the code objects saved by :py:meth:`CodeCache.save` to the cache.
+
+        Files written by a different Python version are ignored.
+
+        Returns
+        -------
+            The number of entries that were loaded.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            magic, entries = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            return 0
+        if magic != MAGIC_NUMBER:
+            return 0
+        for key, code in entries:
+            self.put(key, code)
+        return len(entries)
+
+
+code_cache = CodeCache()
+"""The cache used by :py:func:`eval_code` and :py:func:`eval_code_async`."""
+
+
+def _cached_code_runner(
+    source: str,
+    *,
+    return_mode: ReturnMode,
+    quiet_trailing_semicolon: bool,
+    filename: str,
+    flags: int,
+    dont_inherit: bool,
+    optimize: int,
+) -> CodeRunner:
+    key = code_cache.make_key(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    )
+    code = code_cache.get(key)
+    if code is not None:
+        return CodeRunner._from_code(source, code)
+    runner = CodeRunner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).compile()
+    assert runner.code
+    code_cache.put(key, runner.code)
+    return runner
+
+
 def eval_code(
     source: str,
     globals: dict[str, Any] | None = None,
@@ -509,19 +715,15 @@ def eval_code(
                   ^^^^^^^
     NameError: name 'pyodide' is not defined
     """
-    return (
-        CodeRunner(
-            source,
-            return_mode=return_mode,
-            quiet_trailing_semicolon=quiet_trailing_semicolon,
-            filename=filename,
-            flags=flags,
-            dont_inherit=dont_inherit,
-            optimize=optimize,
-        )
-        .compile()
-        .run(globals, locals)
-    )
+    return _cached_code_runner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).run(globals, locals)
 
 
 async def eval_code_async(
@@ -593,19 +795,15 @@ async def eval_code_async(
         parameters to modify this default behavior.
     """
     flags = flags or ast.PyCF_ALLOW_TOP_LEVEL_AWAIT
-    return (
-        await CodeRunner(
-            source,
-            return_mode=return_mode,
-            quiet_trailing_semicolon=quiet_trailing_semicolon,
-            filename=filename,
-            flags=flags,
-            dont_inherit=dont_inherit,
-            optimize=optimize,
-        )
-        .compile()
-        .run_async(globals, locals)
-    )
+    return await _cached_code_runner(
+        source,
+        return_mode=return_mode,
+        quiet_trailing_semicolon=quiet_trailing_semicolon,
+        filename=filename,
+        flags=flags,
+        dont_inherit=dont_inherit,
+        optimize=optimize,
+    ).run_async(globals, locals)
 
 
 def _add_prefixes(s: set[str], mod: str) -> None:
@@ -616,15 +814,57 @@ def _add_prefixes(s: set[str], mod: str) -> None:
         s.add(current)
 
 
-def find_imports(source: str) -> list[str]:
+def _iter_statements(mod: ast.Module) -> Generator[ast.AST]:
+    """Yield every statement in ``mod``, including nested ones.
+
+    Import statements can only appear where statements can, so unlike
+    :py:func:`ast.walk` this never descends into expressions.
+    """
+    todo: list[ast.AST] = list(mod.body)
+    while todo:
+        node = todo.pop()
+        yield node
+        # ExceptHandler and match_case nodes hold statements in their body too
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            todo.extend(getattr(node, field, ()))
+
+
+def _find_imports_ast(mod: ast.Module) -> list[str]:
+    imports: set[str] = set()
+    for node in _iter_statements(mod):
+        if isinstance(node, ast.Import):
+            for name in node.names:
+                node_name = name.name
+                _add_prefixes(imports, node_name)
+        elif isinstance(node, ast.ImportFrom):
+            module_name = node.module
+            if module_name is None:
+                continue
+            _add_prefixes(imports, module_name)
+    return sorted(imports)
+
+
+_FIND_IMPORTS_CACHE_SIZE = 128
+_find_imports_cache: OrderedDict[str, list[str]] = OrderedDict()
+
+
+def find_imports(source: str, mod: ast.Module | None = None) -> list[str]:
     """
     Finds the imports in a Python source code string
 
+    Results are memoized, so repeated calls with the same ``source`` don't parse
+    it again.
+
     Parameters
     ----------
     source :
        The Python source code to inspect for imports.
 
+    mod :
+       The already parsed ast of ``source``, for instance
+       :py:attr:`CodeRunner.ast`. If it is given, ``source`` is not parsed
+       again and the result is remembered for later calls with ``source``.
+
     Returns
     -------
         A list of module names that are imported in ``source``. If ``source`` is
@@ -640,25 +880,28 @@ def find_imports(source: str) -> list[str]:
     >>> find_imports(source)
     ['numpy', 'scipy', 'scipy.stats']
     """
-    # handle mis-indented input from multi-line strings
-    source = dedent(source)
-
-    try:
-        mod = ast.parse(source)
-    except SyntaxError:
+    # Every import statement contains the import keyword, so we can skip
+    # parsing entirely for the common case of code without imports.
+    if "import" not in source:
         return []
-    imports: set[str] = set()
-    for node in ast.walk(mod):
-        if isinstance(node, ast.Import):
-            for name in node.names:
-                node_name = name.name
-                _add_prefixes(imports, node_name)
-        elif isinstance(node, ast.ImportFrom):
-            module_name = node.module
-            if module_name is None:
-                continue
-            _add_prefixes(imports, module_name)
-    return sorted(imports)
+
+    if mod is None:
+        cached = _find_imports_cache.get(source)
+        if cached is not None:
+            _find_imports_cache.move_to_end(source)
+            return list(cached)
+        try:
+            # handle mis-indented input from multi-line strings
+            mod = ast.parse(dedent(source))
+        except SyntaxError:
+            mod = ast.Module(body=[], type_ignores=[])
+
+    result = _find_imports_ast(mod)
+    _find_imports_cache[source] = result
+    _find_imports_cache.move_to_end(source)
+    while len(_find_imports_cache) > _FIND_IMPORTS_CACHE_SIZE:
+        _find_imports_cache.popitem(last=False)
+    return list(result)
 
 
 def pyimport_impl(path: str) -> Any:
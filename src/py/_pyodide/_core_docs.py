@@ -17,10 +17,24 @@ from collections.abc import (
 )
 from functools import reduce
 from types import TracebackType
-from typing import IO, Any, Generic, ParamSpec, Protocol, Self, TypeVar, overload
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    Literal,
+    ParamSpec,
+    Protocol,
+    Self,
+    TypeVar,
+    overload,
+)
 
 from .docs_argspec import docs_argspec
 
+if TYPE_CHECKING:
+    from ._lazy_convert import LazyList
+
 # All docstrings for public `core` APIs should be extracted from here. We use
 # the utilities in `docstring.py` and `docstring.c` to format them
 # appropriately.
@@ -338,6 +352,7 @@ class JsProxy(metaclass=_JsProxyMetaClass):
             ]
             | None
         ) = None,
+        lazy: bool = False,
     ) -> Any:
         """Convert the :class:`JsProxy` to a native Python object as best as
         possible.
@@ -350,6 +365,16 @@ class JsProxy(metaclass=_JsProxyMetaClass):
             Limit the depth of the conversion. If a shallow conversion is
             desired, set ``depth`` to 1.
 
+        lazy:
+            If ``True``, objects and maps are converted to a read only
+            :py:class:`~pyodide.ffi.LazyDict` and arrays to a read only
+            :py:class:`~pyodide.ffi.LazyList` which convert their contents the
+            first time they are read. This is much faster when only a few parts
+            of a large object are used. Call ``materialize()`` on the result to
+            get ordinary :py:class:`dict` and :py:class:`list` objects.
+            Changes to the JavaScript object made after the conversion may or
+            may not be visible in the result.
+
         default_converter:
 
             If present, this will be invoked whenever Pyodide does not have some
@@ -547,7 +572,15 @@ class JsPromise(JsProxy, Generic[T]):
 
 
 class JsBuffer(JsProxy):
-    """A JsProxy of an array buffer or array buffer view"""
+    """A JsProxy of an array buffer or array buffer view
+
+    If the buffer is a view into the WebAssembly memory, for instance a
+    ``subarray`` of ``HEAPU8``, it supports the Python buffer protocol and
+    :py:class:`memoryview` or ``numpy.asarray`` use the data
+    without copying it. Views into the WebAssembly memory are detached when the
+    memory grows, after that they raise a :py:exc:`BufferError`. Other buffers
+    can be copied in one step with :py:meth:`assign` and :py:meth:`assign_to`.
+    """
 
     _js_type_flags = ["IS_BUFFER"]
     # There are no types for buffers:
@@ -846,6 +879,7 @@ class JsFetchResponse(JsProxy):
     type: str
     url: str
     headers: Any
+    body: Any
 
     def clone(self) -> "JsFetchResponse":
         raise NotImplementedError
@@ -1041,6 +1075,44 @@ class JsArray(JsIterable[T], Generic[T], MutableSequence[T], metaclass=_ABCMeta)
         It raises a :py:exc:`ValueError` if there is no such item.
         """
 
+    @overload
+    def to_py(
+        self,
+        *,
+        depth: int = -1,
+        default_converter: (
+            Callable[
+                [
+                    "JsProxy",
+                    Callable[["JsProxy"], Any],
+                    Callable[["JsProxy", Any], None],
+                ],
+                Any,
+            ]
+            | None
+        ) = None,
+        lazy: Literal[False] = False,
+    ) -> list[Any]: ...
+
+    @overload
+    def to_py(
+        self,
+        *,
+        depth: int = -1,
+        default_converter: (
+            Callable[
+                [
+                    "JsProxy",
+                    Callable[["JsProxy"], Any],
+                    Callable[["JsProxy", Any], None],
+                ],
+                Any,
+            ]
+            | None
+        ) = None,
+        lazy: Literal[True],
+    ) -> "LazyList": ...
+
     def to_py(
         self,
         *,
@@ -1056,7 +1128,8 @@ class JsArray(JsIterable[T], Generic[T], MutableSequence[T], metaclass=_ABCMeta)
             ]
             | None
         ) = None,
-    ) -> list[Any]:
+        lazy: bool = False,
+    ) -> "list[Any] | LazyList":
         raise NotImplementedError
 
     def __mul__(self, other: int) -> "JsArray[T]":
@@ -0,0 +1,170 @@
+"""
+Lazy conversion of JavaScript objects for ``JsProxy.to_py(lazy=True)``.
+
+Each JavaScript container is converted one level at a time with
+``to_py(depth=1)`` the first time Python reads it, so the conversion rules are
+the same as for an eager ``to_py``.
+"""
+
+import weakref
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from typing import Any, overload
+
+from ._core_docs import JsProxy
+
+
+class _LazyConversion:
+    """The state shared by the containers made by one lazy conversion."""
+
+    def __init__(self, default_converter: Callable[..., Any] | None) -> None:
+        self.default_converter = default_converter
+        # Lazy containers by the js_id of the JavaScript object, so an object
+        # that is reachable in several ways is converted once like with an
+        # eager to_py. We keep the JsProxy so that its js_id stays unique. The
+        # containers refer back to this object, so only keep weak references to
+        # them to avoid making a reference cycle for each container.
+        self.cache: dict[int, tuple[JsProxy, "weakref.ref[Any]"]] = {}
+
+    def convert(self, value: Any, depth: int) -> Any:
+        if depth == 0 or not isinstance(value, JsProxy):
+            return value
+        key = value.js_id
+        if key in self.cache:
+            proxy, ref = self.cache[key]
+            cached = ref()
+            if cached is not None and proxy == value:
+                return cached
+        shallow = value.to_py(depth=1, default_converter=self.default_converter)
+        result: LazyDict | LazyList
+        if isinstance(shallow, dict):
+            result = LazyDict(self, shallow, depth - 1)
+        elif isinstance(shallow, list):
+            result = LazyList(self, shallow, depth - 1)
+        else:
+            return shallow
+        self.cache[key] = (value, weakref.ref(result))
+        return result
+
+
+def _materialize(value: Any, memo: dict[int, Any]) -> Any:
+    if not isinstance(value, LazyDict | LazyList):
+        return value
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, LazyDict):
+        result_dict: dict[Any, Any] = {}
+        memo[id(value)] = result_dict
+        for key in value:
+            result_dict[key] = _materialize(value[key], memo)
+        return result_dict
+    result_list: list[Any] = []
+    memo[id(value)] = result_list
+    for item in value:
+        result_list.append(_materialize(item, memo))
+    return result_list
+
+
+class LazyDict(Mapping[Any, Any]):
+    """A read only :py:class:`dict` made by :py:meth:`JsProxy.to_py(lazy=True)
+    <pyodide.ffi.JsProxy.to_py>` that converts its values when they are first
+    read.
+
+    The keys are converted up front. Values that are JavaScript containers are
+    converted the first time they are read and the result is kept.
+    """
+
+    def __init__(
+        self, conversion: _LazyConversion, items: dict[Any, Any], depth: int
+    ) -> None:
+        self._conversion = conversion
+        self._items = items
+        self._depth = depth
+        self._pending = {k for k, v in items.items() if isinstance(v, JsProxy)}
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._items[key]
+        if key in self._pending:
+            value = self._conversion.convert(value, self._depth)
+            self._items[key] = value
+            self._pending.discard(key)
+        return value
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"LazyDict({self._items!r})"
+
+    def materialize(self) -> dict[Any, Any]:
+        """Convert everything that is left and return an ordinary
+        :py:class:`dict`, the same as an eager :py:meth:`~pyodide.ffi.JsProxy.to_py`
+        would have made."""
+        return _materialize(self, {})
+
+
+class LazyList(Sequence[Any]):
+    """A read only :py:class:`list` made by :py:meth:`JsProxy.to_py(lazy=True)
+    <pyodide.ffi.JsProxy.to_py>` that converts its items when they are first
+    read.
+
+    Items that are JavaScript containers are converted the first time they are
+    read and the result is kept.
+    """
+
+    def __init__(
+        self, conversion: _LazyConversion, items: list[Any], depth: int
+    ) -> None:
+        self._conversion = conversion
+        self._items = items
+        self._depth = depth
+        self._pending = {i for i, v in enumerate(items) if isinstance(v, JsProxy)}
+
+    def _get(self, index: int) -> Any:
+        value = self._items[index]
+        if index in self._pending:
+            value = self._conversion.convert(value, self._depth)
+            self._items[index] = value
+            self._pending.discard(index)
+        return value
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Any]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self._get(i) for i in range(*index.indices(len(self._items)))]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError("list index out of range")
+        return self._get(index)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"LazyList({self._items!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, list | LazyList):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def materialize(self) -> list[Any]:
+        """Convert everything that is left and return an ordinary
+        :py:class:`list`, the same as an eager :py:meth:`~pyodide.ffi.JsProxy.to_py`
+        would have made."""
+        return _materialize(self, {})
+
+
+def lazy_to_py(
+    proxy: JsProxy, depth: int, default_converter: Callable[..., Any] | None
+) -> Any:
+    """Called by ``JsProxy.to_py(lazy=True)``."""
+    return _LazyConversion(default_converter).convert(proxy, depth)
@@ -4,7 +4,9 @@ from inspect import Parameter, Signature, signature
 from typing import Any, ParamSpec, TypeVar
 
 from _pyodide._base import (
+    CodeCache,
     CodeRunner,
+    code_cache,
     eval_code,
     eval_code_async,
     find_imports,
@@ -106,7 +108,9 @@ def relaxed_call(func: Callable[..., RetType], *args: Any, **kwargs: Any) -> Ret
 
 
 __all__ = [
+    "CodeCache",
     "CodeRunner",
+    "code_cache",
     "eval_code",
     "eval_code_async",
     "find_imports",
@@ -21,11 +21,12 @@ from contextlib import (
 )
 from io import TextIOBase
 from platform import python_build, python_version
+from time import monotonic
 from tokenize import TokenError
 from types import TracebackType
 from typing import Any, Literal
 
-from _pyodide._base import CodeRunner, ReturnMode, should_quiet
+from _pyodide._base import CodeRunner, ReturnMode, find_imports, should_quiet
 
 __all__ = ["Console", "PyodideConsole", "BANNER", "repr_shorten", "ConsoleFuture"]
 
@@ -63,28 +64,102 @@ class _Stream(TextIOBase):
 
 
 class _WriteStream(_Stream):
+    """A text stream that passes whatever is written to ``write_handler``.
+
+    By default every write is handed to ``write_handler`` right away. If
+    ``buffer_size`` is positive, ``line_buffering`` is true or
+    ``flush_interval`` is set, writes are collected and delivered to
+    ``write_handler`` in a single call when the stream is flushed:
+
+    - once at least ``buffer_size`` characters are buffered,
+    - when a write contains a newline if ``line_buffering`` is true,
+    - when ``flush_interval`` seconds have passed since the last flush, or
+    - when :py:meth:`flush` or :py:meth:`close` is called.
+    """
+
     def __init__(
         self,
         write_handler: Callable[[str], int | None],
         name: str,
         encoding: str = "utf-8",
         errors: str = "strict",
+        *,
+        buffer_size: int = 0,
+        line_buffering: bool = False,
+        flush_interval: float | None = None,
     ):
         super().__init__(name, encoding, errors)
         self._write_handler = write_handler
+        self._buffer_size = buffer_size
+        self._line_buffering = line_buffering
+        self._flush_interval = flush_interval
+        self._buffered = buffer_size > 0 or line_buffering or flush_interval is not None
+        self._buffer: list[str] = []
+        self._buffer_len = 0
+        self._last_flush = monotonic()
+        self._flush_handle: asyncio.TimerHandle | None = None
 
     def writable(self) -> bool:
         return True
 
+    def _normalize(self, s: str) -> str:
+        if s.isascii():
+            # Encoding ASCII text can't fail or change it
+            return s
+        return str.encode(s, self.encoding, self.errors).decode(
+            self.encoding, self.errors
+        )
+
     def write(self, s: str) -> int:
         if self.closed:
             raise ValueError("write to closed file")
-        s = str.encode(s, self.encoding, self.errors).decode(self.encoding, self.errors)
-        written = self._write_handler(s)
-        if written is None:
-            # They didn't tell us how much they wrote, assume it was the whole string
-            return len(s)
-        return written
+        s = self._normalize(s)
+        if not self._buffered:
+            written = self._write_handler(s)
+            if written is None:
+                # They didn't tell us how much they wrote, assume it was the whole string
+                return len(s)
+            return written
+
+        if not s:
+            return 0
+        self._buffer.append(s)
+        self._buffer_len += len(s)
+        if (
+            (self._buffer_size > 0 and self._buffer_len >= self._buffer_size)
+            or (self._line_buffering and "\n" in s)
+            or (
+                self._flush_interval is not None
+                and monotonic() - self._last_flush >= self._flush_interval
+            )
+        ):
+            self.flush()
+        elif self._flush_interval is not None and self._flush_handle is None:
+            self._schedule_flush()
+        return len(s)
+
+    def _schedule_flush(self) -> None:
+        """Make sure the buffer is flushed within ``flush_interval`` even if
+        nothing else is written.
+        """
+        assert self._flush_interval is not None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self._flush_interval, self.flush)
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._last_flush = monotonic()
+        if not self._buffer:
+            return
+        data = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffer_len = 0
+        self._write_handler(data)
 
 
 class _ReadStream(_Stream):
@@ -318,6 +393,24 @@ class Console:
         Should redirection of standard streams be kept between calls to
         :py:meth:`~Console.runcode`? Defaults to :py:data:`False`.
 
+    output_buffer_size :
+
+        If positive, writes to :py:data:`sys.stdout` and :py:data:`sys.stderr`
+        are buffered and ``stdout_callback`` and ``stderr_callback`` are called
+        once at least this many characters have accumulated. Buffered output
+        is always delivered at the end of :py:meth:`~Console.runcode`. Defaults
+        to ``0`` which calls the callbacks on every write.
+
+    output_line_buffering :
+
+        If :py:data:`True`, buffer output and deliver it whenever a write
+        contains a newline. Defaults to :py:data:`False`.
+
+    output_flush_interval :
+
+        If set, buffer output and deliver it at least every
+        ``output_flush_interval`` seconds. Defaults to :py:data:`None`.
+
     filename :
 
         The file name to report in error messages. Defaults to ``"<console>"``.
@@ -340,10 +433,12 @@ class Console:
     """The function to call at each read from :py:data:`sys.stdin`"""
 
     stdout_callback: Callable[[str], int | None] | None
-    """Function to call at each write to :py:data:`sys.stdout`."""
+    """Function to call at each write to :py:data:`sys.stdout`, or with each
+    chunk of buffered output if output buffering is enabled."""
 
     stderr_callback: Callable[[str], int | None] | None
-    """Function to call at each write to :py:data:`sys.stderr`."""
+    """Function to call at each write to :py:data:`sys.stderr`, or with each
+    chunk of buffered output if output buffering is enabled."""
 
     buffer: list[str]
     """The list of lines of code that have been the argument to
@@ -366,6 +461,9 @@ class Console:
         filename: str = "<console>",
         dont_inherit: bool = False,
         optimize: int = -1,
+        output_buffer_size: int = 0,
+        output_line_buffering: bool = False,
+        output_flush_interval: float | None = None,
     ) -> None:
         if globals is None:
             globals = {"__name__": "__console__", "__doc__": None}
@@ -376,6 +474,11 @@ class Console:
         self.stdout_callback = stdout_callback
         self.stderr_callback = stderr_callback
         self.filename = filename
+        self._output_buffering: dict[str, Any] = {
+            "buffer_size": output_buffer_size,
+            "line_buffering": output_line_buffering,
+            "flush_interval": output_flush_interval,
+        }
         self.buffer = []
         self._lock = asyncio.Lock()
         self._streams_redirected = False
@@ -428,19 +531,29 @@ class Console:
             stdin_name = getattr(sys.stdin, "name", "<stdin>")
             stdin_stream = _ReadStream(self.stdin_callback, name=stdin_name)
             redirects.append(redirect_stdin(stdin_stream))
+        write_streams: list[_WriteStream] = []
         if self.stdout_callback:
             stdout_name = getattr(sys.stdout, "name", "<stdout>")
-            stdout_stream = _WriteStream(self.stdout_callback, name=stdout_name)
+            stdout_stream = _WriteStream(
+                self.stdout_callback, name=stdout_name, **self._output_buffering
+            )
+            write_streams.append(stdout_stream)
             redirects.append(redirect_stdout(stdout_stream))
         if self.stderr_callback:
             stderr_name = getattr(sys.stderr, "name", "<stderr>")
-            stderr_stream = _WriteStream(self.stderr_callback, name=stderr_name)
+            stderr_stream = _WriteStream(
+                self.stderr_callback, name=stderr_name, **self._output_buffering
+            )
+            write_streams.append(stderr_stream)
             redirects.append(redirect_stderr(stderr_stream))
         try:
             self._streams_redirected = True
             with ExitStack() as stack:
                 for redirect in redirects:
                     stack.enter_context(redirect)
+                # Deliver any buffered output before restoring the streams
+                for stream in write_streams:
+                    stack.callback(stream.flush)
                 yield
         finally:
             self._streams_redirected = False
@@ -618,6 +731,9 @@ class PyodideConsole(Console):
         """
         from pyodide_js import loadPackagesFromImports
 
+        # Reuse the ast we already parsed, so that loadPackagesFromImports
+        # finds the imports of source in the find_imports cache.
+        find_imports(source, code.ast)
         await loadPackagesFromImports(source)
         return await super().runcode(source, code)
 
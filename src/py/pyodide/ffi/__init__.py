@@ -4,6 +4,7 @@ import sys
 import _pyodide._core_docs
 from _pyodide._core_docs import *
 from _pyodide._importhook import register_js_module, unregister_js_module
+from _pyodide._lazy_convert import LazyDict, LazyList
 
 IN_PYODIDE = "_pyodide_core" in sys.modules
 
@@ -31,6 +32,8 @@ if IN_PYODIDE:
 
     _pyodide._core_docs._js_flags = _pyodide_core.js_flags
 
+from ._json import to_js_via_json, to_py_via_json
+
 __all__ = [
     "ConversionError",
     "JsArray",
@@ -54,11 +57,15 @@ __all__ = [
     "JsCallable",
     "JsTypedArray",
     "JsWeakRef",
+    "LazyDict",
+    "LazyList",
     "ToJsConverter",
     "create_once_callable",
     "create_proxy",
     "destroy_proxies",
     "to_js",
+    "to_js_via_json",
+    "to_py_via_json",
     "run_sync",
     "IN_PYODIDE",
     "register_js_module",
@@ -0,0 +1,172 @@
+"""
+Move JSON-shaped values between Python and JavaScript as JSON text.
+
+Serializing a large value with :py:func:`json.dumps` and parsing it with
+``JSON.parse`` (or the other way around) is much faster than converting it one
+item at a time, because both parsers are native code and the value crosses
+between the languages once, as one string.
+"""
+
+import json
+from itertools import islice
+from typing import Any, Literal
+
+from . import JsProxy
+
+# Values with fewer items than this are converted item by item, which is as
+# fast as serializing them and is exact.
+JSON_THRESHOLD = 64
+
+# Larger integers become a BigInt with to_js but a rounded number with JSON.
+_MAX_SAFE_INTEGER = 2**53 - 1
+
+
+def _is_large(value: Any) -> bool:
+    count = 0
+    todo = [value]
+    while todo and count < JSON_THRESHOLD:
+        item = todo.pop()
+        if isinstance(item, dict):
+            item = item.values()
+        elif not isinstance(item, list | tuple):
+            continue
+        count += len(item)
+        todo.extend(islice(item, JSON_THRESHOLD))
+    return count >= JSON_THRESHOLD
+
+
+def _json_matches_to_js(value: Any) -> bool:
+    """Whether ``JSON.parse(json.dumps(value))`` is the same as ``to_js(value,
+    dict_converter=Object.fromEntries)``. Only call this on values that
+    :py:func:`json.dumps` accepted, so there are no cycles.
+    """
+    todo = [value]
+    while todo:
+        item = todo.pop()
+        if item is None:
+            # to_js gives undefined, JSON gives null
+            return False
+        if isinstance(item, int) and abs(item) > _MAX_SAFE_INTEGER:
+            return False
+        if isinstance(item, dict):
+            # Check the keys too, a None key becomes "undefined" with to_js
+            todo.extend(item)
+            todo.extend(item.values())
+        elif isinstance(item, list | tuple):
+            todo.extend(item)
+    return True
+
+
+def to_js_via_json(
+    value: Any, *, method: Literal["auto", "json", "convert"] = "auto"
+) -> Any:
+    """Convert a JSON-shaped Python value to JavaScript.
+
+    Dictionaries become JavaScript objects rather than :js:class:`Map`, like
+    with ``to_js(value, dict_converter=Object.fromEntries)``.
+
+    Parameters
+    ----------
+    value :
+        The value to convert.
+
+    method :
+        ``"json"`` serializes ``value`` with :py:func:`json.dumps` and parses
+        it with ``JSON.parse``. Raises :py:exc:`TypeError` or
+        :py:exc:`ValueError` if ``value`` is not JSON serializable. The result
+        differs from ``"convert"`` in two ways: ``None`` becomes ``null``
+        rather than ``undefined``, and integers too large for a JavaScript
+        number lose precision rather than becoming a ``BigInt``.
+
+        ``"convert"`` uses ``to_js(value, dict_converter=Object.fromEntries)``.
+
+        ``"auto"`` uses ``"json"`` if ``value`` has many items, is JSON
+        serializable and has no ``None`` or large integers, so the result is
+        the same as with ``"convert"``, and ``"convert"`` otherwise.
+
+    Examples
+    --------
+    >>> import pytest; pytest.skip("Needs a browser")
+    >>> from pyodide.ffi import to_js_via_json
+    >>> rows = [{"id": i, "name": f"row {i}"} for i in range(10_000)]
+    >>> js_rows = to_js_via_json(rows)
+    >>> js_rows[3].name
+    'row 3'
+    """
+    from js import JSON, Object
+
+    from . import to_js
+
+    if method == "auto":
+        method = "json" if _is_large(value) else "convert"
+        if method == "json":
+            try:
+                text = json.dumps(value, allow_nan=False, separators=(",", ":"))
+            except (TypeError, ValueError):
+                method = "convert"
+            else:
+                if not _json_matches_to_js(value):
+                    method = "convert"
+    elif method == "json":
+        text = json.dumps(value, allow_nan=False, separators=(",", ":"))
+    elif method != "convert":
+        raise ValueError(f"Unknown method {method!r}")
+    if method == "json":
+        return JSON.parse(text)
+    return to_js(value, dict_converter=Object.fromEntries)
+
+
+def to_py_via_json(
+    value: JsProxy, *, method: Literal["auto", "json", "convert"] = "auto"
+) -> Any:
+    """Convert a JSON-shaped JavaScript value to Python.
+
+    Parameters
+    ----------
+    value :
+        The value to convert.
+
+    method :
+        ``"json"`` serializes ``value`` with ``JSON.stringify`` and parses it
+        with :py:func:`json.loads`. Anything that ``JSON.stringify`` handles
+        is accepted, with its usual rules: :js:class:`Map` becomes ``{}``,
+        ``undefined`` object entries are left out, ``NaN`` becomes ``None``
+        and so on.
+
+        ``"convert"`` uses :py:meth:`~pyodide.ffi.JsProxy.to_py`.
+
+        ``"auto"`` uses ``"json"`` if ``value`` is made of only booleans,
+        strings, finite numbers, arrays and plain objects, so the result is the
+        same as with ``"convert"``, and ``"convert"`` otherwise. ``"json"``
+        turns ``null`` into ``None`` where ``"convert"`` gives
+        :py:data:`~pyodide.ffi.jsnull`, and integers too large to be exact
+        into :py:class:`int` where ``"convert"`` gives :py:class:`float`, so
+        ``"auto"`` only accepts ``null`` if it is converted to ``None`` anyway.
+
+    Examples
+    --------
+    >>> import pytest; pytest.skip("Needs a browser")
+    >>> from pyodide.code import run_js
+    >>> from pyodide.ffi import to_py_via_json
+    >>> rows = run_js("Array.from({length: 10000}, (_, id) => ({id}))")
+    >>> to_py_via_json(rows)[3]
+    {'id': 3}
+    """
+    from js import JSON
+    from pyodide_js._api import strictJSONStringify
+
+    if method == "auto":
+        text = strictJSONStringify(value)
+        if text is None:
+            return value.to_py()
+        return json.loads(text)
+    if method == "json":
+        text = JSON.stringify(value)
+        if text is None:
+            raise TypeError(
+                f"Cannot serialize JavaScript value of type {value.typeof} to JSON"
+            )
+        return json.loads(text)
+    if method == "convert":
+        return value.to_py()
+    raise ValueError(f"Unknown method {method!r}")
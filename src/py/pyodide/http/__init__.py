@@ -1,13 +1,17 @@
-from io import StringIO
+from io import BytesIO, StringIO
+from typing import Literal, overload
 
 # Keep open_url in __init__ for now, will be moved to pyxhr.py later
 from ..ffi import IN_PYODIDE
+from ._cache import ResponseCache
 from ._exceptions import (
     AbortError,
     BodyUsedError,
     HttpStatusError,
 )
 from ._pyfetch import FetchResponse, pyfetch
+from ._session import Session
+from .pyxhr import _xhr_request
 
 if IN_PYODIDE:
     try:
@@ -19,17 +23,24 @@ __all__ = [
     "open_url",
     "pyfetch",
     "FetchResponse",
+    "Session",
+    "ResponseCache",
     "HttpStatusError",
     "BodyUsedError",
     "AbortError",
 ]
 
 
-def open_url(url: str) -> StringIO:
-    """Fetches a given URL synchronously.
+@overload
+def open_url(url: str, *, binary: Literal[False] = False) -> StringIO: ...
+
+
+@overload
+def open_url(url: str, *, binary: Literal[True]) -> BytesIO: ...
 
-    The download of binary files is not supported. To download binary files use
-    :func:`pyodide.http.pyfetch` which is asynchronous.
+
+def open_url(url: str, *, binary: bool = False) -> StringIO | BytesIO:
+    """Fetches a given URL synchronously.
 
     It will not work in Node unless you include a polyfill for :js:class:`XMLHttpRequest`
 
@@ -38,6 +49,12 @@ def open_url(url: str) -> StringIO:
     url :
        URL to fetch
 
+    binary :
+       If ``True``, download the contents as binary data and return them as a
+       :py:class:`~io.BytesIO`. To write a download straight into a file, use
+       :py:meth:`pyxhr.get(url, response_type="arraybuffer").to_file(path)
+       <pyodide.http.pyxhr.XHRResponse.to_file>`.
+
     Returns
     -------
         The contents of the URL.
@@ -54,6 +71,9 @@ def open_url(url: str) -> StringIO:
     [('arch', 'wasm32'), ('platform', 'emscripten_3_1_45'), ('python', '3.11.3'), ('version', '0.24.1')]
     """
 
+    if binary:
+        # BytesIO shares the bytes until it is written to
+        return BytesIO(_xhr_request("GET", url, response_type="arraybuffer").content)
     req = XMLHttpRequest.new()
     req.open("GET", url, False)
     req.send()
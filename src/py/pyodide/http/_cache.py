@@ -0,0 +1,332 @@
+"""
+An opt-in HTTP response cache for pyfetch and pyxhr.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any
+
+# Only these methods are safe to answer from the cache
+CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+
+
+def _parse_cache_control(value: str) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+class CachedResponse:
+    """A response stored in a :py:class:`ResponseCache`.
+
+    Parameters
+    ----------
+    url :
+        The URL of the response.
+
+    status :
+        The HTTP status code.
+
+    status_text :
+        The HTTP status text.
+
+    headers :
+        The response headers with lower case names.
+
+    body :
+        The response body.
+
+    stored_at :
+        When the response was stored or last revalidated, as returned by
+        :py:func:`time.time`.
+
+    vary :
+        The request headers named in the ``Vary`` header of the response, with
+        the values they had in the request.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status: int,
+        status_text: str,
+        headers: dict[str, str],
+        body: bytes,
+        stored_at: float,
+        vary: dict[str, str | None],
+    ) -> None:
+        self.url = url
+        self.status = status
+        self.status_text = status_text
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.vary = vary
+
+    def _max_age(self, default: float) -> float:
+        cache_control = _parse_cache_control(self.headers.get("cache-control", ""))
+        if "no-cache" in cache_control:
+            return 0
+        max_age = cache_control.get("max-age")
+        if max_age is None:
+            return default
+        try:
+            age = float(self.headers.get("age", 0))
+        except ValueError:
+            age = 0
+        try:
+            return float(max_age) - age
+        except ValueError:
+            return 0
+
+    def is_fresh(self, default_max_age: float = 0) -> bool:
+        """Can the response be used without asking the server?"""
+        return time.time() - self.stored_at < self._max_age(default_max_age)
+
+    def validators(self) -> dict[str, str]:
+        """The headers to ask the server whether the response is still valid."""
+        headers = {}
+        if etag := self.headers.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+        elif not headers:
+            headers["If-Modified-Since"] = formatdate(self.stored_at, usegmt=True)
+        return headers
+
+    def _to_json(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "status": self.status,
+            "status_text": self.status_text,
+            "headers": self.headers,
+            "stored_at": self.stored_at,
+            "vary": self.vary,
+        }
+
+
+class ResponseCache:
+    """A cache for the responses of :py:func:`~pyodide.http.pyfetch` and
+    :py:mod:`~pyodide.http.pyxhr` requests.
+
+    Pass the cache to a request with the ``cache`` keyword argument to use it.
+    Only ``GET`` and ``HEAD`` requests are cached. A stored response is used
+    as is while it is fresh according to its ``Cache-Control: max-age``. After
+    that, the cache asks the server whether it changed with the ``ETag`` and
+    ``Last-Modified`` headers of the response and only downloads it again if it
+    did.
+
+    Only responses with a ``Content-Length`` of at most ``max_size`` are
+    stored by :py:func:`~pyodide.http.pyfetch`.
+
+    Responses are keyed by method and URL. If the response has a ``Vary``
+    header, the request headers it names must match too. Only the latest
+    variant of a response is kept.
+
+    Parameters
+    ----------
+    max_size :
+        The largest total size of the stored response bodies in bytes. When
+        the cache is full, the least recently used responses are dropped.
+
+    path :
+        A directory to store the responses in. If not provided, responses are
+        kept in memory. Use a directory on an IDBFS mount to keep responses
+        between page loads.
+
+    default_max_age :
+        How many seconds a response without a ``max-age`` stays fresh. By
+        default, such responses are revalidated every time they are used.
+
+    Examples
+    --------
+    >>> import pytest; pytest.skip("Can't use top level await in doctests")
+    >>> cache = ResponseCache(path="/home/pyodide/.cache/http")
+    >>> resp = await pyfetch("https://example.com/data.csv", cache=cache)
+    >>> resp = await pyfetch("https://example.com/data.csv", cache=cache)
+    >>> cache.hits
+    1
+    """
+
+    hits: int
+    """How many requests were answered from the cache, including after a
+    successful revalidation."""
+
+    misses: int
+    """How many cacheable requests had to be downloaded."""
+
+    revalidations: int
+    """How many requests the server confirmed the stored response for."""
+
+    def __init__(
+        self,
+        max_size: int = 64 * 1024 * 1024,
+        *,
+        path: str | os.PathLike[str] | None = None,
+        default_max_age: float = 0,
+    ) -> None:
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self.default_max_age = default_max_age
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        # Body sizes by key, least recently used first
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._entries: dict[str, CachedResponse] = {}
+        if self.path is not None:
+            self._load_index()
+
+    @property
+    def size(self) -> int:
+        """The total size of the stored response bodies in bytes."""
+        return sum(self._sizes.values())
+
+    @staticmethod
+    def _key(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode()).hexdigest()
+
+    def _load_index(self) -> None:
+        assert self.path is not None
+        self.path.mkdir(parents=True, exist_ok=True)
+        found = []
+        for meta in self.path.glob("*.json"):
+            body = meta.with_suffix(".body")
+            if not body.exists():
+                meta.unlink()
+                continue
+            found.append((meta.stat().st_mtime, meta.stem, body.stat().st_size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+
+    def _read(self, key: str) -> CachedResponse | None:
+        if self.path is None:
+            return self._entries.get(key)
+        try:
+            meta = json.loads((self.path / f"{key}.json").read_text())
+            body = (self.path / f"{key}.body").read_bytes()
+        except (OSError, ValueError):
+            self._delete(key)
+            return None
+        return CachedResponse(body=body, **meta)
+
+    def _write(self, key: str, entry: CachedResponse) -> None:
+        if self.path is None:
+            self._entries[key] = entry
+            return
+        (self.path / f"{key}.body").write_bytes(entry.body)
+        (self.path / f"{key}.json").write_text(json.dumps(entry._to_json()))
+
+    def _delete(self, key: str) -> None:
+        self._sizes.pop(key, None)
+        if self.path is None:
+            self._entries.pop(key, None)
+            return
+        for suffix in (".json", ".body"):
+            (self.path / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def lookup(
+        self, method: str, url: str, headers: Mapping[str, str] | None = None
+    ) -> CachedResponse | None:
+        """Find the stored response for a request, fresh or not.
+
+        Parameters
+        ----------
+        method :
+            The request method.
+
+        url :
+            The request URL.
+
+        headers :
+            The request headers.
+        """
+        key = self._key(method, url)
+        if key not in self._sizes:
+            return None
+        entry = self._read(key)
+        if entry is None:
+            return None
+        request_headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if any(request_headers.get(k) != v for k, v in entry.vary.items()):
+            return None
+        self._sizes.move_to_end(key)
+        if self.path is not None:
+            os.utime(self.path / f"{key}.json")
+        return entry
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        request_headers: Mapping[str, str] | None,
+        entry: CachedResponse,
+    ) -> bool:
+        """Store a response if it may be cached. Returns whether it was stored.
+
+        Parameters
+        ----------
+        method :
+            The request method.
+
+        url :
+            The request URL.
+
+        request_headers :
+            The request headers, used to fill in ``entry.vary``.
+
+        entry :
+            The response to store.
+        """
+        method = method.upper()
+        if method not in CACHEABLE_METHODS or entry.status != 200:
+            return False
+        if "no-store" in _parse_cache_control(entry.headers.get("cache-control", "")):
+            return False
+        vary = [v.strip().lower() for v in entry.headers.get("vary", "").split(",")]
+        vary = [v for v in vary if v]
+        if "*" in vary:
+            return False
+        if len(entry.body) > self.max_size:
+            return False
+        request_headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+        entry.vary = {name: request_headers.get(name) for name in vary}
+        key = self._key(method, url)
+        self._delete(key)
+        self._write(key, entry)
+        self._sizes[key] = len(entry.body)
+        self._evict()
+        return True
+
+    def refresh(
+        self, method: str, url: str, entry: CachedResponse, headers: Mapping[str, str]
+    ) -> None:
+        """Update a stored response after the server confirmed it with a ``304
+        Not Modified`` response with the given headers."""
+        entry.headers.update({k.lower(): v for k, v in headers.items()})
+        entry.stored_at = time.time()
+        key = self._key(method, url)
+        if key in self._sizes:
+            self._write(key, entry)
+
+    def _evict(self) -> None:
+        size = self.size
+        while size > self.max_size and self._sizes:
+            key, entry_size = next(iter(self._sizes.items()))
+            self._delete(key)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """Remove all stored responses."""
+        for key in list(self._sizes):
+            self._delete(key)
+        self._entries.clear()
@@ -2,14 +2,28 @@
 Async fetch API implementation for Pyodide.
 """
 
+import codecs
 import json
+import shutil
+import tarfile
+import time
 from asyncio import CancelledError
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
 from functools import wraps
+from io import RawIOBase
 from typing import IO, TYPE_CHECKING, Any, ParamSpec, TypeVar
 
-from .._package_loader import unpack_buffer
-from ..ffi import IN_PYODIDE, JsBuffer, JsException, JsFetchResponse, to_js
+from .._package_loader import get_format, unpack_buffer
+from ..ffi import (
+    IN_PYODIDE,
+    JsBuffer,
+    JsException,
+    JsFetchResponse,
+    can_run_sync,
+    run_sync,
+    to_js,
+)
+from ._cache import CACHEABLE_METHODS, CachedResponse, ResponseCache
 from ._exceptions import (
     AbortError,
     BodyUsedError,
@@ -18,7 +32,7 @@ from ._exceptions import (
 
 if IN_PYODIDE or TYPE_CHECKING:
     try:
-        from js import AbortController, AbortSignal, Object, Request
+        from js import AbortController, AbortSignal, Object, Request, Response
         from js import fetch as _jsfetch
         from pyodide_js._api import abortSignalAny
     except ImportError:
@@ -69,6 +83,55 @@ def _abort_on_cancel(method: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable
     return wrapper
 
 
+_TAR_STREAM_MODES = {
+    "tar": "r|",
+    "gztar": "r|gz",
+    "bztar": "r|bz2",
+    "xztar": "r|xz",
+}
+
+
+def _guess_format(filename: str) -> str:
+    for fmt, extensions, _ in shutil.get_unpack_formats():
+        if any(filename.endswith(ext) for ext in extensions):
+            return fmt
+    raise ValueError(f"Unknown archive format '{filename}'")
+
+
+class _StreamReader(RawIOBase):
+    """A synchronous file-like view of a :js:class:`ReadableStreamDefaultReader`.
+
+    Each read that runs out of buffered data blocks with :py:func:`run_sync`
+    until the next chunk of the stream arrives.
+    """
+
+    def __init__(self, reader: Any | None):
+        self._reader = reader
+        self._buffer = bytearray()
+        # A missing reader means the response has no body
+        self.done = reader is None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        while not self._buffer and not self.done:
+            try:
+                result = run_sync(self._reader.read())
+            except JsException:
+                # The stream errored, there is nothing left to cancel
+                self.done = True
+                raise
+            if result.done:
+                self.done = True
+            else:
+                self._buffer += result.value.to_memoryview()
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+
 class FetchResponse:
     """A wrapper for a Javascript fetch :js:data:`Response`.
 
@@ -167,7 +230,8 @@ class FetchResponse:
         The value may be different than the url passed to fetch.
         See :js:attr:`Response.url`.
         """
-        return self.js_response.url
+        # Responses that weren't fetched, e.g. from a ResponseCache, have no url
+        return self.js_response.url or self._url
 
     def _raise_if_failed(self) -> None:
         if (signal := self.abort_signal) and signal.aborted:
@@ -278,9 +342,129 @@ class FetchResponse:
         self._raise_if_failed()
         return (await self.buffer()).to_bytes()
 
+    async def _iter_chunks(self) -> AsyncIterator[memoryview]:
+        self._raise_if_failed()
+        body = self.js_response.body
+        if not body:
+            return
+        reader = body.getReader()
+        done = False
+        try:
+            while True:
+                result = await reader.read()
+                if result.done:
+                    done = True
+                    return
+                yield result.value.to_memoryview()
+        except JsException as e:
+            # The stream errored, there is nothing left to cancel
+            done = True
+            raise AbortError(s.reason if (s := self.abort_signal) else e) from None
+        except CancelledError as e:
+            if self.abort_controller:
+                self.abort_controller.abort(
+                    _construct_abort_reason(
+                        "\n".join(map(str, e.args)) if e.args else None
+                    )
+                )
+            raise
+        finally:
+            if not done:
+                # Stop the download if the consumer stopped early
+                reader.cancel()
+            reader.releaseLock()
+
+    async def iter_bytes(self, chunk_size: int | None = None) -> AsyncIterator[memoryview]:
+        """Iterate over the response body as it is downloaded.
+
+        Unlike :py:meth:`~FetchResponse.bytes`, this never holds more than a
+        chunk of the body in memory. See :js:attr:`Response.body`.
+
+        Parameters
+        ----------
+        chunk_size :
+            The size of the chunks to yield. The last chunk may be shorter. If
+            not provided, chunks are yielded in whatever size they arrive from
+            the network.
+
+        Examples
+        --------
+        >>> import pytest; pytest.skip("Can't use top level await in doctests")
+        >>> resp = await pyfetch("https://example.com/large_file.bin")
+        >>> with open("large_file.bin", "wb") as f:
+        ...     async for chunk in resp.iter_bytes(1 << 20):
+        ...         f.write(chunk)
+        """
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if chunk_size is None:
+            async for chunk in self._iter_chunks():
+                yield chunk
+            return
+        buffer = bytearray()
+        async for chunk in self._iter_chunks():
+            buffer += chunk
+            while len(buffer) >= chunk_size:
+                yield memoryview(buffer[:chunk_size])
+                del buffer[:chunk_size]
+        if buffer:
+            yield memoryview(buffer)
+
+    async def iter_lines(self, encoding: str = "utf-8") -> AsyncIterator[str]:
+        """Iterate over the lines of the response body as it is downloaded.
+
+        The lines are yielded without their line endings.
+
+        Parameters
+        ----------
+        encoding :
+            The encoding used to decode the body. Defaults to ``"utf-8"``.
+        """
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ""
+        async for chunk in self._iter_chunks():
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.removesuffix("\r")
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending.removesuffix("\r")
+
+    async def _unpack_tar_stream(
+        self, filename: str, format: str | None, extract_dir: str | None
+    ) -> None:
+        format = get_format(format) if format else _guess_format(filename)
+        mode = _TAR_STREAM_MODES.get(format)
+        if mode is None:
+            raise ValueError(
+                f"Streaming unpack_archive only supports tar archives, not '{format}'"
+            )
+        if not can_run_sync():
+            raise RuntimeError(
+                "Streaming unpack_archive requires JavaScript Promise integration"
+            )
+        self._raise_if_failed()
+        body = self.js_response.body
+        reader = body.getReader() if body else None
+        stream = _StreamReader(reader)
+        try:
+            with tarfile.open(fileobj=stream, mode=mode) as tar:
+                tar.extractall(extract_dir or ".", filter="data")
+        finally:
+            if reader:
+                if not stream.done:
+                    # Stop the download if extraction failed or stopped early
+                    reader.cancel()
+                reader.releaseLock()
+
     @_abort_on_cancel
     async def unpack_archive(
-        self, *, extract_dir: str | None = None, format: str | None = None
+        self,
+        *,
+        extract_dir: str | None = None,
+        format: str | None = None,
+        stream: bool = False,
     ) -> None:
         """Treat the data as an archive and unpack it into target directory.
 
@@ -301,9 +485,19 @@ class FetchResponse:
             :py:meth:`unpack_archive` will use the archive file name extension and
             see if an unpacker was registered for that extension. In case none
             is found, a :py:exc:`ValueError` is raised.
+
+        stream :
+            If ``True``, extract the archive while it is downloading instead of
+            downloading all of it first, so the archive never has to fit in
+            memory. Only tar archives (``"tar"``, ``"gztar"``, ``"bztar"`` and
+            ``"xztar"``) are supported and :py:func:`~pyodide.ffi.can_run_sync`
+            must be ``True``.
         """
-        buf = await self.buffer()
         filename = self._url.rsplit("/", -1)[-1]
+        if stream:
+            await self._unpack_tar_stream(filename, format, extract_dir)
+            return
+        buf = await self.buffer()
         unpack_buffer(buf, filename=filename, format=format, extract_dir=extract_dir)
 
     def abort(self, reason: Any = None) -> None:
@@ -317,12 +511,73 @@ class FetchResponse:
         self.abort_controller.abort(_construct_abort_reason(reason))
 
 
+def _response_from_cache(url: str, entry: CachedResponse) -> FetchResponse:
+    init = to_js(
+        {
+            "status": entry.status,
+            "statusText": entry.status_text,
+            "headers": entry.headers,
+        },
+        dict_converter=Object.fromEntries,
+    )
+    body = to_js(entry.body) if entry.body else None
+    return FetchResponse(url, Response.new(body, init))
+
+
+def _fits_in_cache(headers: dict[str, str], max_size: int) -> bool:
+    """Whether the Content-Length header says that the body fits in the cache.
+
+    We don't cache responses of unknown length because we would have to
+    download all of them before knowing whether they fit.
+    """
+    try:
+        return 0 <= int(headers["content-length"]) <= max_size
+    except (KeyError, ValueError):
+        return False
+
+
+async def _cached_pyfetch(
+    cache: ResponseCache, url: str, **kwargs: Any
+) -> FetchResponse:
+    method = kwargs.get("method", "GET").upper()
+    headers = kwargs.get("headers") or {}
+    if method not in CACHEABLE_METHODS or not isinstance(headers, Mapping):
+        return await pyfetch(url, **kwargs)
+    entry = cache.lookup(method, url, headers)
+    if entry and entry.is_fresh(cache.default_max_age):
+        cache.hits += 1
+        return _response_from_cache(url, entry)
+    if entry:
+        kwargs["headers"] = {**headers, **entry.validators()}
+    resp = await pyfetch(url, **kwargs)
+    if entry and resp.status == 304:
+        cache.hits += 1
+        cache.revalidations += 1
+        cache.refresh(method, url, entry, resp.headers)
+        return _response_from_cache(url, entry)
+    cache.misses += 1
+    if resp.status == 200 and _fits_in_cache(resp.headers, cache.max_size):
+        # Reads all of the body up front but we know that it is small. The
+        # caller can still stream the response.
+        body = (await resp.clone().buffer()).to_bytes()
+        cache.store(
+            method,
+            url,
+            headers,
+            CachedResponse(
+                resp.url, 200, resp.status_text, resp.headers, body, time.time(), {}
+            ),
+        )
+    return resp
+
+
 async def pyfetch(
     request: "str | Request",
     /,
     *,
     signal: Any = None,
     fetcher: Any = None,
+    cache: ResponseCache | None = None,
     **kwargs: Any,
 ) -> FetchResponse:
     r"""Fetch the url and return the response.
@@ -343,6 +598,10 @@ async def pyfetch(
     fetcher :
         Fetcher to use for the fetch request.
 
+    cache :
+        A :py:class:`~pyodide.http.ResponseCache` to answer the request from
+        and to store the response in. Only used if ``request`` is a string URL.
+
     \*\*kwargs :
         keyword arguments are passed along as `optional parameters to the fetch API
         <https://developer.mozilla.org/en-US/docs/Web/API/fetch#options>`_.
@@ -361,6 +620,11 @@ async def pyfetch(
     'version': '0.23.4', 'python': '3.11.2'}, ... # long output truncated
     """
 
+    if cache is not None and isinstance(request, str):
+        return await _cached_pyfetch(
+            cache, request, signal=signal, fetcher=fetcher, **kwargs
+        )
+
     controller = AbortController.new()
     if signal:
         signal = abortSignalAny(to_js([signal, controller.signal]))
@@ -0,0 +1,173 @@
+"""
+A client for making many fetch requests with shared settings.
+"""
+
+import asyncio
+import random
+from collections.abc import Iterable, Mapping
+from typing import Any
+from urllib.parse import urlsplit
+
+from ._exceptions import AbortError
+from ._pyfetch import FetchResponse, pyfetch
+
+# Statuses that usually mean "try again later" rather than "this won't work"
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class Session:
+    r"""Make many :py:func:`~pyodide.http.pyfetch` requests with shared settings.
+
+    A session limits how many requests run at the same time, both in total and
+    per host, retries failed requests with exponential backoff and adds default
+    headers to every request. Starting hundreds of requests at once with
+    :py:func:`asyncio.gather` is fine, the session queues them.
+
+    A request holds its slot until its response headers arrive. Reading the body
+    happens outside of the limit.
+
+    Parameters
+    ----------
+    max_concurrency :
+        The largest number of requests to run at the same time.
+
+    max_per_host :
+        The largest number of requests to run at the same time to a single host.
+        If not provided, only ``max_concurrency`` applies.
+
+    retries :
+        How many times to retry a request that failed with a network error or
+        with one of the ``retry_statuses``. After the last retry, the response
+        is returned as is or the error is raised.
+
+    backoff_factor :
+        The first retry waits up to ``backoff_factor`` seconds, and each
+        following retry waits up to twice as long as the one before. The actual
+        wait is chosen at random so that requests that failed together don't
+        retry together.
+
+    max_backoff :
+        The longest time to wait before a retry, in seconds.
+
+    retry_statuses :
+        The response statuses to retry. Defaults to 408, 429, 500, 502, 503 and
+        504.
+
+    headers :
+        Headers to send with every request. Headers passed to
+        :py:meth:`~Session.fetch` take precedence.
+
+    \*\*kwargs :
+        Other default keyword arguments for :py:func:`~pyodide.http.pyfetch`.
+
+    Examples
+    --------
+    >>> import pytest; pytest.skip("Can't use top level await in doctests")
+    >>> session = Session(max_concurrency=6, retries=3, headers={"Accept": "application/json"})
+    >>> responses = await session.fetch_all(f"https://example.com/items/{i}" for i in range(100))
+    >>> items = [await resp.json() for resp in responses]
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 10,
+        max_per_host: int | None = None,
+        retries: int = 0,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        headers: Mapping[str, str] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if max_per_host is not None and max_per_host <= 0:
+            raise ValueError("max_per_host must be positive")
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.headers = dict(headers or {})
+        self._kwargs = kwargs
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore | None:
+        if self.max_per_host is None:
+            return None
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_semaphores[host]
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff_factor * 2**attempt)
+        return random.uniform(0, delay)
+
+    async def _fetch_once(self, url: str, kwargs: dict[str, Any]) -> FetchResponse:
+        host_semaphore = self._host_semaphore(url)
+        if host_semaphore:
+            async with host_semaphore, self._semaphore:
+                return await pyfetch(url, **kwargs)
+        async with self._semaphore:
+            return await pyfetch(url, **kwargs)
+
+    async def fetch(self, url: str, /, **kwargs: Any) -> FetchResponse:
+        r"""Fetch the url and return the response, retrying if it fails.
+
+        Parameters
+        ----------
+        url :
+            The URL to fetch.
+
+        \*\*kwargs :
+            Keyword arguments for :py:func:`~pyodide.http.pyfetch`. They are
+            merged with the defaults of the session.
+        """
+        kwargs = {**self._kwargs, **kwargs}
+        kwargs["headers"] = {**self.headers, **kwargs.get("headers", {})}
+        signal = kwargs.get("signal")
+        attempt = 0
+        while True:
+            try:
+                resp = await self._fetch_once(url, kwargs)
+            except AbortError:
+                if attempt >= self.retries or (signal and signal.aborted):
+                    raise
+            else:
+                if attempt >= self.retries or resp.status not in self.retry_statuses:
+                    return resp
+                # Stop downloading the body of the failed response
+                resp.abort()
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    async def get(self, url: str, /, **kwargs: Any) -> FetchResponse:
+        """Fetch the url with a ``GET`` request."""
+        return await self.fetch(url, method="GET", **kwargs)
+
+    async def post(self, url: str, /, **kwargs: Any) -> FetchResponse:
+        """Fetch the url with a ``POST`` request."""
+        return await self.fetch(url, method="POST", **kwargs)
+
+    async def fetch_all(
+        self, urls: Iterable[str], /, **kwargs: Any
+    ) -> list[FetchResponse]:
+        r"""Fetch all of the urls and return the responses in the same order.
+
+        The requests run concurrently within the limits of the session.
+
+        Parameters
+        ----------
+        urls :
+            The URLs to fetch.
+
+        \*\*kwargs :
+            Keyword arguments for :py:meth:`~Session.fetch`.
+        """
+        return await asyncio.gather(*(self.fetch(url, **kwargs) for url in urls))
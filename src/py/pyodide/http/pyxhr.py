@@ -19,10 +19,13 @@ Examples
 
 import base64
 import json
-from typing import Any, NotRequired, TypedDict, Unpack
+import os
+import time
+from typing import Any, Literal, NotRequired, TypedDict, Unpack
 from urllib.parse import urlencode
 
-from ..ffi import IN_PYODIDE
+from ..ffi import IN_PYODIDE, JsBuffer
+from ._cache import CACHEABLE_METHODS, CachedResponse, ResponseCache
 from ._exceptions import HttpStatusError, XHRError, XHRNetworkError
 
 if IN_PYODIDE:
@@ -55,6 +58,8 @@ class XHRRequestParams(TypedDict):
     data: NotRequired[str | bytes]
     json: NotRequired[dict[str, Any] | list[Any]]
     auth: NotRequired[tuple[str, str] | list[str]]
+    cache: NotRequired[ResponseCache]
+    response_type: NotRequired[Literal["text", "arraybuffer"]]
 
 
 class XHRResponse:
@@ -67,10 +72,14 @@ class XHRResponse:
     ----------
     xhr : Any
         The XMLHttpRequest object to wrap (or any compatible object)
+    binary : bool
+        Whether the response was requested with ``response_type="arraybuffer"``
     """
 
-    def __init__(self, xhr: Any):
+    def __init__(self, xhr: Any, binary: bool = False):
         self._xhr = xhr
+        self._binary = binary
+        self._content: bytes | None = None
         self._headers_dict: dict[str, str] | None = None
 
     @property
@@ -81,14 +90,50 @@ class XHRResponse:
     @property
     def content(self) -> bytes:
         """Response content as raw bytes. This is the single source of truth."""
-        if hasattr(self._xhr, "response") and self._xhr.response:
+        if self._content is None:
+            self._content = self._read_content()
+        return self._content
+
+    def _read_content(self) -> bytes:
+        response = getattr(self._xhr, "response", None)
+        if isinstance(response, JsBuffer):
+            return response.to_bytes()
+        if self._binary:
+            # The body was sent as x-user-defined text, which puts each byte in
+            # the low 8 bits of a UTF-16 code unit.
+            return self._xhr.responseText.encode("utf-16-le")[::2]
+        if response:
             try:
-                return bytes(self._xhr.response)
+                return bytes(response)
             except (TypeError, ValueError):
                 return self._xhr.responseText.encode("utf-8")
 
         return self._xhr.responseText.encode("utf-8")
 
+    def memoryview(self) -> memoryview:
+        """Response content as a :py:class:`memoryview` of :py:attr:`content`,
+        without another copy."""
+        return memoryview(self.content)
+
+    def to_file(self, path: str | os.PathLike[str]) -> None:
+        """Write the response content into a new file.
+
+        If the response was requested with ``response_type="arraybuffer"``, the
+        buffer of the response becomes the contents of the file without being
+        copied (in ``MEMFS``). After that, :py:attr:`content` can't be used.
+
+        Parameters
+        ----------
+        path :
+            The path of the file to create. The file must not exist.
+        """
+        response = getattr(self._xhr, "response", None)
+        with open(path, "xb") as f:
+            if self._content is None and isinstance(response, JsBuffer):
+                response._into_file(f)
+            else:
+                f.write(self.content)
+
     @property
     def text(self) -> str:
         """Response content as text, decoded from the `content` property."""
@@ -144,6 +189,21 @@ class XHRResponse:
             raise HttpStatusError(self.status_code, self._xhr.statusText, self.url)
 
 
+class _CachedXHR:
+    """Stands in for the XMLHttpRequest of a response from a ResponseCache."""
+
+    def __init__(self, entry: CachedResponse):
+        self.status = entry.status
+        self.statusText = entry.status_text
+        self.response = entry.body
+        self.responseText = entry.body.decode("utf-8", errors="replace")
+        self.responseURL = entry.url
+        self._headers = entry.headers
+
+    def getAllResponseHeaders(self) -> str:
+        return "".join(f"{key}: {value}\r\n" for key, value in self._headers.items())
+
+
 def _xhr_request(
     method: str, url: str, **kwargs: Unpack[XHRRequestParams]
 ) -> XHRResponse:
@@ -168,6 +228,11 @@ def _xhr_request(
         JSON data to send (automatically sets Content-Type)
     auth : tuple, optional
         Basic authentication (username, password)
+    cache : ResponseCache, optional
+        A cache to answer ``GET`` and ``HEAD`` requests from and to store
+        their responses in
+    response_type : str, optional
+        ``"arraybuffer"`` to download the body as binary data instead of text
 
     Returns
     -------
@@ -182,8 +247,6 @@ def _xhr_request(
     if not IN_PYODIDE:
         raise RuntimeError("XMLHttpRequest is only available in browser environments")
 
-    req = XMLHttpRequest.new()
-
     if params := kwargs.get("params"):
         if isinstance(params, dict):
             query_string = urlencode(params)
@@ -193,7 +256,15 @@ def _xhr_request(
             separator = "&" if "?" in url else "?"
             url = f"{url}{separator}{query_string}"
 
+    cache = kwargs.pop("cache", None)
+    if cache is not None and method.upper() in CACHEABLE_METHODS:
+        return _cached_xhr_request(cache, method, url, **kwargs)
+
+    req = XMLHttpRequest.new()
     req.open(method.upper(), url, False)
+    binary = kwargs.get("response_type") == "arraybuffer"
+    if binary:
+        _request_binary(req)
 
     # Note: timeout cannot be set for synchronous requests in browsers
     # The timeout parameter is ignored for sync XHR
@@ -225,7 +296,53 @@ def _xhr_request(
             raise XHRNetworkError(f"Network error for {method} {url}") from e
         raise XHRError(f"XMLHttpRequest failed: {e}") from e
 
-    return XHRResponse(req)
+    return XHRResponse(req, binary)
+
+
+def _request_binary(req: Any) -> None:
+    try:
+        req.responseType = "arraybuffer"
+    except JsException:
+        # Synchronous requests can only set responseType in workers. On the
+        # main thread, get the bytes as x-user-defined text instead.
+        req.overrideMimeType("text/plain; charset=x-user-defined")
+
+
+def _cached_xhr_request(
+    cache: ResponseCache, method: str, url: str, **kwargs: Unpack[XHRRequestParams]
+) -> XHRResponse:
+    # The url already has the params in it
+    kwargs.pop("params", None)
+    method = method.upper()
+    headers = kwargs.get("headers") or {}
+    entry = cache.lookup(method, url, headers)
+    if entry and entry.is_fresh(cache.default_max_age):
+        cache.hits += 1
+        return XHRResponse(_CachedXHR(entry))
+    if entry:
+        kwargs["headers"] = {**headers, **entry.validators()}
+    resp = _xhr_request(method, url, **kwargs)
+    if entry and resp.status_code == 304:
+        cache.hits += 1
+        cache.revalidations += 1
+        cache.refresh(method, url, entry, resp.headers)
+        return XHRResponse(_CachedXHR(entry))
+    cache.misses += 1
+    cache.store(
+        method,
+        url,
+        headers,
+        CachedResponse(
+            resp.url or url,
+            resp.status_code,
+            resp._xhr.statusText,
+            resp.headers,
+            resp.content,
+            time.time(),
+            {},
+        ),
+    )
+    return resp
 
 
 def get(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
@@ -236,7 +353,8 @@ def get(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -254,7 +372,8 @@ def post(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -272,7 +391,8 @@ def put(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -290,7 +410,8 @@ def delete(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -308,7 +429,8 @@ def head(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -326,7 +448,8 @@ def patch(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -344,7 +467,8 @@ def options(url: str, **kwargs: Unpack[XHRRequestParams]) -> XHRResponse:
     url : str
         URL to request
     **kwargs
-        Additional arguments (headers, params, data, json, auth)
+        Additional arguments (headers, params, data, json, auth, cache,
+        response_type)
 
     Returns
     -------
@@ -1,8 +1,130 @@
-import { loadPyodide } from "./pyodide.mjs";
-import { writeFileSync } from "fs";
+import {
+  loadPyodide,
+  _describeSnapshot,
+  _decompressSnapshot,
+} from "./pyodide.mjs";
+import { readFileSync, writeFileSync } from "fs";
 import { fileURLToPath } from "url";
 import { dirname } from "path";
+import { parseArgs } from "util";
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
-const py = await loadPyodide({ _makeSnapshot: true });
-writeFileSync(__dirname + "/snapshot.bin", py.makeMemorySnapshot());
+
+const usage = `\
+Usage: node makesnap.mjs [options]
+
+Make a memory snapshot and print what is inside of it.
+
+Options:
+  --output FILE        Where to write the snapshot (default: snapshot.bin)
+  --packages A,B,...   Load these packages before making the snapshot
+  --base FILE,...      Make a delta against this base snapshot (followed by
+                       the deltas on top of it)
+  --compress           Compress the snapshot
+  --time               Time loading Pyodide from the new snapshot
+  --manifest FILE      Don't make a snapshot, print the contents of FILE
+  --json               Print the manifest as JSON
+  --help               Show this message
+`;
+
+const { values: args } = parseArgs({
+  options: {
+    output: { type: "string", default: __dirname + "/snapshot.bin" },
+    packages: { type: "string" },
+    base: { type: "string" },
+    compress: { type: "boolean", default: false },
+    time: { type: "boolean", default: false },
+    manifest: { type: "string" },
+    json: { type: "boolean", default: false },
+    help: { type: "boolean", default: false },
+  },
+});
+
+function formatBytes(n) {
+  if (n < 1 << 10) {
+    return `${n} B`;
+  }
+  if (n < 1 << 20) {
+    return `${(n / (1 << 10)).toFixed(1)} KiB`;
+  }
+  return `${(n / (1 << 20)).toFixed(1)} MiB`;
+}
+
+function printManifest(manifest) {
+  if (args.json) {
+    console.log(JSON.stringify(manifest, null, 2));
+    return;
+  }
+  const format = [
+    manifest.sparse ? "sparse" : "dense",
+    manifest.compressed && "compressed",
+    manifest.delta && `delta against ${manifest.baseId}`,
+  ].filter(Boolean);
+  const { hiwireKeys } = manifest;
+  const serializedTotal = manifest.serializedSizes.reduce(
+    (total, { size }) => total + size,
+    0,
+  );
+  console.log(`id:             ${manifest.id || "(none)"}`);
+  console.log(`format:         ${format.join(", ")}`);
+  console.log(`snapshot size:  ${formatBytes(manifest.size)}`);
+  console.log(`heap size:      ${formatBytes(manifest.heapSize)}`);
+  console.log(
+    `stored pages:   ${manifest.storedPages} of ${manifest.totalPages} ` +
+      `(${formatBytes(manifest.heapDataSize)})`,
+  );
+  console.log(`config size:    ${formatBytes(manifest.configSize)}`);
+  console.log(
+    `hiwire keys:    ${hiwireKeys.total} ` +
+      `(base: ${hiwireKeys.base}, path: ${hiwireKeys.path}, ` +
+      `serialized: ${hiwireKeys.serialized}, null: ${hiwireKeys.null}, ` +
+      `API: ${hiwireKeys.API}, abortSignalAny: ${hiwireKeys.abortSignalAny})`,
+  );
+  console.log(`immortal keys:  ${manifest.immortalKeys}`);
+  console.log(`serialized:     ${formatBytes(serializedTotal)}`);
+  const largest = [...manifest.serializedSizes]
+    .sort((a, b) => b.size - a.size)
+    .slice(0, 10);
+  for (const { index, size } of largest) {
+    console.log(`  index ${index}: ${formatBytes(size)}`);
+  }
+}
+
+if (args.help) {
+  console.log(usage);
+  process.exit(0);
+}
+
+if (args.manifest) {
+  printManifest(_describeSnapshot(readFileSync(args.manifest)));
+  process.exit(0);
+}
+
+// makeMemorySnapshot needs the base uncompressed to compare against it.
+const base =
+  args.base &&
+  (await Promise.all(
+    args.base.split(",").map((path) => _decompressSnapshot(readFileSync(path))),
+  ));
+let t0 = performance.now();
+const py = await loadPyodide({ _makeSnapshot: true, _loadSnapshot: base });
+if (args.packages) {
+  await py.loadPackage(args.packages.split(","));
+}
+const snapshot = await py.makeMemorySnapshot({
+  compress: args.compress,
+  base,
+});
+writeFileSync(args.output, snapshot);
+console.error(
+  `made ${args.output} in ${((performance.now() - t0) / 1000).toFixed(2)}s`,
+);
+printManifest(_describeSnapshot(snapshot));
+
+if (args.time) {
+  t0 = performance.now();
+  await loadPyodide({ _loadSnapshot: base ? [...base, snapshot] : snapshot });
+  console.error(
+    `loaded from snapshot in ${((performance.now() - t0) / 1000).toFixed(2)}s`,
+  );
+}
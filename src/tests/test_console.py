@@ -52,6 +52,54 @@ def test_write_stream():
     assert my_stream.name == "blah"
 
 
+def test_buffered_write_stream():
+    chunks: list[str] = []
+
+    my_stream = console._WriteStream(chunks.append, name="blah", buffer_size=10)
+    print("foo", file=my_stream)
+    print("bar", file=my_stream)
+    assert chunks == []
+    print("bazz", file=my_stream)
+    assert chunks == ["foo\nbar\nbazz"]
+    my_stream.flush()
+    assert chunks == ["foo\nbar\nbazz", "\n"]
+    my_stream.flush()
+    assert chunks == ["foo\nbar\nbazz", "\n"]
+
+    chunks.clear()
+    my_stream = console._WriteStream(chunks.append, name="blah", line_buffering=True)
+    my_stream.write("foo")
+    my_stream.write("bar")
+    assert chunks == []
+    my_stream.write("baz\nqux")
+    assert chunks == ["foobarbaz\nqux"]
+    my_stream.write("quux")
+    my_stream.close()
+    assert chunks == ["foobarbaz\nqux", "quux"]
+
+    chunks.clear()
+    my_stream = console._WriteStream(chunks.append, name="blah", flush_interval=0.1)
+    my_stream.write("foo")
+    assert chunks == []
+    time.sleep(0.1)
+    my_stream.write("bar")
+    assert chunks == ["foobar"]
+
+    # With a running event loop, buffered output is flushed even if nothing
+    # else is written
+    async def test():
+        my_stream.write("baz")
+        assert chunks == ["foobar"]
+        await asyncio.sleep(0.2)
+        assert chunks == ["foobar", "baz"]
+
+    asyncio.run(test())
+
+    my_stream = console._WriteStream(chunks.append, name="blah", buffer_size=10)
+    with pytest.raises(UnicodeEncodeError):
+        my_stream.write("\udc80")
+
+
 def test_repr():
     sep = "..."
     for string in ("x" * 10**5, "x" * (10**5 + 1)):
@@ -291,6 +339,20 @@ def test_nonpersistent_redirection(safe_sys_redirections):
     asyncio.run(test())
 
 
+def test_buffered_redirection(safe_sys_redirections):
+    chunks: list[str] = []
+
+    shell = Console(stdout_callback=chunks.append, output_buffer_size=1000)
+
+    async def test():
+        res = shell.push("_ = [print(i) for i in range(100)]")
+        assert res.syntax_check == "complete"
+        assert await res is None
+
+    asyncio.run(test())
+    assert chunks == ["".join(f"{i}\n" for i in range(100))]
+
+
 @pytest.mark.asyncio
 async def test_compile_optimize():
     from pyodide.console import Console
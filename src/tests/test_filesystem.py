@@ -257,6 +257,221 @@ def test_nativefs_dir(request, selenium_standalone):
     )
 
 
+@only_chrome
+def test_nativefs_incremental_sync(request, selenium_standalone):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone
+    selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        const dirHandle = await root.getDirectoryHandle("incremental", { create: true });
+        const fs = await pyodide.mountNativeFS("/mnt/incremental", dirHandle);
+
+        const proto = FileSystemFileHandle.prototype;
+        const origCreateWritable = proto.createWritable;
+        const written = [];
+        proto.createWritable = function (...args) {
+            written.push(this.name);
+            return origCreateWritable.apply(this, args);
+        };
+        try {
+            pyodide.runPython(`
+                import pathlib
+                d = pathlib.Path("/mnt/incremental")
+                (d / "sub").mkdir()
+                for name in ["a", "b", "sub/c"]:
+                    (d / name).write_text(name)
+            `);
+            await fs.syncfs();
+            assert(() => written.sort().join() === "a,b,c");
+
+            written.length = 0;
+            await fs.syncfs();
+            assert(() => written.length === 0);
+
+            pyodide.runPython(`(d / "sub/c").write_text("changed")`);
+            await fs.syncfs();
+            assert(() => written.join() === "c");
+
+            written.length = 0;
+            pyodide.runPython(`(d / "b").unlink()`);
+            await fs.syncfs();
+            assert(() => written.length === 0);
+            const names = [];
+            for await (const name of dirHandle.keys()) {
+                names.push(name);
+            }
+            assert(() => names.sort().join() === "a,sub");
+            const c = await (await dirHandle.getDirectoryHandle("sub")).getFileHandle("c");
+            const text = await (await c.getFile()).text();
+            assert(() => text === "changed");
+        } finally {
+            proto.createWritable = origCreateWritable;
+            pyodide.FS.unmount("/mnt/incremental");
+        }
+        """
+    )
+
+
+@only_chrome
+def test_nativefs_sync_progress(request, selenium_standalone):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone
+    selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        const dirHandle = await root.getDirectoryHandle("progress", { create: true });
+        const fs = await pyodide.mountNativeFS("/mnt/progress", dirHandle);
+        try {
+            pyodide.runPython(`
+                import pathlib
+                d = pathlib.Path("/mnt/progress")
+                for i in range(3):
+                    (d / f"dir{i}" / "inner").mkdir(parents=True)
+                    for j in range(10):
+                        (d / f"dir{i}" / "inner" / f"{j}.txt").write_text("x" * 1000)
+                (d / "big.bin").write_bytes(bytes(3 << 20))
+            `);
+            const reports = [];
+            await fs.syncfs({ onProgress: (p) => reports.push(p) });
+            const last = reports[reports.length - 1];
+            assert(() => last.total === 3 * 2 + 3 * 10 + 1);
+            assert(() => last.done === last.total);
+            assert(() => last.bytes === 30 * 1000 + (3 << 20));
+            // the big file is written in several chunks
+            assert(() => reports.length > last.total);
+
+            const big = await (await dirHandle.getFileHandle("big.bin")).getFile();
+            assert(() => big.size === 3 << 20);
+            const inner = await (await dirHandle.getDirectoryHandle("dir2")).getDirectoryHandle("inner");
+            const text = await (await (await inner.getFileHandle("9.txt")).getFile()).text();
+            assert(() => text.length === 1000);
+        } finally {
+            pyodide.FS.unmount("/mnt/progress");
+        }
+        """
+    )
+
+
+@only_chrome
+def test_nativefs_lazy(request, selenium_standalone):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone
+    selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        const dirHandle = await root.getDirectoryHandle("lazy", { create: true });
+        const sub = await dirHandle.getDirectoryHandle("sub", { create: true });
+        for (const [dir, name, size] of [[dirHandle, "a", 3000], [dirHandle, "b", 3000], [sub, "c", 10]]) {
+            const writable = await (await dir.getFileHandle(name, { create: true })).createWritable();
+            await writable.write("x".repeat(size));
+            await writable.close();
+        }
+
+        const fs = await pyodide.mountNativeFS("/mnt/lazy", dirHandle, {
+            lazy: true,
+            memoryBudget: 4000,
+        });
+        const node = (path) => pyodide.FS.lookupPath(path).node;
+        try {
+            // Nothing has been read yet but the sizes are right
+            assert(() => pyodide.FS.stat("/mnt/lazy/a").size === 3000);
+            assert(() => node("/mnt/lazy/a").contents === null);
+            pyodide.runPython(`
+                import os
+                assert sorted(os.listdir("/mnt/lazy")) == ["a", "b", "sub"]
+                assert os.path.getsize("/mnt/lazy/sub/c") == 10
+                assert open("/mnt/lazy/a").read() == "x" * 3000
+            `);
+            assert(() => node("/mnt/lazy/a").contents.length === 3000);
+            // Reading b goes over the budget so a is dropped again
+            pyodide.runPython(`assert open("/mnt/lazy/b").read() == "x" * 3000`);
+            assert(() => node("/mnt/lazy/a").contents === null);
+            assert(() => pyodide.FS.stat("/mnt/lazy/a").size === 3000);
+            pyodide.runPython(`assert open("/mnt/lazy/a").read() == "x" * 3000`);
+
+            // Modified files are written back and stay in memory
+            pyodide.runPython(`
+                with open("/mnt/lazy/sub/c", "a") as f:
+                    f.write("yz")
+                open("/mnt/lazy/a").read()
+                open("/mnt/lazy/b").read()
+            `);
+            assert(() => node("/mnt/lazy/sub/c").contents !== null);
+            await fs.syncfs();
+            const c = await (await sub.getFileHandle("c")).getFile();
+            const text = await c.text();
+            assert(() => text === "x".repeat(10) + "yz");
+        } finally {
+            pyodide.FS.unmount("/mnt/lazy");
+        }
+        """
+    )
+
+
+@only_chrome
+def test_nativefs_lazy_over_budget(request, selenium_standalone):
+    if request.config.option.runner == "playwright":
+        pytest.xfail("Playwright doesn't support file system access APIs")
+
+    selenium = selenium_standalone
+    selenium.run_js(
+        """
+        const root = await navigator.storage.getDirectory();
+        const dirHandle = await root.getDirectoryHandle("lazy_budget", { create: true });
+        for (const [name, size] of [["a", 3000], ["b", 3000]]) {
+            const writable = await (await dirHandle.getFileHandle(name, { create: true })).createWritable();
+            await writable.write("x".repeat(size));
+            await writable.close();
+        }
+
+        const fs = await pyodide.mountNativeFS("/mnt/lazy_budget", dirHandle, {
+            lazy: true,
+            memoryBudget: 100,
+        });
+        const node = (path) => pyodide.FS.lookupPath(path).node;
+        const remoteText = async (name) =>
+            await (await (await dirHandle.getFileHandle(name)).getFile()).text();
+        try {
+            // Touching a makes it newer than the remote copy without changing
+            // its contents, so syncfs has to read it back in even though it
+            // doesn't fit the budget.
+            pyodide.runPython(`
+                import os, time
+                future = time.time() + 3600
+                os.utime("/mnt/lazy_budget/a", (future, future))
+            `);
+            await fs.syncfs();
+            assert(() => node("/mnt/lazy_budget/a").contents === null);
+            let text = await remoteText("a");
+            assert(() => text === "x".repeat(3000));
+
+            // Writes through a shared mapping are kept when the file is
+            // evicted after it is unmapped.
+            pyodide.runPython(`
+                import mmap
+                with open("/mnt/lazy_budget/b", "r+b") as f:
+                    with mmap.mmap(f.fileno(), 0) as m:
+                        m[:2] = b"yz"
+                assert open("/mnt/lazy_budget/a").read() == "x" * 3000
+                assert open("/mnt/lazy_budget/b").read() == "yz" + "x" * 2998
+            `);
+            await fs.syncfs();
+            text = await remoteText("b");
+            assert(() => text === "yz" + "x".repeat(2998));
+        } finally {
+            pyodide.FS.unmount("/mnt/lazy_budget");
+        }
+        """
+    )
+
+
 @only_chrome
 def test_nativefs_errors(selenium):
     selenium.run_js(
@@ -287,6 +287,43 @@ def test_jsproxy_call2(selenium):
     assert [f(*range(n)) for n in range(10)] == list(range(10))
 
 
+@run_in_pyodide
+def test_jsproxy_call_simple_args(selenium):
+    from pyodide.code import run_js
+    from pyodide.ffi import jsnull
+
+    f = run_js("(function(...args){ return args.map(x => [typeof x, x]); })")
+    res = f(None, jsnull, True, False, 7, -(2**31), 2**40, 2**70, 0.5, "abc", "é")
+    assert res.to_py() == [
+        ["undefined", None],
+        ["object", None],
+        ["boolean", True],
+        ["boolean", False],
+        ["number", 7],
+        ["number", -(2**31)],
+        ["number", 2**40],
+        ["bigint", 2**70],
+        ["number", 0.5],
+        ["string", "abc"],
+        ["string", "é"],
+    ]
+    s = "x" * 1000
+    assert f("", s, "🐍").to_py() == [["string", ""], ["string", s], ["string", "🐍"]]
+    assert f(*range(20)).to_py() == [["number", i] for i in range(20)]
+
+    C = run_js("(class { constructor(...args) { this.args = args; } })")
+    assert C.new(1, "a", None).args.to_py() == [1, "a", None]
+    assert C.new(1, run_js("[2]")).args.to_py() == [1, [2]]
+
+    # Calls nested inside argument conversion and inside the callee
+    g = run_js("(function(a, b){ return [a(), b]; })")
+    assert g(lambda: g(lambda: 1, 2).to_py(), 3).to_py() == [[1, 2], 3]
+    assert g(lambda: f(1, "x").to_py(), run_js("[4]")).to_py() == [
+        [["number", 1], ["string", "x"]],
+        [4],
+    ]
+
+
 def test_jsproxy_call_kwargs(selenium):
     assert selenium.run_js(
         """
@@ -1268,6 +1305,53 @@ def test_duck_buffer_method_presence(selenium):
     assert not set(dir(other)).intersection(buffer_methods)
 
 
+@run_in_pyodide(packages=["numpy"])
+def test_wasm_view_buffer_protocol(selenium):
+    import numpy as np
+    import pytest
+
+    import pyodide_js
+    from js import Float64Array
+
+    HEAPF64 = pyodide_js._module.HEAPF64
+
+    arr = np.arange(10, dtype=np.float64)
+    addr = arr.__array_interface__["data"][0]
+    view = HEAPF64.subarray(addr // 8, addr // 8 + 10)
+
+    # A view into the wasm memory shares its data with Python
+    m = memoryview(view)
+    assert m.format == "d"
+    assert m.shape == (10,)
+    assert not m.readonly
+    m[3] = 30
+    assert arr[3] == 30
+    shared = np.asarray(view)
+    assert np.shares_memory(shared, arr)
+    shared[4] = 40
+    assert view[4] == 40
+    m.release()
+
+    # Other typed arrays still need a copy
+    other = Float64Array.new(10)
+    with pytest.raises(TypeError):
+        memoryview(other)
+    other.assign(arr)
+    assert other[3] == 30
+    out = np.zeros(10)
+    other.assign_to(out)
+    assert out[4] == 40
+
+    # Growing the memory detaches the old view
+    big = bytearray(len(pyodide_js._module.HEAPU8))
+    with pytest.raises(BufferError, match="detached"):
+        memoryview(view)
+    del big
+    # but the numpy array made earlier points at the same wasm memory
+    shared[5] = 50
+    assert arr[5] == 50
+
+
 def test_memory_leaks(selenium):
     # refcounts are tested automatically in conftest by default
     selenium.run_js(
@@ -1557,6 +1641,82 @@ def test_array_extend(selenium_module_scope, l1, l2):
     assert l1 == l1js2.to_py()
 
 
+@run_in_pyodide
+def test_array_bulk_conversion(selenium):
+    from pyodide.code import run_js
+    from pyodide.ffi import to_js
+
+    types = run_js("(a) => a.map((x) => typeof x)")
+
+    # All of these are converted in one go
+    numeric = [1, -2.5, None, True, False, 2**31 - 1]
+    a = to_js([])
+    a.extend(numeric)
+    assert types(a).to_py() == ["number"] * 2 + ["undefined"] + ["boolean"] * 2 + [
+        "number"
+    ]
+    assert a.to_py() == numeric
+
+    # These need the item by item conversion
+    mixed = [1, 2**60, "x", 2.5]
+    a = to_js([0, 0])
+    a[1:1] = mixed
+    assert types(a).to_py() == ["number", "number", "bigint", "string", "number", "number"]
+    assert (a + [3.5]).to_py()[-1] == 3.5
+
+    # Long enough that spreading it as arguments would overflow the stack
+    n = 500_000
+    a = to_js([])
+    a.extend(range(n))
+    a[10:20] = list(range(n))
+    assert len(a) == 2 * n - 10
+    assert a[n + 9] == n - 1
+    assert a[n + 10] == 20
+
+
+@run_in_pyodide
+def test_array_bulk_conversion_error(selenium):
+    from sys import getrefcount
+
+    import pytest
+
+    from pyodide.ffi import ConversionError, to_js
+
+    class Meta(type):
+        @property
+        def __mro__(cls):
+            # Makes the issubclass checks in pyproxy_new fail
+            raise RuntimeError("no mro")
+
+    class Unconvertible(metaclass=Meta):
+        pass
+
+    # The first item becomes a PyProxy, converting the second one fails
+    items = [[1], Unconvertible()]
+    before = getrefcount(items[0])
+    a = to_js([0])
+
+    def extend():
+        a.extend(items)
+
+    def iadd():
+        nonlocal a
+        a += items
+
+    def add():
+        a + items
+
+    def assign():
+        a[1:1] = items
+
+    for f in [extend, iadd, add, assign]:
+        with pytest.raises(ConversionError):
+            f()
+        assert a.to_py() == [0]
+        # The proxy of the first item was destroyed again
+        assert getrefcount(items[0]) == before
+
+
 @run_in_pyodide
 def test_typed_array(selenium):
     from pyodide.code import run_js
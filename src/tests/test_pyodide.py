@@ -36,6 +36,38 @@ def test_find_imports():
     )
     assert res == []
 
+    # Imports nested in compound statements are found
+    res = find_imports(
+        """
+        try:
+            import a
+        except ImportError:
+            import b
+        else:
+            import c
+        finally:
+            import d
+        def f():
+            class C:
+                import e
+        match x:
+            case 1:
+                from f.g import h
+        from . import i
+        """
+    )
+    assert res == ["a", "b", "c", "d", "e", "f", "f.g"]
+    assert find_imports("x = 1") == []
+
+    # The result is memoized and callers can't modify the cached value
+    res = find_imports("import numpy")
+    res.append("scipy")
+    assert find_imports("import numpy") == ["numpy"]
+
+    # Reuse an ast that was already parsed
+    cr = CodeRunner("import pandas.io")
+    assert find_imports("import pandas.io", cr.ast) == ["pandas", "pandas.io"]
+
 
 def test_ffi_import_star():
     exec("from pyodide.ffi import *", {})
@@ -231,6 +263,64 @@ def test_eval_code_locals():
     assert res == "Hello"
 
 
+def test_code_cache(tmp_path):
+    from pyodide.code import CodeCache, code_cache
+
+    old_maxsize = code_cache.maxsize
+    code_cache.clear()
+    try:
+        ns: dict[str, Any] = {}
+        assert eval_code("x = 1; x + 1", ns) == 2
+        assert code_cache.info() == (0, 1, old_maxsize, 1)
+        assert eval_code("x = 1; x + 1", ns) == 2
+        assert code_cache.info() == (1, 1, old_maxsize, 1)
+
+        # Every compile argument is part of the key
+        assert eval_code("x = 1; x + 1;", ns) is None
+        assert eval_code("x = 1; x + 1;", ns, quiet_trailing_semicolon=False) == 2
+        assert eval_code("x = 1; x + 1", ns, return_mode="none") is None
+        assert eval_code("x = 1; x + 1", ns, filename="a.py") == 2
+        assert code_cache.info().currsize == 5
+
+        # Errors from a cached code object still point at the right file
+        with pytest.raises(NameError) as exc_info:
+            eval_code("y", ns, filename="b.py")
+        with pytest.raises(NameError) as exc_info:
+            eval_code("y", ns, filename="b.py")
+        assert str(exc_info.traceback[-1].path) == "b.py"
+
+        code_cache.maxsize = 2
+        assert code_cache.info().currsize == 2
+        code_cache.maxsize = 0
+        eval_code("3", ns)
+        assert code_cache.info().currsize == 0
+        with pytest.raises(ValueError, match="non-negative"):
+            code_cache.maxsize = -1
+    finally:
+        code_cache.maxsize = old_maxsize
+        code_cache.clear()
+
+    cache = CodeCache(maxsize=2)
+    for source in ["1", "2", "3"]:
+        cache.put(cache.make_key(source), compile(source, "<exec>", "eval"))
+    assert cache.get(cache.make_key("1")) is None
+    # Looking up "2" makes "3" the least recently used entry
+    assert cache.get(cache.make_key("2")) is not None
+    cache.put(cache.make_key("4"), compile("4", "<exec>", "eval"))
+    assert cache.get(cache.make_key("3")) is None
+
+    path = tmp_path / "code_cache"
+    cache.save(str(path))
+    cache2 = CodeCache()
+    assert cache2.load(str(path)) == 2
+    code = cache2.get(cache.make_key("4"))
+    assert code is not None
+    assert eval(code) == 4
+
+    path.write_bytes(b"garbage")
+    assert CodeCache().load(str(path)) == 0
+
+
 def test_relaxed_call():
     from pyodide.code import relaxed_call
 
@@ -1984,6 +2074,53 @@ def test_hiwire_invalid_ref(selenium):
     _api.fail_test = False
 
 
+def test_hiwire_stats(selenium):
+    selenium.run_js(
+        """
+        const api = pyodide._api;
+        const stats = api.hiwireRefStats();
+        assert(() => stats.immortal > 0);
+
+        pyodide.runPython("from pyodide.code import run_js");
+        pyodide._module._clear_method_call_singleton();
+        const start = api.hiwireRefStats();
+        pyodide.runPython(`proxies = [run_js("({})") for _ in range(10)]`);
+        pyodide._module._clear_method_call_singleton();
+        const grown = api.hiwireRefStats();
+        assert(() => grown.heap - start.heap === 10);
+        assert(() => grown.immortal === start.immortal);
+        pyodide.runPython("del proxies");
+        pyodide._module._clear_method_call_singleton();
+        assert(() => api.hiwireRefStats().heap === start.heap);
+
+        api.hiwireTraceAllocations(1);
+        try {
+            const before = api.hiwireCheckpoint();
+            pyodide.runPython(`
+                from pyodide.code import run_js
+                leaked = [run_js("({})") for _ in range(5)]
+            `);
+            const diff = api.hiwireDiff(before);
+            const sampled = (d) => d.sites.reduce((n, [site, count]) => n + count, 0);
+            assert(() => diff.heap >= 5);
+            assert(() => sampled(diff) >= 5);
+            assert(() => diff.sites.every(([site]) => typeof site === "string"));
+
+            pyodide.runPython("del leaked");
+            pyodide._module._clear_method_call_singleton();
+            const after = api.hiwireDiff(before);
+            assert(() => after.heap <= 0);
+            assert(() => sampled(after) <= 0);
+            assert(() => !api.fail_test);
+        } finally {
+            api.hiwireTraceAllocations(0);
+        }
+        assert(() => api.hiwireCheckpoint().sites.size === 0);
+        assertThrows(() => api.hiwireTraceAllocations(-1), "TypeError", "nonnegative");
+        """
+    )
+
+
 def test_system_exit(selenium):
     """Make sure nothing weird happens when we throw SystemExit"""
     for _ in range(3):
@@ -1,6 +1,8 @@
 import pytest
 from pytest_pyodide import run_in_pyodide
 
+from conftest import requires_jspi
+
 
 @pytest.fixture
 def url_notfound(httpserver):
@@ -31,6 +33,44 @@ def test_open_url(selenium, httpserver):
     )
 
 
+@pytest.mark.xfail_browsers(node="XMLHttpRequest is not available in node")
+def test_open_url_binary(selenium, httpserver):
+    data = bytes(range(256)) * 4
+    httpserver.expect_request("/test_open_url_binary").respond_with_data(
+        data,
+        content_type="application/octet-stream",
+        headers={"Access-Control-Allow-Origin": "*"},
+    )
+    request_url = httpserver.url_for("/test_open_url_binary")
+
+    @run_in_pyodide
+    def run(selenium, url, data):
+        from pathlib import Path
+
+        from pyodide.http import open_url, pyxhr
+
+        assert open_url(url, binary=True).read() == data
+        resp = pyxhr.get(url, response_type="arraybuffer")
+        assert resp.memoryview() == data
+        pyxhr.get(url, response_type="arraybuffer").to_file("/tmp/binary.bin")
+        assert Path("/tmp/binary.bin").read_bytes() == data
+
+    run(selenium, request_url, data)
+
+
+def test_xhr_response_user_defined_charset():
+    from pyodide.http.pyxhr import XHRResponse
+
+    data = bytes(range(256))
+
+    class FakeXHR:
+        # How x-user-defined decodes bytes: ASCII as is, the rest at U+F780
+        responseText = "".join(chr(b) if b < 0x80 else chr(0xF700 + b) for b in data)
+        response = responseText
+
+    assert XHRResponse(FakeXHR(), binary=True).content == data
+
+
 @run_in_pyodide
 async def test_pyfetch_create_file(selenium):
     import pathlib
@@ -319,6 +359,126 @@ async def test_pyfetch_custom_fetcher(selenium):
     assert await response.text() == "test"
 
 
+@run_in_pyodide
+async def test_pyfetch_iter_bytes(selenium):
+    import pytest
+
+    from js import Promise, Response
+    from pyodide.http import BodyUsedError, pyfetch
+
+    def fetcher(url, options):
+        return Promise.resolve(Response.new("abcdefghij"))
+
+    resp = await pyfetch("test_url", fetcher=fetcher)
+    chunks = [bytes(chunk) async for chunk in resp.iter_bytes(4)]
+    assert chunks == [b"abcd", b"efgh", b"ij"]
+    assert resp.body_used
+    with pytest.raises(BodyUsedError):
+        await resp.bytes()
+
+    resp = await pyfetch("test_url", fetcher=fetcher)
+    chunks = [chunk async for chunk in resp.iter_bytes()]
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert b"".join(chunks) == b"abcdefghij"
+
+    resp = await pyfetch("test_url", fetcher=fetcher)
+    with pytest.raises(ValueError, match="chunk_size must be positive"):
+        async for _ in resp.iter_bytes(0):
+            pass
+
+
+@run_in_pyodide
+async def test_pyfetch_iter_lines(selenium):
+    from js import Promise, Response
+    from pyodide.http import pyfetch
+
+    def fetcher(url, options):
+        return Promise.resolve(Response.new("line one\r\nline \u00e9\n\nlast line"))
+
+    resp = await pyfetch("test_url", fetcher=fetcher)
+    lines = [line async for line in resp.iter_lines()]
+    assert lines == ["line one", "line \u00e9", "", "last line"]
+
+
+@requires_jspi
+@run_in_pyodide
+async def test_pyfetch_unpack_archive_stream(selenium):
+    import io
+    import pathlib
+    import tarfile
+
+    import pytest
+
+    from js import Promise, Response
+    from pyodide.ffi import to_js
+    from pyodide.http import pyfetch
+
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as tar:
+        for name in ["a.txt", "b/c.txt"]:
+            content = name.encode() * 1000
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+    def fetcher(url, options):
+        return Promise.resolve(Response.new(to_js(data.getvalue())))
+
+    resp = await pyfetch("archive.tar.gz", fetcher=fetcher)
+    await resp.unpack_archive(extract_dir="/tmp/stream_unpack", stream=True)
+    root = pathlib.Path("/tmp/stream_unpack")
+    assert (root / "a.txt").read_bytes() == b"a.txt" * 1000
+    assert (root / "b/c.txt").read_bytes() == b"b/c.txt" * 1000
+
+    resp = await pyfetch("archive.zip", fetcher=fetcher)
+    with pytest.raises(ValueError, match="only supports tar archives"):
+        await resp.unpack_archive(stream=True)
+
+
+@requires_jspi
+@run_in_pyodide
+async def test_pyfetch_unpack_archive_stream_error(selenium):
+    import tarfile
+
+    import pytest
+
+    from js import Promise, Response
+    from pyodide.code import run_js
+    from pyodide.http import pyfetch
+
+    # An endless stream of bytes that are not a gzip archive
+    stream, cancelled = run_js(
+        """
+        const cancelled = [];
+        const stream = new ReadableStream({
+            pull(controller) {
+                controller.enqueue(new Uint8Array(1024).fill(1));
+            },
+            cancel(reason) {
+                cancelled.push(reason);
+            },
+        });
+        [stream, cancelled];
+        """
+    )
+
+    def fetcher(url, options):
+        return Promise.resolve(Response.new(stream))
+
+    resp = await pyfetch("archive.tar.gz", fetcher=fetcher)
+    with pytest.raises(tarfile.ReadError):
+        await resp.unpack_archive(extract_dir="/tmp/stream_unpack_error", stream=True)
+    assert cancelled.length == 1
+    assert not stream.locked
+
+    def fetcher(url, options):
+        return Promise.resolve(Response.new(None, status=204))
+
+    resp = await pyfetch("archive.tar.gz", fetcher=fetcher)
+    with pytest.raises(tarfile.ReadError):
+        await resp.unpack_archive(extract_dir="/tmp/stream_unpack_error", stream=True)
+
+
 # pyxhr tests
 @pytest.fixture
 def xhr_test_server(httpserver):
@@ -594,3 +754,242 @@ def test_xhr_not_in_browser(monkeypatch):
 
         # This should raise RuntimeError when trying to make a request
         pyxhr.get("http://test.com")
+
+
+def test_session_limits_and_retries(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+
+    from pyodide.http import AbortError, Session, _session
+
+    running: dict[str, int] = {}
+    most_running: dict[str, int] = {}
+    attempts: dict[str, int] = {}
+
+    class FakeResponse:
+        def __init__(self, status):
+            self.status = status
+            self.aborted = False
+
+        def abort(self):
+            self.aborted = True
+
+    async def fake_pyfetch(url, **kwargs):
+        assert kwargs["headers"] == {"X-Default": "1", "X-Extra": "2"}
+        host = url.split("/")[2]
+        running[host] = running.get(host, 0) + 1
+        most_running[host] = max(most_running.get(host, 0), running[host])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            running[host] -= 1
+        attempts[url] = attempts.get(url, 0) + 1
+        if url.endswith("flaky") and attempts[url] < 3:
+            return FakeResponse(503)
+        if url.endswith("broken"):
+            raise AbortError(SimpleNamespace(message="network error"))
+        return FakeResponse(200)
+
+    monkeypatch.setattr(_session, "pyfetch", fake_pyfetch)
+
+    session = Session(
+        max_concurrency=4,
+        max_per_host=2,
+        retries=2,
+        backoff_factor=0,
+        headers={"X-Default": "1"},
+    )
+
+    async def main():
+        urls = [f"http://host{i % 3}/{i}" for i in range(30)]
+        responses = await session.fetch_all(urls, headers={"X-Extra": "2"})
+        assert [r.status for r in responses] == [200] * 30
+        assert max(most_running.values()) <= 2
+        assert sum(most_running.values()) > 3
+
+        resp = await session.get("http://host0/flaky", headers={"X-Extra": "2"})
+        assert resp.status == 200
+        assert attempts["http://host0/flaky"] == 3
+
+        with pytest.raises(AbortError):
+            await session.get("http://host0/broken", headers={"X-Extra": "2"})
+        assert attempts["http://host0/broken"] == 3
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def flaky_server(httpserver):
+    import werkzeug
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("X-Session"))
+        status = 503 if len(calls) < 3 else 200
+        return werkzeug.Response(
+            "hello",
+            status=status,
+            headers={
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Headers": "X-Session",
+            },
+        )
+
+    httpserver.expect_request("/flaky").respond_with_handler(handler)
+    return httpserver.url_for("/flaky"), calls
+
+
+def test_session_retry(selenium, flaky_server):
+    url, calls = flaky_server
+
+    @run_in_pyodide
+    async def run(selenium, url):
+        from pyodide.http import Session
+
+        session = Session(retries=3, backoff_factor=0.01, headers={"X-Session": "yes"})
+        resp = await session.get(url)
+        assert resp.status == 200
+        assert await resp.text() == "hello"
+
+    run(selenium, url)
+    assert [c for c in calls if c] == ["yes"] * 3
+
+
+@pytest.mark.parametrize("backend", ["memory", "files"])
+def test_response_cache(tmp_path, backend):
+    import time
+
+    from pyodide.http import ResponseCache
+    from pyodide.http._cache import CachedResponse
+
+    path = tmp_path / "cache" if backend == "files" else None
+    cache = ResponseCache(max_size=100, path=path)
+
+    def response(body, **headers):
+        return CachedResponse("", 200, "OK", headers, body, time.time(), {})
+
+    assert cache.store("GET", "/a", {}, response(b"a" * 40, etag='"1"'))
+    assert not cache.store("POST", "/a", {}, response(b"a"))
+    assert not cache.store("GET", "/b", {}, response(b"b", **{"cache-control": "no-store"}))
+    assert not cache.store("GET", "/b", {}, response(b"b" * 101))
+
+    entry = cache.lookup("GET", "/a")
+    assert entry.body == b"a" * 40
+    assert not entry.is_fresh()
+    assert entry.validators() == {"If-None-Match": '"1"'}
+    assert cache.lookup("HEAD", "/a") is None
+
+    fresh = response(b"c" * 40, **{"cache-control": "max-age=60", "age": "10"})
+    assert cache.store("GET", "/c", {}, fresh)
+    assert cache.lookup("GET", "/c").is_fresh()
+
+    varied = response(b"v", vary="Accept")
+    assert cache.store("GET", "/v", {"Accept": "text/csv"}, varied)
+    assert cache.lookup("GET", "/v", {"accept": "text/csv"}).body == b"v"
+    assert cache.lookup("GET", "/v", {"Accept": "text/html"}) is None
+
+    # Use /a so that /c is the least recently used
+    cache.lookup("GET", "/a")
+    assert cache.store("GET", "/d", {}, response(b"d" * 40))
+    assert cache.lookup("GET", "/c") is None
+    assert cache.lookup("GET", "/a") is not None
+    assert cache.size == 81
+
+    if path:
+        reopened = ResponseCache(max_size=100, path=path)
+        assert reopened.size == 81
+        assert reopened.lookup("GET", "/d").body == b"d" * 40
+
+    cache.clear()
+    assert cache.size == 0
+    assert cache.lookup("GET", "/a") is None
+
+
+@pytest.fixture
+def etag_server(httpserver):
+    import werkzeug
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("If-None-Match"))
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "If-None-Match, If-Modified-Since",
+            "Access-Control-Expose-Headers": "ETag",
+            "ETag": '"v1"',
+        }
+        if request.headers.get("If-None-Match") == '"v1"':
+            return werkzeug.Response(status=304, headers=headers)
+        return werkzeug.Response("data", headers=headers)
+
+    httpserver.expect_request("/etag").respond_with_handler(handler)
+    return httpserver.url_for("/etag"), calls
+
+
+def test_pyfetch_cache(selenium, etag_server):
+    url, calls = etag_server
+
+    @run_in_pyodide
+    async def run(selenium, url):
+        from pyodide.http import ResponseCache, pyfetch
+
+        cache = ResponseCache()
+        assert await (await pyfetch(url, cache=cache)).text() == "data"
+        resp = await pyfetch(url, cache=cache)
+        assert resp.status == 200
+        assert await resp.text() == "data"
+        assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 1)
+
+        cache.default_max_age = 60
+        assert await (await pyfetch(url, cache=cache)).text() == "data"
+        assert (cache.hits, cache.misses, cache.revalidations) == (2, 1, 1)
+
+    run(selenium, url)
+    assert calls == [None, '"v1"']
+
+
+def test_pyfetch_cache_unknown_length(selenium, httpserver):
+    import werkzeug
+
+    def handler(request):
+        # A generator body is sent chunked, without a Content-Length
+        return werkzeug.Response(
+            (part for part in ["da", "ta"]),
+            headers={"Access-Control-Allow-Origin": "*"},
+        )
+
+    httpserver.expect_request("/chunked").respond_with_handler(handler)
+
+    @run_in_pyodide
+    async def run(selenium, url):
+        from pyodide.http import ResponseCache, pyfetch
+
+        cache = ResponseCache(default_max_age=60)
+        for _ in range(2):
+            assert await (await pyfetch(url, cache=cache)).text() == "data"
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert cache.size == 0
+
+    run(selenium, httpserver.url_for("/chunked"))
+
+
+@pytest.mark.xfail_browsers(node="XMLHttpRequest is not available in node")
+def test_pyxhr_cache(selenium, etag_server):
+    url, calls = etag_server
+
+    @run_in_pyodide
+    def run(selenium, url):
+        from pyodide.http import ResponseCache, pyxhr
+
+        cache = ResponseCache()
+        assert pyxhr.get(url, cache=cache).text == "data"
+        resp = pyxhr.get(url, cache=cache)
+        assert resp.status_code == 200
+        assert resp.text == "data"
+        assert resp.headers["etag"] == '"v1"'
+        assert (cache.hits, cache.misses, cache.revalidations) == (1, 1, 1)
+
+    run(selenium, url)
+    assert calls == [None, '"v1"']
@@ -305,6 +305,94 @@ def test_pyproxy_iter_error2(selenium):
     )(gen)
 
 
+@run_in_pyodide
+def test_pyproxy_iter_chunked(selenium):
+    from sys import getrefcount
+
+    from pyodide.code import run_js
+
+    # Long enough to go through several chunks of every size
+    for seq in [list(range(5000)), tuple(range(5000))]:
+        assert run_js(
+            "(seq) => { let s = 0; for (const x of seq) s += x; return s; }"
+        )(seq) == sum(seq)
+    assert run_js("(t) => [...t].join('')")(tuple("abc")) == "abc"
+
+    # Items that become proxies are destroyed once the loop finishes, including
+    # the ones that were read ahead when the loop stops early.
+    items = tuple([i] for i in range(100))
+    before = getrefcount(items[5])
+    first = run_js(
+        """
+        (l) => {
+            for (const x of l) {
+                return x.toJs();
+            }
+        }
+        """
+    )(items)
+    assert first.to_py() == [0]
+    assert getrefcount(items[5]) == before
+
+    # Other iterables are not read ahead, each item is produced when it is
+    # asked for.
+    produced = []
+
+    class Counter:
+        def __iter__(self):
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+    run_js(
+        """
+        (c) => {
+            for (const x of c) {
+                if (x === 2) break;
+            }
+        }
+        """
+    )(Counter())
+    assert produced == [0, 1, 2]
+
+    # Lists are read ahead but the loop still sees changes made by its body
+    l = list(range(100))
+    assert run_js(
+        """
+        (l) => {
+            const seen = [];
+            for (const x of l) {
+                seen.push(x);
+                if (x === 1) {
+                    l.set(2, "two");
+                    l.pop(3);
+                }
+                if (x === 50) {
+                    l.insert(51, "new");
+                }
+            }
+            return seen;
+        }
+        """
+    )(l).to_py() == [0, 1, "two", *range(4, 52), "new", *range(52, 100)]
+
+    l = [1, 2, 3]
+    assert run_js(
+        """
+        (l) => {
+            const seen = [];
+            for (const x of l) {
+                seen.push(x);
+                if (x === 1) {
+                    l.append(4);
+                }
+            }
+            return seen;
+        }
+        """
+    )(l).to_py() == [1, 2, 3, 4]
+
+
 @run_in_pyodide
 def test_pyproxy_iter_leak(selenium):
     from js import Map
@@ -1373,6 +1461,94 @@ def test_pyproxy_apply(selenium):
     )
 
 
+def test_pyproxy_lifetime_report(selenium):
+    selenium.run_js(
+        """
+        const api = pyodide._api;
+        pyodide.runPython(`
+            class Leaky:
+                pass
+        `);
+        api.pyproxyTraceLifetimes(1);
+        try {
+            const a = pyodide.runPython("Leaky()");
+            const b = pyodide.runPython("Leaky()");
+            const f = pyodide.runPython("lambda: 1");
+            let report = api.pyproxyLifetimeReport();
+            assert(() => report.count === 3);
+            assert(() => report.byType[0].key === "Leaky");
+            assert(() => report.byType[0].count === 2);
+            assert(() => report.byType[0].size > 0);
+            assert(() => report.bySite.length > 0);
+            assert(() => report.proxies[0].type === "Leaky");
+            assert(() => report.proxies[0].age >= report.proxies[2].age);
+            assert(() => api.pyproxyLifetimeReport({ top: 1 }).byType.length === 1);
+
+            a.destroy();
+            b.destroy();
+            report = api.pyproxyLifetimeReport();
+            assert(() => report.count === 1);
+            assert(() => report.byType[0].key === "function");
+            f.destroy();
+            assert(() => api.pyproxyLifetimeReport().count === 0);
+        } finally {
+            api.pyproxyTraceLifetimes(0);
+            pyodide.runPython("del Leaky");
+        }
+        """
+    )
+
+
+def test_pyproxy_call_fast_path(selenium):
+    selenium.run_js(
+        """
+        const f = pyodide.runPython(`
+            from pyodide.ffi import to_js
+            def f(*args):
+                return to_js([[type(x).__name__, x] for x in args])
+            f
+        `);
+        const res = f(1, 2.5, 2 ** 60, "abc", "🐍", true, false, undefined, null);
+        assert(() => JSON.stringify(res) === JSON.stringify([
+            ["int", 1],
+            ["float", 2.5],
+            ["float", 2 ** 60],
+            ["str", "abc"],
+            ["str", "🐍"],
+            ["bool", true],
+            ["bool", false],
+            ["NoneType", undefined],
+            ["JsNull", null],
+        ]));
+        // Too many arguments or arguments that are not immutable take the
+        // general path
+        assert(() => f(...Array(20).keys()).length === 20);
+        assert(() => f(1n, [2])[1][0] === "JsProxy");
+        assert(() => f.call({}, 3)[0][1] === 3);
+
+        const g = pyodide.runPython(`
+            def g(x):
+                raise ValueError(x)
+            g
+        `);
+        assertThrows(() => g("oops"), "PythonError", "ValueError: oops");
+        assertThrows(() => g(1, 2), "PythonError", "TypeError");
+
+        const h = pyodide.runPython(`
+            def h(self, x):
+                return to_js([self.a, x])
+            h
+        `);
+        const obj = { a: 7, h: h.captureThis() };
+        assert(() => obj.h(2)[0] === 7);
+        assert(() => h.bind(obj, 3)()[1] === 3);
+        obj.h.destroy();
+        f.destroy();
+        g.destroy();
+        """
+    )
+
+
 def test_pyproxy_this1(selenium):
     selenium.run_js(
         """
@@ -2116,6 +2292,56 @@ def test_pyproxy_of_list_every(selenium):
         assert func(a) == func(to_js(a))
 
 
+@run_in_pyodide
+def test_pyproxy_of_list_toArray(selenium):
+    from collections.abc import Sequence
+    from sys import getrefcount
+
+    from pyodide.code import run_js
+
+    class Countdown(Sequence):
+        def __len__(self):
+            return 3
+
+        def __getitem__(self, idx):
+            if idx >= 3:
+                raise IndexError(idx)
+            return 3 - idx
+
+    to_array = run_js("(a) => a.toArray()")
+    assert to_array([1, "a", None]).to_py() == [1, "a", None]
+    assert to_array((1, 2)).to_py() == [1, 2]
+    assert to_array(Countdown()).to_py() == [3, 2, 1]
+
+    # The array methods don't go through __getitem__ for each index
+    class CountingList(list):
+        calls = 0
+
+        def __getitem__(self, idx):
+            CountingList.calls += 1
+            return super().__getitem__(idx)
+
+    l = CountingList(range(1000))
+    result = run_js(
+        """
+        (a) => [
+            a.map((x) => 2 * x).reduce((x, y) => x + y),
+            a.filter((x) => x % 100 === 0).length,
+            a.some((x) => x === 999),
+            a.every((x) => x < 500),
+        ]
+        """
+    )(l)
+    assert result.to_py() == [999000, 10, True, False]
+    assert CountingList.calls == 0
+
+    # Proxies made for elements that some() never looked at are destroyed
+    items = [[i] for i in range(10)]
+    before = getrefcount(items[5])
+    assert run_js("(a) => a.some((x) => x.get(0) === 1)")(items)
+    assert getrefcount(items[5]) == before
+
+
 @run_in_pyodide
 def test_pyproxy_of_list_at(selenium):
     from pyodide.code import run_js
@@ -72,6 +72,152 @@ def test_snapshot_simple(selenium_standalone_noload):
     )
 
 
+def test_snapshot_sparse(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        py1.runPython(`
+            big = bytearray(1 << 20)
+            big[-1] = 7
+        `);
+        const heapLength = py1._module.HEAPU8.length;
+        const snapshot = py1.makeMemorySnapshot();
+        const snp32 = new Uint32Array(snapshot.buffer);
+        assert(() => snp32[3] === 1); // sparse flag
+        assert(() => snapshot.length < heapLength);
+        const py2 = await loadPyodide({_loadSnapshot: snapshot});
+        assert(() => py2._module.HEAPU8.length >= heapLength);
+        assert(() => py2.runPython("len(big), big[-1], sum(big)").toJs().toString() === "1048576,7,7");
+        """
+    )
+
+
+def test_snapshot_compressed(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        py1.runPython(`
+            from js import Headers
+            data = list(range(1000))
+        `);
+        const sparse = py1.makeMemorySnapshot();
+        const compressed = await py1.makeMemorySnapshot({compress: true});
+        assert(() => new Uint32Array(compressed.buffer)[3] === 3); // sparse | deflate
+        assert(() => compressed.length < sparse.length);
+        const py2 = await loadPyodide({_loadSnapshot: compressed});
+        assert(() => py2.globals.get("Headers") === Headers);
+        assert(() => py2.runPython("sum(data)") === 499500);
+        """
+    )
+
+
+def test_snapshot_stream(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        py1.runPython(`
+            from js import Headers
+            a = 7
+        `);
+        const compressed = await py1.makeMemorySnapshot({compress: true});
+        const check = (py) => {
+            assert(() => py.globals.get("Headers") === Headers);
+            assert(() => py.runPython("a") === 7);
+        };
+        check(await loadPyodide({_loadSnapshot: new Response(compressed)}));
+        check(await loadPyodide({_loadSnapshot: new Blob([compressed]).stream()}));
+        check(await loadPyodide({_loadSnapshot: Promise.resolve(new Response(py1.makeMemorySnapshot()))}));
+        await assertThrowsAsync(
+            () => loadPyodide({_loadSnapshot: new Response("", {status: 404})}),
+            "Error",
+            "Failed to load snapshot: request failed with status 404",
+        );
+        """
+    )
+
+
+def test_snapshot_delta(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        py1.runPython(`
+            from js import Headers
+            a = 1
+        `);
+        const base = py1.makeMemorySnapshot();
+        const py2 = await loadPyodide({_loadSnapshot: base, _makeSnapshot: true});
+        py2.runPython(`
+            from js import URL
+            b = 2
+        `);
+        const delta = py2.makeMemorySnapshot({base});
+        assert(() => new Uint32Array(delta.buffer)[3] === 5); // sparse | delta
+        assert(() => delta.length < base.length);
+
+        const py3 = await loadPyodide({_loadSnapshot: [base, delta], _makeSnapshot: true});
+        assert(() => py3.globals.get("Headers") === Headers);
+        assert(() => py3.globals.get("URL") === URL);
+        assert(() => py3.runPython("a + b") === 3);
+
+        // Deltas can be stacked, and compressed
+        py3.runPython("c = 3");
+        const delta2 = await py3.makeMemorySnapshot({base: [base, delta], compress: true});
+        const py4 = await loadPyodide({_loadSnapshot: [base, delta, delta2]});
+        assert(() => py4.globals.get("URL") === URL);
+        assert(() => py4.runPython("a + b + c") === 6);
+        """
+    )
+
+
+def test_snapshot_delta_bad_chain(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        const base = py1.makeMemorySnapshot();
+        const other = py1.makeMemorySnapshot();
+        const py2 = await loadPyodide({_loadSnapshot: base, _makeSnapshot: true});
+        const delta = py2.makeMemorySnapshot({base});
+        await assertThrowsAsync(
+            () => loadPyodide({_loadSnapshot: delta}),
+            "Error",
+            "Delta snapshot must be loaded together with its base snapshot",
+        );
+        await assertThrowsAsync(
+            () => loadPyodide({_loadSnapshot: [other, delta]}),
+            "Error",
+            "Delta snapshot at index 1 was not made against the snapshot before it",
+        );
+        """
+    )
+
+
+def test_snapshot_delta_compressed_base(selenium_standalone_noload):
+    selenium = selenium_standalone_noload
+    selenium.run_js(
+        """
+        const py1 = await loadPyodide({_makeSnapshot: true});
+        py1.runPython("a = 1");
+        const base = await py1.makeMemorySnapshot({compress: true});
+        const py2 = await loadPyodide({_loadSnapshot: base, _makeSnapshot: true});
+        py2.runPython("b = 2");
+        assertThrows(
+            () => py2.makeMemorySnapshot({base}),
+            "Error",
+            "Base snapshot at index 0 is compressed, decompress it first",
+        );
+        const inflated = await py2._api.decompressSnapshot(base);
+        const delta = py2.makeMemorySnapshot({base: inflated});
+        const py3 = await loadPyodide({_loadSnapshot: [base, delta]});
+        assert(() => py3.runPython("a + b") === 3);
+        """
+    )
+
+
 def test_snapshot_cannot_serialize(selenium_standalone_noload):
     selenium = selenium_standalone_noload
     match = "Can't serialize object at index"
@@ -452,6 +452,114 @@ def test_custom_stdio_write(selenium):
     ]
 
 
+def test_custom_stdout_chunked(selenium):
+    result = selenium.run_js(
+        r"""
+        const chunks = [];
+        pyodide.setStdout({ chunked: (s) => { chunks.push(s); }, chunkSize: 16 });
+        try {
+            pyodide.runPython(String.raw`
+                for i in range(5):
+                    print("line", i)
+                print("\u00e9" * 20)
+                print("partial", end="")
+            `);
+            const beforeMicrotask = chunks.length;
+            await new Promise((resolve) => setTimeout(resolve));
+            return [chunks, beforeMicrotask];
+        } finally {
+            pyodide.setStdout();
+        }
+        """
+    )
+    [chunks, before_microtask] = result
+    expected = "".join(f"line {i}\n" for i in range(5)) + "\u00e9" * 20 + "\npartial"
+    assert "".join(chunks) == expected
+    # Output is delivered in chunks of at most 16 bytes and the rest is
+    # delivered in a microtask.
+    assert all(len(chunk.encode()) <= 16 for chunk in chunks)
+    assert 0 < before_microtask < len(chunks)
+
+
+def test_custom_stdout_chunked_backpressure(selenium):
+    result = selenium.run_js(
+        r"""
+        const chunks = [];
+        let refuse = 2;
+        pyodide.setStdout({
+            chunked(s) {
+                if (refuse > 0) {
+                    refuse--;
+                    return false;
+                }
+                chunks.push(s);
+            },
+            chunkSize: 8,
+        });
+        try {
+            pyodide.runPython(`print("abcdefghijklmnopqrstuvwxyz")`);
+            await new Promise((resolve) => setTimeout(resolve));
+            return chunks;
+        } finally {
+            pyodide.setStdout();
+        }
+        """
+    )
+    assert "".join(result) == "abcdefghijklmnopqrstuvwxyz\n"
+
+
+def test_custom_stdout_chunked_retry_last_chunk(selenium):
+    result = selenium.run_js(
+        r"""
+        const chunks = [];
+        let calls = 0;
+        pyodide.setStdout({
+            chunked(s) {
+                calls++;
+                // Refuse the last chunk once, nothing is written after it.
+                if (s.endsWith("\n") && calls === 2) {
+                    return false;
+                }
+                chunks.push(s);
+            },
+            chunkSize: 8,
+        });
+        try {
+            pyodide.runPython(`print("abcdefghij")`);
+            await new Promise((resolve) => setTimeout(resolve, 50));
+            return [chunks, calls];
+        } finally {
+            pyodide.setStdout();
+        }
+        """
+    )
+    chunks, calls = result
+    assert "".join(chunks) == "abcdefghij\n"
+    assert calls == 3
+
+
+def test_custom_stdout_chunked_errors(selenium):
+    selenium.run_js(
+        """
+        assertThrows(
+            () => pyodide.setStdout({ batched: () => {}, chunkSize: 10 }),
+            "TypeError",
+            "The 'chunkSize' option can only be used with the 'chunked' option",
+        );
+        assertThrows(
+            () => pyodide.setStdout({ chunked: () => {}, chunkSize: 0 }),
+            "TypeError",
+            "The 'chunkSize' option must be a positive number",
+        );
+        assertThrows(
+            () => pyodide.setStdout({ chunked: () => {}, batched: () => {} }),
+            "TypeError",
+            "At most one of",
+        );
+        """
+    )
+
+
 @run_in_pyodide
 def test_custom_stdin_read1(selenium):
     from pyodide.code import run_js
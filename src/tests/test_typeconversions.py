@@ -1488,6 +1488,136 @@ def test_to_py_default_converter2(selenium):
     assert r2[0] is r2
 
 
+@run_in_pyodide
+def test_to_py_lazy(selenium):
+    from pyodide.code import run_js
+    from pyodide.ffi import JsProxy, LazyDict, LazyList
+
+    p = run_js(
+        """
+        const shared = [1, 2, {x: 3}];
+        const o = {
+            a: 1,
+            b: "two",
+            c: shared,
+            d: new Map([["k", {y: [4]}]]),
+            e: [shared],
+            f: new Date(0),
+        };
+        o.self = o;
+        o
+        """
+    )
+    r = p.to_py(lazy=True)
+    assert isinstance(r, LazyDict)
+    assert len(r) == 7
+    assert set(r) == {"a", "b", "c", "d", "e", "f", "self"}
+    assert r["a"] == 1
+    assert r["b"] == "two"
+    assert "c" in r._pending
+    c = r["c"]
+    assert isinstance(c, LazyList)
+    assert "c" not in r._pending
+    assert r["c"] is c
+    assert c[:2] == [1, 2]
+    assert c[-1]["x"] == 3
+    assert r["e"][0] is c
+    assert r["d"]["k"]["y"] == [4]
+    assert isinstance(r["f"], JsProxy)
+    assert r["self"] is r
+
+    m = p.to_py(lazy=True).materialize()
+    assert type(m) is dict
+    assert type(m["c"]) is list
+    assert type(m["c"][2]) is dict
+    assert m["e"][0] is m["c"]
+    assert m["self"] is m
+    assert m["c"] == [1, 2, {"x": 3}]
+
+    r = p.to_py(lazy=True, depth=1)
+    assert isinstance(r["c"], JsProxy)
+
+    r = p.to_py(lazy=True, depth=2)
+    assert r["c"][:2] == [1, 2]
+    assert isinstance(r["c"][2], JsProxy)
+
+    def default_converter(value, converter, cache):
+        if value.constructor.name == "Date":
+            return "date"
+        return value
+
+    assert p.to_py(lazy=True, default_converter=default_converter)["f"] == "date"
+
+
+@run_in_pyodide
+def test_via_json(selenium):
+    import pytest
+
+    from pyodide.code import run_js
+    from pyodide.ffi import to_js_via_json, to_py_via_json
+
+    value = {
+        "rows": [{"id": i, "name": f"row {i}", "ok": i % 2 == 0} for i in range(100)],
+        "meta": {"count": 100, "scale": 0.5, "tags": ["a", "b"]},
+    }
+    check = run_js(
+        """
+        (x) => x.rows.length === 100 &&
+            x.rows[7].name === "row 7" &&
+            x.rows[7].ok === false &&
+            x.meta.tags[1] === "b" &&
+            Object.getPrototypeOf(x.meta) === Object.prototype
+        """
+    )
+    for method in ["auto", "json", "convert"]:
+        js_value = to_js_via_json(value, method=method)
+        assert check(js_value)
+        for method2 in ["auto", "json", "convert"]:
+            assert to_py_via_json(js_value, method=method2) == value
+
+    # None and large integers differ between "json" and "convert", "auto"
+    # matches "convert"
+    value["meta"] = {"next": None, "big": 2**60 + 1}
+    describe = run_js("(x) => [String(x.meta.next), typeof x.meta.big]")
+    for method in ["auto", "convert"]:
+        js_value = to_js_via_json(value, method=method)
+        assert describe(js_value).to_py() == ["undefined", "bigint"]
+        assert to_py_via_json(js_value) == value
+        assert to_py_via_json(js_value, method="convert") == value
+    js_value = to_js_via_json(value, method="json")
+    assert describe(js_value).to_py() == ["null", "number"]
+    assert to_py_via_json(js_value, method="json")["meta"] == {
+        "next": None,
+        "big": 2**60,
+    }
+
+    # auto falls back when the value isn't JSON serializable
+    big_with_set = [{1, 2}] * 100
+    assert run_js("(x) => x[0] instanceof Set")(to_js_via_json(big_with_set))
+    with pytest.raises(TypeError):
+        to_js_via_json(big_with_set, method="json")
+    with pytest.raises(ValueError):
+        to_js_via_json([float("nan")] * 100, method="json")
+    with pytest.raises(ValueError, match="Unknown method"):
+        to_js_via_json(1, method="fast")  # type: ignore[arg-type]
+
+    # null and integers beyond 2**53 differ between "json" and "convert" too
+    from pyodide.ffi import jsnull
+
+    js_value = run_js("({a: null, big: 2 ** 60})")
+    assert to_py_via_json(js_value) == {"a": jsnull, "big": float(2**60)}
+    assert type(to_py_via_json(js_value)["big"]) is float
+    assert to_py_via_json(js_value, method="json") == {"a": None, "big": 2**60}
+    assert type(to_py_via_json(js_value, method="json")["big"]) is int
+
+    not_json = run_js("({m: new Map([[1, 2]]), u: undefined})")
+    assert to_py_via_json(not_json) == {"m": {1: 2}, "u": None}
+    assert to_py_via_json(not_json, method="json") == {"m": {}}
+    assert to_py_via_json(run_js("[NaN]"), method="json") == [None]
+    with pytest.raises(TypeError, match="Cannot serialize"):
+        to_py_via_json(run_js("(() => {})"), method="json")
+
+
 def test_to_js_default_converter(selenium):
     selenium.run_js(
         """